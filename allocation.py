@@ -0,0 +1,319 @@
+import time
+from math import gcd
+from functools import reduce
+
+import numpy as np
+
+from procs import run_killable
+
+
+def _validate(count, CMR, C):
+    """Проверяет и приводит входные данные к массивам NumPy"""
+
+    count = np.asarray(count)
+    CMR = np.asarray(CMR, dtype=float)
+    if CMR.ndim != 2 or CMR.shape[0] != count.shape[0]:
+        raise ValueError("Число строк CMR должно совпадать с длиной count")
+    if not np.issubdtype(count.dtype, np.integer) or (count < 0).any():
+        raise ValueError("count должен содержать неотрицательные целые числа")
+    if int(C) != C or C < 0:
+        raise ValueError("C должно быть неотрицательным целым")
+    return count.astype(np.int64), CMR, int(C)
+
+
+def solve_allocation_dp(count, CMR, C):
+    """Распределение групп рабочих динамическим программированием
+
+    Задача о рюкзаке с выбором: каждому объекту j назначается ровно одна
+    группа i (count[i] рабочих, эффект CMR[i][j]), всего ровно C рабочих.
+    Сложность O(объекты × группы × C). Возвращает (выбор группы для каждого
+    объекта, максимальный объем СМР).
+    """
+
+    count, CMR, C = _validate(count, CMR, C)
+    levels, objects = CMR.shape
+
+    # Сокращаем шкалу рабочих на общий делитель (в примере шаг 17 человек)
+    step = reduce(gcd, [int(c) for c in count] + [C]) or 1
+    units = count // step
+    capacity = C // step
+
+    # dp[w] - максимальный СМР при ровно w единицах рабочих на уже рассмотренных объектах
+    dp = np.full(capacity + 1, -np.inf)
+    dp[0] = 0.0
+    choice = np.empty((objects, capacity + 1), dtype=np.int32)
+
+    for j in range(objects):
+        # Все варианты группы для объекта j одним массивом (группы × вместимость)
+        candidates = np.full((levels, capacity + 1), -np.inf)
+        for i in range(levels):
+            u = units[i]
+            if u <= capacity:
+                candidates[i, u:] = dp[:capacity + 1 - u] + CMR[i, j]
+        choice[j] = candidates.argmax(axis=0)
+        dp = candidates[choice[j], np.arange(capacity + 1)]
+
+    if dp[capacity] == -np.inf:
+        raise ValueError(f"Невозможно распределить ровно {C} рабочих")
+
+    # Восстановление оптимального распределения с конца
+    groups = np.empty(objects, dtype=int)
+    w = capacity
+    for j in range(objects - 1, -1, -1):
+        groups[j] = choice[j, w]
+        w -= units[groups[j]]
+
+    return groups, dp[capacity]
+
+
+def solve_mckp(groups, weights, values, capacity, exact=True):
+    """Задача о рюкзаке с выбором в общем виде (динамическое программирование)
+
+    groups[k] - номер группы предмета k, weights[k] - неотрицательный целый
+    вес, values[k] - ценность. Из каждой группы выбирается ровно один
+    предмет, суммарный вес равен capacity (exact=True) или не больше его.
+    Сложность O(предметов × capacity / НОД весов). Возвращает (номера
+    выбранных предметов по группам, максимальная суммарная ценность).
+    """
+
+    groups = np.asarray(groups, dtype=np.int64)
+    weights = np.asarray(weights)
+    values = np.asarray(values, dtype=float)
+    if not np.issubdtype(weights.dtype, np.integer):
+        if (weights != np.round(weights)).any():
+            raise ValueError("Веса предметов должны быть целыми")
+        weights = weights.astype(np.int64)
+    if (weights < 0).any() or int(capacity) != capacity or capacity < 0:
+        raise ValueError("Веса и вместимость должны быть неотрицательными целыми")
+
+    step = reduce(gcd, [int(w) for w in np.unique(weights)] + [int(capacity)]) or 1
+    units = weights // step
+    cap = int(capacity) // step
+    count = int(groups.max()) + 1 if groups.size else 0
+    members = [np.flatnonzero(groups == g) for g in range(count)]
+    if any(items.size == 0 for items in members):
+        raise ValueError("Каждая группа должна содержать хотя бы один предмет")
+
+    dp = np.full(cap + 1, -np.inf)
+    dp[0] = 0.0
+    choice = np.empty((count, cap + 1), dtype=np.int64)
+    for g, items in enumerate(members):
+        candidates = np.full((items.size, cap + 1), -np.inf)
+        for r, k in enumerate(items):
+            u = units[k]
+            if u <= cap:
+                candidates[r, u:] = dp[:cap + 1 - u] + values[k]
+        best = candidates.argmax(axis=0)
+        choice[g] = items[best]
+        dp = candidates[best, np.arange(cap + 1)]
+
+    w = cap if exact else int(dp.argmax())
+    if dp[w] == -np.inf:
+        raise ValueError(f"Невозможно набрать вес {capacity}" if exact
+                         else f"Нет допустимого выбора с весом не более {capacity}")
+
+    chosen = np.empty(count, dtype=np.int64)
+    best = dp[w]
+    for g in range(count - 1, -1, -1):
+        chosen[g] = choice[g, w]
+        w -= units[chosen[g]]
+    return chosen, best
+
+
+LAGRANGE_ITERATIONS = 100   # Шагов бисекции по множителю
+LAGRANGE_MAX_STATES = 5 * 10 ** 7  # Предел (варианты × вместимость) точного шага после отсечения
+
+
+def _relaxation(CMR, count, lam):
+    """Лагранжева релаксация при множителе lam: лучшие группы объектов и их суммы
+
+    Бюджет рабочих переносится в целевую функцию со штрафом lam за рабочего,
+    после чего объекты решаются независимо (argmax по столбцам).
+    """
+
+    reduced = CMR - lam * count[:, None]
+    groups = reduced.argmax(axis=0)
+    return groups, reduced.max(axis=0).sum(), count[groups].sum(), CMR[groups, np.arange(CMR.shape[1])].sum()
+
+
+def _repair(loss, count, groups, C):
+    """Жадное восстановление допустимости: сумма рабочих доводится ровно до C
+
+    У каждого объекта выбирается лучшая замена группы, уменьшающая
+    отклонение от C, - с наименьшей потерей приведенного эффекта loss на
+    рабочего. Замены применяются пачкой в порядке цены, пока сумма не
+    перескакивает C (если перескакивает уже первая - только она), и шаг
+    повторяется. None, если дойти до C такими заменами нельзя.
+    """
+
+    groups = groups.copy()
+    columns = np.arange(groups.size)
+    used = int(count[groups].sum())
+    while used != C:
+        gap = C - used
+        delta = count[:, None] - count[groups][None, :]
+        allowed = (delta != 0) & (np.abs(gap - delta) < abs(gap))
+        if not allowed.any():
+            return None
+        price = np.where(allowed, (loss - loss[groups, columns]) / np.maximum(np.abs(delta), 1), np.inf)
+        best = price.argmin(axis=0)
+        cost = price[best, columns]
+        order = np.argsort(cost, kind='stable')
+        order = order[np.isfinite(cost[order])]
+        step = delta[best[order], order]
+        take = order[np.cumsum(np.abs(step)) <= abs(gap)]
+        if take.size == 0:
+            take = order[:1]
+        groups[take] = best[take]
+        used += int(delta[best[take], take].sum())
+    return groups
+
+
+def greedy_allocation(count, CMR, C):
+    """Жадное распределение - быстрое начальное решение
+
+    Все объекты начинают с наименьшей группы, затем группы заменяются по
+    наибольшему приросту СМР на рабочего, пока всего не будет ровно C
+    рабочих. Возвращает номера групп по объектам или None.
+    """
+
+    count, CMR, C = _validate(count, CMR, C)
+    groups = np.full(CMR.shape[1], int(count.argmin()))
+    return _repair(CMR.max(axis=0) - CMR, count, groups, C)
+
+
+def solve_allocation_lagrange(count, CMR, C, iterations=LAGRANGE_ITERATIONS,
+                              max_states=LAGRANGE_MAX_STATES):
+    """Распределение групп рабочих лагранжевой релаксацией бюджета рабочих
+
+    Ограничение "всего ровно C рабочих" переносится в целевую функцию с
+    множителем lam, и каждый объект выбирает группу независимо (векторно
+    по всем объектам). Множитель ищется бисекцией по субградиенту
+    C - сумма рабочих; минимум двойственной функции дает верхнюю оценку.
+    Решения по обе стороны от оптимального множителя доводятся до ровно C
+    рабочих жадной заменой групп, лучшее из них - рекорд. Затем варианты,
+    потеря приведенного эффекта которых больше разрыва "оценка - рекорд",
+    отсекаются, объекты с единственным вариантом фиксируются, а оставшаяся
+    часть решается точно (solve_mckp). Если она больше max_states,
+    возвращается рекорд с ненулевым разрывом.
+    Время - O(объекты × группы) на шаг бисекции плюс точный шаг по
+    неотсеченным вариантам. Возвращает (выбор группы для каждого объекта,
+    объем СМР, верхняя оценка); после точного шага оценка равна объему СМР.
+    """
+
+    best = None
+    for best in iter_allocation_lagrange(count, CMR, C, iterations, max_states):
+        pass
+    return best
+
+
+def iter_allocation_lagrange(count, CMR, C, iterations=LAGRANGE_ITERATIONS,
+                             max_states=LAGRANGE_MAX_STATES, incumbent=None, deadline=None):
+    """Шаги solve_allocation_lagrange по мере улучшения: (группы, объем СМР, оценка)
+
+    Первый результат - рекорд после восстановления решений релаксации (или
+    сразу оптимум, если релаксация допустима), последний - решение точного
+    шага. incumbent - известное допустимое распределение (номера групп),
+    которое участвует в отсечении наравне с восстановленными. deadline -
+    момент time.perf_counter(), к которому нужно уложиться: бисекция по
+    его наступлении прекращается, а точный шаг выполняется в рабочем
+    процессе (procs.run_killable) и при нехватке времени пропускается.
+    """
+
+    count, CMR, C = _validate(count, CMR, C)
+    objects = CMR.shape[1]
+    if count.min() * objects > C or count.max() * objects < C:
+        raise ValueError(f"Невозможно распределить ровно {C} рабочих")
+    # При lam = -spread все объекты берут наибольшую группу (рабочих не меньше C),
+    # при lam = spread - наименьшую (не больше C)
+    steps = np.diff(np.unique(count))
+    spread = (CMR.max() - CMR.min()) / (steps.min() if steps.size else 1) + 1
+    sides = {}
+    bound = np.inf
+    for lam in (-spread, spread):
+        groups, relaxed, used, value = _relaxation(CMR, count, lam)
+        if used == C:
+            yield groups, value, value
+            return
+        bound = min(bound, relaxed + lam * C)
+        sides['low' if used > C else 'high'] = (lam, groups, used, value)
+
+    # Бисекция по знаку субградиента C - сумма рабочих
+    for _ in range(iterations):
+        if deadline is not None and time.perf_counter() >= deadline:
+            break  # Оценка и рекорд строятся по уже найденным множителям
+        low, high = sides['low'][0], sides['high'][0]
+        if high - low <= 1e-12 * max(1.0, abs(low), abs(high)):
+            break
+        lam = (low + high) / 2
+        groups, relaxed, used, value = _relaxation(CMR, count, lam)
+        if used == C:
+            # Релаксация сама дает допустимое решение с нулевым разрывом
+            yield groups, value, value
+            return
+        bound = min(bound, relaxed + lam * C)
+        sides['low' if used > C else 'high'] = (lam, groups, used, value)
+
+    # Точный минимум двойственной функции - пересечение прямых по обе стороны от излома
+    (_, _, used_low, value_low), (_, _, used_high, value_high) = sides['low'], sides['high']
+    lam = (value_low - value_high) / (used_low - used_high)
+    dual = _relaxation(CMR, count, lam)[1] + lam * C
+    bound = min(bound, dual)
+
+    # Потеря приведенного эффекта каждого варианта относительно лучшего для объекта:
+    # СМР любого распределения ровно C рабочих = dual - сумма потерь выбранных вариантов
+    loss = CMR - lam * count[:, None]
+    loss = loss.max(axis=0) - loss
+
+    # Рекорд: жадное восстановление решений по обе стороны от множителя
+    candidates = [_repair(loss, count, candidate, C) for _, candidate, _, _ in sides.values()]
+    if incumbent is not None:
+        candidates.append(np.asarray(incumbent, dtype=int))
+    groups, value = None, -np.inf
+    for candidate in candidates:
+        if candidate is not None and count[candidate].sum() == C:
+            total = CMR[candidate, np.arange(objects)].sum()
+            if total > value:
+                groups, value = candidate, total
+    if groups is not None:
+        yield groups, value, bound
+
+    # Отсечение: решение не хуже рекорда не может взять вариант с потерей больше
+    # dual - рекорд; объекты с единственным оставшимся вариантом фиксируются
+    keep = loss <= dual - value + 1e-9 * max(1.0, abs(dual))
+    free = keep.sum(axis=0) > 1
+    exact = keep.argmax(axis=0)
+    rest = C - int(count[exact[~free]].sum())
+    levels_kept, objects_kept = np.nonzero(keep[:, free])
+    if groups is not None and levels_kept.size * (rest + 1) > max_states:
+        return
+
+    # Точный шаг по неотсеченным вариантам: его решение оптимально для всей задачи
+    if objects_kept.size:
+        columns = np.flatnonzero(free)[objects_kept]
+        args = (objects_kept, count[levels_kept], CMR[levels_kept, columns], rest)
+        try:
+            if deadline is None:
+                chosen, _ = solve_mckp(*args)
+            elif time.perf_counter() >= deadline:
+                return
+            else:
+                chosen, _ = run_killable(solve_mckp, args, deadline - time.perf_counter())
+        except TimeoutError:
+            return
+        except ValueError:
+            raise ValueError(f"Невозможно распределить ровно {C} рабочих") from None
+        exact[free] = levels_kept[chosen]
+    elif rest != 0:
+        raise ValueError(f"Невозможно распределить ровно {C} рабочих")
+    total = CMR[exact, np.arange(objects)].sum()
+    yield exact, total, total
+
+
+def allocation_to_records(count, CMR, groups):
+    """Распределение в формате ведомости: структурированный массив object, count, cmr"""
+
+    CMR = np.asarray(CMR)
+    groups = np.asarray(groups, dtype=np.int64)
+    return np.rec.fromarrays([np.arange(1, groups.size + 1), np.asarray(count)[groups],
+                              CMR[groups, np.arange(groups.size)]], names='object,count,cmr')
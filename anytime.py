@@ -0,0 +1,167 @@
+import time
+
+import numpy as np
+
+from allocation import greedy_allocation, iter_allocation_lagrange
+from arcs import as_arcs
+from assignment import iter_swaps, regret_assignment, sparse_assignment
+from procs import run_killable
+
+
+class Incumbent:
+    """Рекорд anytime-решателя: лучшее найденное решение и оценка оптимума
+
+    stage - этап, на котором найдено решение ('greedy', 'local', 'lagrange',
+    'exact'), objective - значение ЦФ, bound - оценка оптимума (нижняя для
+    минимизации, верхняя для максимизации), gap - относительный разрыв,
+    elapsed - время от начала решения, с. Массивы решения (rows/cols или
+    groups) доступны как атрибуты.
+    """
+
+    def __init__(self, stage, objective, bound, sense, elapsed, **values):
+        self.stage = stage
+        self.objective = objective
+        self.bound = bound
+        self.sense = sense
+        self.elapsed = elapsed
+        self.values = values
+        for key, value in values.items():
+            setattr(self, key, value)
+
+    @property
+    def gap(self):
+        difference = self.objective - self.bound if self.sense == 'min' else self.bound - self.objective
+        return max(0.0, float(difference)) / max(1.0, abs(float(self.bound)))
+
+    def __repr__(self):
+        return (f"Incumbent({self.stage!r}, objective={self.objective!r}, bound={self.bound!r}, "
+                f"gap={self.gap:.2e}, elapsed={self.elapsed:.3f})")
+
+
+def _expired(deadline):
+    return deadline is not None and time.perf_counter() >= deadline
+
+
+def _exact_assignment(cost):
+    return sparse_assignment(*as_arcs(cost))
+
+
+def _transposed_swaps(cost, rows, cols):
+    """iter_swaps для n > m: поиск по cost.T, результат - по возрастанию строк"""
+
+    for cols, rows, value in iter_swaps(cost.T, cols, rows):
+        order = np.argsort(rows)
+        yield rows[order], cols[order], value
+
+
+def anytime_assignment(time_matrix, forbidden=None, time_limit=None):
+    """Рекорды задачи о назначениях по мере улучшения (генератор Incumbent)
+
+    Сразу выдается жадное назначение по сожалению, затем - улучшения
+    локального поиска обменами, и, если время time_limit (с) не истекло,
+    точное решение LAPJVsp с нулевым разрывом. При заданном time_limit
+    точный этап выполняется в рабочем процессе и прерывается по истечении
+    времени; локальный поиск проверяет время после каждого прохода, и
+    улучшение последнего прохода выдается. Нижняя оценка - большая из
+    сумм минимумов по строкам и по столбцам. Потребитель может прекратить
+    перебор в любой момент; последний выданный рекорд - лучший.
+    """
+
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    cost = np.array(time_matrix, dtype=float)
+    cost[np.isnan(cost)] = np.inf
+    if forbidden is not None:
+        cost[np.asarray(forbidden, dtype=bool)] = np.inf
+    n, m = cost.shape
+    bound = np.sort(cost.min(axis=1))[:min(n, m)].sum()
+    bound = max(bound, np.sort(cost.min(axis=0))[:min(n, m)].sum())
+    if not np.isfinite(bound):
+        raise ValueError("Допустимого назначения не существует: у строки или столбца нет разрешенных пар")
+
+    def incumbent(stage, rows, cols, value):
+        return Incumbent(stage, value, value if stage == 'exact' else bound, 'min',
+                         time.perf_counter() - start, rows=rows, cols=cols)
+
+    best = None
+    greedy = regret_assignment(cost)
+    if greedy is not None:
+        rows, cols = greedy
+        best = cost[rows, cols].sum()
+        yield incumbent('greedy', rows, cols, best)
+        # Обмены переставляют столбцы назначенных строк; при n > m - по
+        # транспонированной матрице, где все строки назначены
+        if n <= m:
+            steps = iter_swaps(cost, rows, cols)
+        else:
+            steps = _transposed_swaps(cost, rows, cols)
+        for rows, cols, value in steps:
+            # Улучшение, найденное к истечению времени, выдается до выхода
+            if value < best:
+                best = value
+                yield incumbent('local', rows, cols, value)
+            if _expired(deadline):
+                return
+        if best <= bound or _expired(deadline):
+            return
+
+    if deadline is None:
+        rows, cols = _exact_assignment(cost)
+    else:
+        # Точный этап - в рабочем процессе, который завершается по истечении времени
+        try:
+            rows, cols = run_killable(_exact_assignment, (cost,), deadline - time.perf_counter())
+        except TimeoutError:
+            return
+    yield incumbent('exact', rows, cols, cost[rows, cols].sum())
+
+
+def anytime_allocation(count, CMR, C, time_limit=None):
+    """Рекорды распределения рабочих по мере улучшения (генератор Incumbent)
+
+    Сразу выдается жадное распределение по приросту СМР на рабочего, затем
+    - рекорды и верхние оценки лагранжевой релаксации и, если время
+    time_limit (с) не истекло, решение точного шага с нулевым разрывом
+    (allocation.iter_allocation_lagrange; при заданном time_limit точный шаг
+    прерывается по истечении времени). До релаксации верхняя оценка -
+    сумма наибольших СМР объектов.
+    """
+
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    CMR = np.asarray(CMR, dtype=float)
+    objects = np.arange(CMR.shape[1])
+    bound = CMR.max(axis=0).sum()
+    best, best_groups = -np.inf, None
+
+    greedy = greedy_allocation(count, CMR, C)
+    if greedy is not None:
+        best, best_groups = CMR[greedy, objects].sum(), greedy
+        yield Incumbent('greedy', best, bound, 'max', time.perf_counter() - start, groups=greedy)
+        if best >= bound or _expired(deadline):
+            return
+
+    for groups, value, upper in iter_allocation_lagrange(count, CMR, C, incumbent=greedy,
+                                                         deadline=deadline):
+        if value > best or upper < bound:
+            if value > best:
+                best, best_groups = value, groups
+            bound = min(bound, upper)
+            stage = 'exact' if best >= bound else 'lagrange'
+            yield Incumbent(stage, best, bound, 'max', time.perf_counter() - start, groups=best_groups)
+        if _expired(deadline):
+            return
+
+
+def solve_anytime(incumbents, callback=None):
+    """Перебор рекордов генератора с передачей каждого в callback; возвращает последний
+
+    None, если генератор не выдал ни одного решения. Предел времени задается
+    самому генератору (time_limit anytime_assignment / anytime_allocation).
+    """
+
+    best = None
+    for best in incumbents:
+        if callback is not None:
+            callback(best)
+    return best
@@ -0,0 +1,133 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import maximum_bipartite_matching, maximum_flow
+
+
+def is_sparse_cost(cost, shape=None):
+    """Разреженная структура затрат: матрица SciPy или список ребер с заданным shape"""
+
+    return sp.issparse(cost) or shape is not None
+
+
+def as_arcs(cost, shape=None, forbidden=None):
+    """Разрешенные пары (дуги) задачи в виде массивов rows, cols, costs и размер
+
+    cost может быть:
+    - плотной матрицей: запрещены пары с inf/NaN и отмеченные в маске forbidden;
+    - разреженной матрицей SciPy (COO, CSR, ...): разрешены только хранимые
+      элементы, в том числе явные нули;
+    - списком ребер [(i, j, стоимость), ...] с обязательным shape = (m, n).
+    Повторяющиеся пары считаются ошибкой.
+    """
+
+    if sp.issparse(cost):
+        coo = cost.tocoo()
+        rows, cols, costs = coo.row, coo.col, np.asarray(coo.data, dtype=float)
+        shape = coo.shape
+    elif shape is not None:
+        edges = np.asarray(cost, dtype=float)
+        if edges.size == 0:
+            edges = edges.reshape(0, 3)
+        if edges.ndim != 2 or edges.shape[1] != 3:
+            raise ValueError("Список ребер должен состоять из троек (i, j, стоимость)")
+        rows, cols, costs = edges[:, 0], edges[:, 1], edges[:, 2]
+        if (rows != np.round(rows)).any() or (cols != np.round(cols)).any():
+            raise ValueError("Номера строк и столбцов в списке ребер должны быть целыми")
+        shape = tuple(int(k) for k in shape)
+    else:
+        dense = np.asarray(cost, dtype=float)
+        if dense.ndim != 2:
+            raise ValueError("Матрица стоимостей должна быть двумерной")
+        allowed = np.isfinite(dense)
+        if forbidden is not None:
+            allowed &= ~np.asarray(forbidden, dtype=bool)
+        rows, cols = np.nonzero(allowed)
+        return rows, cols, dense[rows, cols], dense.shape
+
+    rows = rows.astype(np.int64)
+    cols = cols.astype(np.int64)
+    if rows.size and (rows.min() < 0 or cols.min() < 0 or rows.max() >= shape[0] or cols.max() >= shape[1]):
+        raise ValueError(f"Номера пар выходят за размер {shape}")
+
+    # Бесконечная стоимость в разреженных данных тоже означает запрет
+    keep = np.isfinite(costs)
+    if forbidden is not None:
+        keep &= ~np.asarray(forbidden, dtype=bool)[rows, cols]
+    rows, cols, costs = rows[keep], cols[keep], costs[keep]
+
+    keys = rows * shape[1] + cols
+    if np.unique(keys).size != keys.size:
+        raise ValueError("Пары (i, j) в разреженных данных повторяются")
+    return rows, cols, costs, shape
+
+
+def arc_values(rows, cols, costs, shape, pick_rows, pick_cols):
+    """Стоимости выбранных пар (pick_rows[k], pick_cols[k]) по списку дуг"""
+
+    keys = rows * shape[1] + cols
+    order = np.argsort(keys)
+    wanted = np.asarray(pick_rows, dtype=np.int64) * shape[1] + np.asarray(pick_cols, dtype=np.int64)
+    pos = np.searchsorted(keys[order], wanted)
+    return costs[order[pos]]
+
+
+def check_assignment(rows, cols, shape):
+    """Проверка существования полного назначения по разрешенным парам
+
+    Максимальное паросочетание (Хопкрофт-Карп) должно покрывать меньшую
+    сторону; иначе ValueError с числом пар, которые можно назначить.
+    """
+
+    n, m = shape
+    need = min(n, m)
+    if need == 0:
+        return
+    graph = sp.csr_matrix((np.ones(rows.size), (rows, cols)), shape=shape)
+    matched = int((maximum_bipartite_matching(graph, perm_type='column') >= 0).sum())
+    if matched < need:
+        raise ValueError(f"Допустимого назначения не существует: по разрешенным парам "
+                         f"можно назначить только {matched} из {need}")
+
+
+def _integral_scale(values):
+    """Множитель, приводящий значения к целым (None, если подходящего нет)"""
+
+    for scale in (1, 10, 100, 1000, 10 ** 6):
+        scaled = values * scale
+        if np.allclose(scaled, np.round(scaled), rtol=0, atol=1e-9 * scale) \
+                and scaled.sum() < 2 ** 30:
+            return scale
+    return None
+
+
+def check_transport(supply, demand, rows, cols, shape):
+    """Проверка, что потребности покрываются по разрешенным маршрутам
+
+    Максимальный поток источник -> поставщики (мощность) -> потребители
+    (разрешенные дуги) -> сток (потребность) должен равняться суммарной
+    потребности; иначе ValueError. Для данных, не приводимых к целым,
+    проверка пропускается (недопустимость обнаружит решатель).
+    """
+
+    supply = np.asarray(supply, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    m, n = shape
+    scale = _integral_scale(np.concatenate([supply, demand]))
+    if scale is None:
+        return
+    s_cap = np.round(supply * scale).astype(np.int64)
+    d_cap = np.round(demand * scale).astype(np.int64)
+    total = int(d_cap.sum())
+    if total == 0:
+        return
+
+    # Узлы: 0 - источник, 1..m - поставщики, m+1..m+n - потребители, m+n+1 - сток
+    source, sink = 0, m + n + 1
+    tails = np.concatenate([np.zeros(m, dtype=np.int64), 1 + rows, 1 + m + np.arange(n)])
+    heads = np.concatenate([1 + np.arange(m), 1 + m + cols, np.full(n, sink)])
+    caps = np.concatenate([s_cap, np.full(rows.size, total), d_cap]).astype(np.int32)
+    graph = sp.csr_matrix((caps, (tails, heads)), shape=(m + n + 2, m + n + 2))
+    flow = maximum_flow(graph, source, sink).flow_value
+    if flow < total:
+        raise ValueError(f"Потребность не может быть покрыта по разрешенным маршрутам: "
+                         f"доставляется {flow / scale:g} из {total / scale:g}")
@@ -0,0 +1,447 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+
+def _prepare_cost(cost, forbidden=None):
+    """Приводит матрицу стоимостей к float-массиву, запрещенные пары -> inf"""
+
+    cost = np.array(cost, dtype=float)
+    if cost.ndim != 2:
+        raise ValueError("Матрица стоимостей должна быть двумерной")
+
+    # NaN и явная маска трактуются как запрещенные назначения
+    cost[np.isnan(cost)] = np.inf
+    if forbidden is not None:
+        cost[np.asarray(forbidden, dtype=bool)] = np.inf
+
+    return cost
+
+
+def _augment(cost, u, v, row4col, col4row, cur_row):
+    """Одна фаза поиска кратчайшего увеличивающего пути (Дейкстра по столбцам)"""
+
+    m = cost.shape[1]
+    spc = np.full(m, np.inf)  # Кратчайшие расстояния до столбцов
+    path = np.full(m, -1)  # Строка, из которой пришли в столбец
+    scanned = np.zeros(m, dtype=bool)  # Просмотренные столбцы
+    visited_rows = [cur_row]
+
+    min_val = 0.0
+    i = cur_row
+    while True:
+        # Релаксация всех непросмотренных столбцов из строки i одним векторным шагом
+        reduced = min_val + cost[i] - u[i] - v
+        better = (reduced < spc) & ~scanned
+        spc[better] = reduced[better]
+        path[better] = i
+
+        dist = np.where(scanned, np.inf, spc)
+        j = int(np.argmin(dist))
+        min_val = dist[j]
+        if min_val == np.inf:
+            raise ValueError("Допустимого назначения не существует")
+
+        # При равенстве расстояний предпочитаем свободный столбец: путь короче
+        if row4col[j] != -1:
+            free = np.flatnonzero((dist == min_val) & (row4col == -1))
+            if free.size:
+                j = int(free[0])
+
+        scanned[j] = True
+        if row4col[j] == -1:
+            sink = j
+            break
+        i = row4col[j]
+        visited_rows.append(i)
+
+    # Обновляем потенциалы
+    u[cur_row] += min_val
+    rows = np.array(visited_rows[1:], dtype=int)
+    if rows.size:
+        u[rows] += min_val - spc[col4row[rows]]
+    v[scanned] -= min_val - spc[scanned]
+
+    # Перестраиваем паросочетание вдоль найденного пути
+    j = sink
+    while True:
+        i = path[j]
+        row4col[j] = i
+        col4row[i], j = j, col4row[i]
+        if i == cur_row:
+            break
+
+
+def _solve_min(cost):
+    """Метод кратчайших увеличивающих путей (Джонкер-Волгенант) для n <= m"""
+
+    n, m = cost.shape
+    u = np.zeros(n)
+    v = np.zeros(m)
+    col4row = np.full(n, -1)
+    row4col = np.full(m, -1)
+
+    # Редукция столбцов (только для квадратной матрицы): назначаем строку
+    # с минимальной стоимостью в столбце, если она еще свободна
+    if n == m and np.isfinite(cost).all():
+        v = cost.min(axis=0)
+        best_rows = cost.argmin(axis=0)
+        for j in range(m):
+            i = best_rows[j]
+            if col4row[i] == -1:
+                col4row[i] = j
+                row4col[j] = i
+
+    for cur_row in np.flatnonzero(col4row == -1):
+        _augment(cost, u, v, row4col, col4row, cur_row)
+
+    return col4row, u, v
+
+
+def linear_sum_assignment(cost, forbidden=None, maximize=False):
+    """Решает задачу о назначениях за O(n³)
+
+    Поддерживает прямоугольные матрицы и запрещенные пары (inf, NaN или
+    маска forbidden). Возвращает массивы номеров строк и столбцов.
+    """
+
+    cost = _prepare_cost(cost, forbidden)
+    if maximize:
+        cost = -cost
+        cost[np.isnan(cost)] = np.inf
+        cost[cost == -np.inf] = np.inf
+
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+
+    if cost.size == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    col4row, _, _ = _solve_min(cost)
+    rows = np.arange(cost.shape[0])
+
+    if transposed:
+        order = np.argsort(col4row)
+        return col4row[order], rows[order]
+    return rows, col4row
+
+
+def sparse_assignment(rows, cols, costs, shape):
+    """Задача о назначениях на разреженном множестве разрешенных пар
+
+    Пары задаются массивами rows, cols, costs (см. arcs.as_arcs). Решается
+    алгоритмом LAPJVsp из SciPy, время пропорционально числу пар, а не n*m.
+    Возвращает массивы номеров строк и столбцов, упорядоченные по строкам.
+    """
+
+    n, m = shape
+    if min(n, m) == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    # Все полные назначения содержат min(n, m) пар, поэтому сдвиг стоимостей
+    # не меняет решения; он нужен, чтобы нулевые стоимости не считались отсутствием ребра
+    costs = np.asarray(costs, dtype=float)
+    offset = 1.0 - costs.min() if costs.size and costs.min() <= 0 else 0.0
+    graph = sp.csr_matrix((costs + offset, (rows, cols)), shape=shape)
+    try:
+        r, c = min_weight_full_bipartite_matching(graph)
+    except ValueError:
+        raise ValueError("Допустимого назначения не существует") from None
+
+    order = np.argsort(r)
+    return r[order].astype(int), c[order].astype(int)
+
+
+def regret_assignment(cost, forbidden=None):
+    """Жадное назначение по сожалению - быстрое начальное решение
+
+    Строки обрабатываются по убыванию разности между вторым и первым по
+    стоимости вариантом (строки с единственным вариантом - первыми), каждая
+    получает самый дешевый из свободных столбцов. O(n·m). Возвращает
+    массивы номеров строк и столбцов или None, если жадный проход уперся
+    в запреты.
+    """
+
+    cost = _prepare_cost(cost, forbidden)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    two = np.partition(cost, 1, axis=1)[:, :2] if m > 1 else np.column_stack([cost[:, 0], np.full(n, np.inf)])
+    with np.errstate(invalid='ignore'):
+        regret = np.where(np.isfinite(two[:, 1]), two[:, 1] - two[:, 0], np.inf)
+    free = np.ones(m, dtype=bool)
+    col4row = np.empty(n, dtype=int)
+    for i in np.argsort(-regret, kind='stable'):
+        row = np.where(free, cost[i], np.inf)
+        j = int(row.argmin())
+        if not np.isfinite(row[j]):
+            return None
+        col4row[i] = j
+        free[j] = False
+
+    rows = np.arange(n)
+    if transposed:
+        order = np.argsort(col4row)
+        return col4row[order], rows[order]
+    return rows, col4row
+
+
+def iter_swaps(cost, rows, cols, forbidden=None):
+    """Локальный поиск обменами для назначения rows -> cols (генератор)
+
+    За проход для всех пар назначенных строк векторно считается выигрыш
+    от обмена их столбцами (и от перехода строки в свободный столбец),
+    после чего применяются лучшие непересекающиеся улучшения. После каждого
+    улучшающего прохода выдается (rows, cols, суммарная стоимость);
+    генератор завершается в локальном оптимуме.
+    """
+
+    cost = _prepare_cost(cost, forbidden)
+    rows = np.asarray(rows, dtype=int)
+    cols = np.asarray(cols, dtype=int).copy()
+    tol = 1e-9 * max(1.0, np.abs(cost[rows, cols]).max(initial=0.0))
+    while True:
+        current = cost[rows, cols]
+        # gain[a, b] - уменьшение стоимости от обмена столбцами строк rows[a] и rows[b]
+        crossed = cost[np.ix_(rows, cols)]
+        gain = current[:, None] + current[None, :] - crossed - crossed.T
+        np.fill_diagonal(gain, 0.0)
+        # Переходы в свободные столбцы (строк меньше, чем столбцов)
+        free = np.setdiff1d(np.arange(cost.shape[1]), cols)
+        move = current[:, None] - cost[np.ix_(rows, free)] if free.size else np.zeros((rows.size, 0))
+
+        best_swap = gain.argmax(axis=1)
+        swap_gain = gain[np.arange(rows.size), best_swap]
+        best_move = move.argmax(axis=1) if free.size else np.zeros(rows.size, dtype=int)
+        move_gain = move[np.arange(rows.size), best_move] if free.size else np.full(rows.size, -np.inf)
+
+        used = np.zeros(rows.size, dtype=bool)
+        taken = set()
+        improved = False
+        for a in np.argsort(-np.maximum(swap_gain, move_gain), kind='stable'):
+            if max(swap_gain[a], move_gain[a]) <= tol:
+                break
+            if used[a]:
+                continue
+            if swap_gain[a] >= move_gain[a]:
+                b = best_swap[a]
+                if used[b]:
+                    continue
+                cols[a], cols[b] = cols[b], cols[a]
+                used[a] = used[b] = True
+            else:
+                j = free[best_move[a]]
+                if j in taken:
+                    continue
+                cols[a] = j
+                used[a] = True
+                taken.add(j)
+            improved = True
+        if not improved:
+            return
+        yield rows, cols.copy(), cost[rows, cols].sum()
+
+
+class IncrementalAssignment:
+    """Задача о назначениях с пересчетом после точечных изменений
+
+    Хранит оптимальное назначение и двойственные потенциалы u, v. После
+    изменения строки или столбца, добавления исполнителя или удаления
+    объекта освобождается одна строка, и решение восстанавливается одной
+    фазой поиска кратчайшего увеличивающего пути от текущих потенциалов -
+    O(n²) вместо O(n³) полного решения.
+
+    Прямоугольная матрица дополняется до квадратной нулевыми фиктивными
+    строками (исполнителей меньше, чем объектов) или столбцами (исполнителей
+    больше). Запрещенные пары задаются inf/NaN. Если после изменения
+    допустимого назначения нет, выбрасывается ValueError и состояние
+    остается прежним.
+    """
+
+    def __init__(self, cost, forbidden=None):
+        cost = _prepare_cost(cost, forbidden)
+        self.n_agents, self.n_tasks = cost.shape
+        size = max(cost.shape)
+        self._cost = np.zeros((size, size))
+        self._cost[:self.n_agents, :self.n_tasks] = cost
+        if size:
+            self._col4row, self._u, self._v = _solve_min(self._cost)
+        else:
+            self._col4row, self._u, self._v = np.full(0, -1), np.zeros(0), np.zeros(0)
+        self._row4col = np.full(size, -1)
+        self._row4col[self._col4row] = np.arange(size)
+
+    @property
+    def cost(self):
+        """Текущая матрица стоимостей исполнитель × объект (только для чтения)"""
+
+        view = self._cost[:self.n_agents, :self.n_tasks]
+        view.flags.writeable = False
+        return view
+
+    def current_assignment(self):
+        """Массивы номеров исполнителей и объектов, как у linear_sum_assignment"""
+
+        rows = np.arange(self.n_agents)
+        cols = self._col4row[:self.n_agents]
+        real = cols < self.n_tasks
+        return rows[real], cols[real]
+
+    @property
+    def total_cost(self):
+        rows, cols = self.current_assignment()
+        return self._cost[rows, cols].sum()
+
+    def _values(self, values, size):
+        values = np.array(values, dtype=float).ravel()
+        if values.size != size:
+            raise ValueError(f"Ожидается {size} значений, получено {values.size}")
+        values[np.isnan(values)] = np.inf
+        return values
+
+    def _check(self, index, size, what):
+        if not 0 <= index < size:
+            raise ValueError(f"Нет {what} с номером {index}")
+
+    def _state(self):
+        return (self._cost, self._u.copy(), self._v.copy(), self._col4row.copy(),
+                self._row4col.copy(), self.n_agents, self.n_tasks)
+
+    def _repair(self, row, state, undo=None):
+        """Фаза увеличивающего пути от свободной строки; при неудаче - откат"""
+
+        try:
+            # Строка или столбец без разрешенных пар: потенциал бесконечен
+            if not (np.isfinite(self._u).all() and np.isfinite(self._v).all()):
+                raise ValueError("Допустимого назначения не существует")
+            _augment(self._cost, self._u, self._v, self._row4col, self._col4row, row)
+        except ValueError:
+            (self._cost, self._u, self._v, self._col4row, self._row4col,
+             self.n_agents, self.n_tasks) = state
+            if undo is not None:
+                undo()
+            raise
+
+    def _free_row(self, i):
+        j = self._col4row[i]
+        self._col4row[i] = -1
+        self._row4col[j] = -1
+
+    def _delete(self, row, col):
+        """Удаление строки и столбца из квадратной матрицы (оба должны быть свободны
+        или назначены друг другу)"""
+
+        self._cost = np.delete(np.delete(self._cost, row, axis=0), col, axis=1)
+        self._u = np.delete(self._u, row)
+        self._v = np.delete(self._v, col)
+        self._col4row = np.delete(self._col4row, row)
+        self._row4col = np.delete(self._row4col, col)
+        self._col4row[self._col4row > col] -= 1
+        self._row4col[self._row4col > row] -= 1
+
+    def update_row(self, agent, costs):
+        """Новые сроки исполнителя agent по всем объектам"""
+
+        self._check(agent, self.n_agents, 'исполнителя')
+        costs = self._values(costs, self.n_tasks)
+        state = self._state()
+        old = self._cost[agent, :self.n_tasks].copy()
+
+        self._cost[agent, :self.n_tasks] = costs
+        self._free_row(agent)
+        # Потенциал свободной строки - минимальная приведенная стоимость
+        self._u[agent] = np.min(self._cost[agent] - self._v)
+        self._repair(agent, state, lambda: self._cost.__setitem__((agent, slice(0, self.n_tasks)), old))
+
+    def update_col(self, task, costs):
+        """Новые сроки всех исполнителей на объекте task"""
+
+        self._check(task, self.n_tasks, 'объекта')
+        costs = self._values(costs, self.n_agents)
+        state = self._state()
+        old = self._cost[:self.n_agents, task].copy()
+
+        self._cost[:self.n_agents, task] = costs
+        row = self._row4col[task]
+        self._free_row(row)
+        self._v[task] = np.min(self._cost[:, task] - self._u)
+        self._repair(row, state, lambda: self._cost.__setitem__((slice(0, self.n_agents), task), old))
+
+    def add_agent(self, costs):
+        """Новый исполнитель со сроками по всем объектам; возвращает его номер"""
+
+        costs = self._values(costs, self.n_tasks)
+        state = self._state()
+        agent = self.n_agents
+
+        if self.n_agents < self.n_tasks:
+            # Исполнитель занимает место первой фиктивной строки
+            old = self._cost[agent].copy()
+            self._cost[agent, :self.n_tasks] = costs
+            self.n_agents += 1
+            self._free_row(agent)
+            self._u[agent] = np.min(self._cost[agent] - self._v)
+            self._repair(agent, state, lambda: self._cost.__setitem__(agent, old))
+            return agent
+
+        # Матрица растет на строку и фиктивный столбец
+        size = self._cost.shape[0]
+        cost = np.zeros((size + 1, size + 1))
+        cost[:size, :size] = self._cost
+        cost[size, :self.n_tasks] = costs
+        self._cost = cost
+        self._v = np.append(self._v, np.min(-self._u) if size else 0.0)
+        self._u = np.append(self._u, np.min(self._cost[size] - self._v))
+        self._col4row = np.append(self._col4row, -1)
+        self._row4col = np.append(self._row4col, -1)
+        self.n_agents += 1
+        self._repair(size, state)
+        return agent
+
+    def remove_task(self, task):
+        """Удаление объекта; объекты с большими номерами сдвигаются на один"""
+
+        self._check(task, self.n_tasks, 'объекта')
+        state = self._state()
+        row = self._row4col[task]
+
+        if self.n_agents < self.n_tasks:
+            # Вместе с объектом удаляется одна фиктивная строка
+            if row >= self.n_agents:
+                self._delete(row, task)
+                self.n_tasks -= 1
+                return
+            dummy = self.n_agents
+            self._free_row(row)
+            self._free_row(dummy)
+            self._delete(dummy, task)
+            self.n_tasks -= 1
+            self._repair(row, state)
+            return
+
+        # Объект заменяется фиктивным столбцом в конце матрицы
+        self._free_row(row)
+        cost = np.delete(self._cost, task, axis=1)
+        self._cost = np.hstack([cost, np.zeros((cost.shape[0], 1))])
+        self._v = np.append(np.delete(self._v, task), np.min(-self._u))
+        self._row4col = np.append(np.delete(self._row4col, task), -1)
+        self._col4row[self._col4row > task] -= 1
+        self.n_tasks -= 1
+        self._repair(row, state)
+
+
+def assignment_to_records(time_matrix, rows, cols, times=None):
+    """Назначения в формате ведомости: структурированный массив brigade, object, time
+
+    times - сроки выбранных пар; если не заданы, берутся из time_matrix.
+    """
+
+    if times is None:
+        times = np.asarray(time_matrix)[rows, cols]
+    return np.rec.fromarrays([np.asarray(rows, dtype=np.int64) + 1, np.asarray(cols, dtype=np.int64) + 1,
+                              np.asarray(times)], names='brigade,object,time')
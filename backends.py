@@ -0,0 +1,376 @@
+import os
+import time
+from math import gcd
+from functools import reduce
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+from allocation import solve_mckp
+from assignment import sparse_assignment
+from lp_matrix import ModelSolution, pulp_solution
+from metrics import phase, record
+from transport import solve_transport
+
+# Переменные окружения для настройки без правки кода:
+#   MS_THREADS    - число потоков решателя (CBC)
+#   MS_TIME_LIMIT - ограничение времени решения, с
+ENV_THREADS = 'MS_THREADS'
+ENV_TIME_LIMIT = 'MS_TIME_LIMIT'
+
+# Классы задач и решатели, которые выбираются для них автоматически
+ROUTES = {
+    'assignment': 'assignment',  # венгерский алгоритм на разреженном графе (LAPJVsp)
+    'transport': 'transport',    # метод Фогеля + метод потенциалов
+    'knapsack': 'knapsack',      # динамическое программирование
+    'lp': 'highs',
+    'mip': 'highs',
+}
+BACKENDS = ('assignment', 'transport', 'knapsack', 'highs', 'cbc')
+
+KNAPSACK_MAX_STATES = 5 * 10 ** 7  # Предел (предметов × вместимость) для DP
+
+_config = {'threads': None, 'time_limit': None}
+
+
+def configure(threads=None, time_limit=None):
+    """Программная настройка; имеет приоритет над переменными окружения
+
+    threads - число потоков (передается в CBC; HiGHS из SciPy выбирает сам),
+    time_limit - ограничение времени решения в секундах.
+    """
+
+    _config.update(threads=threads, time_limit=time_limit)
+
+
+def _setting(key, env, cast):
+    if _config[key] is not None:
+        return _config[key]
+    value = os.environ.get(env)
+    return cast(value) if value else None
+
+
+def _rows(model):
+    """Ограничения модели как границы сумм: lo <= A @ x <= hi"""
+
+    A = sp.vstack([model.A_ub, model.A_eq], format='csr')
+    m_ub = model.b_ub.size
+    lo = np.concatenate([np.full(m_ub, -np.inf), model.b_eq])
+    hi = np.concatenate([model.b_ub, model.b_eq])
+    return A, lo, hi
+
+
+def _row_signs(A):
+    """Знак коэффициентов каждой строки (0, если знаки в строке разные или строка пустая)"""
+
+    data = np.sign(A.data)
+    rows = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    lo = np.full(A.shape[0], 2.0)
+    hi = np.full(A.shape[0], -2.0)
+    np.minimum.at(lo, rows, data)
+    np.maximum.at(hi, rows, data)
+    return np.where(lo == hi, hi, 0.0)
+
+
+def _two_coloring(pairs, category):
+    """Раскраска строк в две доли по столбцам-ребрам (None, если граф не двудольный)
+
+    Компоненты связности раскрашиваются независимо; каждая ориентируется
+    так, чтобы в доле 0 оказались строки того же вида (category), что и в
+    доле 0 первой компоненты.
+    """
+
+    size = category.size
+    graph = sp.csr_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(size, size))
+    _, labels = connected_components(graph, directed=False)
+    roots = np.unique(labels, return_index=True)[1]
+    color = np.full(size, -1)
+    for root in roots:
+        order, pred = breadth_first_order(graph, root, directed=False)
+        color[root] = 0
+        for node in order[1:]:
+            color[node] = 1 - color[pred[node]]
+    if (color[pairs[:, 0]] == color[pairs[:, 1]]).any():
+        return None
+    flip = category[roots] != category[roots[0]]
+    return color ^ flip[labels]
+
+
+def _bipartite(model):
+    """Структура сетевой задачи: каждый столбец - дуга между двумя строками-долями
+
+    Возвращает (rows, cols, lo_s, hi_s, lo_t, hi_t): номера узлов долей для
+    каждой переменной и границы сумм по узлам; None для других моделей.
+    """
+
+    if (model.lower != 0).any():
+        return None
+    A, lo, hi = _rows(model)
+    # Пустые строки не входят в сеть: допустимы, только если 0 лежит в их границах
+    used = np.diff(A.indptr) > 0
+    if ((lo[~used] > 0) | (hi[~used] < 0)).any():
+        return None
+    A, lo, hi = A[used].tocsc(), lo[used], hi[used]
+    if A.shape[0] == 0 or (np.diff(A.indptr) != 2).any() or (np.abs(A.data) != 1).any():
+        return None
+    signs = _row_signs(A.tocsr())
+    if (signs == 0).any():
+        return None
+
+    # Строка со знаком -1 - это ограничение на сумму с обратными границами
+    lo, hi = np.where(signs > 0, lo, -hi), np.where(signs > 0, hi, -lo)
+    pairs = A.indices.reshape(-1, 2)
+    category = np.select([lo == hi, np.isneginf(lo), np.isposinf(hi)], [0, 1, 2], 3)
+    color = _two_coloring(pairs, category)
+    if color is None:
+        return None
+
+    side_s, side_t = np.flatnonzero(color == 0), np.flatnonzero(color == 1)
+    index = np.empty(A.shape[0], dtype=np.int64)
+    index[side_s] = np.arange(side_s.size)
+    index[side_t] = np.arange(side_t.size)
+    first_s = color[pairs[:, 0]] == 0
+    s = np.where(first_s, pairs[:, 0], pairs[:, 1])
+    t = np.where(first_s, pairs[:, 1], pairs[:, 0])
+    return index[s], index[t], lo[side_s], hi[side_s], lo[side_t], hi[side_t]
+
+
+def _assignment_structure(model):
+    """Задача о назначениях: все границы сумм равны 1, одна доля покрывается полностью"""
+
+    net = _bipartite(model)
+    if net is None or (model.upper < 1).any():
+        return None
+    rows, cols, lo_s, hi_s, lo_t, hi_t = net
+    if (hi_s != 1).any() or (hi_t != 1).any():
+        return None
+    full_s = (lo_s == 1).all() and lo_s.size > 0
+    full_t = (lo_t == 1).all() and lo_t.size > 0
+    if not (np.isneginf(lo_s) | (lo_s == 1)).all() or not (np.isneginf(lo_t) | (lo_t == 1)).all():
+        return None
+    # Полностью покрывается меньшая доля (в ней все ограничения - равенства).
+    # Равенства в долях разного размера несовместны - такую модель решает
+    # общий решатель, чтобы получить статус Infeasible
+    if full_s and full_t:
+        if lo_s.size != lo_t.size:
+            return None
+        return rows, cols, (lo_s.size, lo_t.size)
+    if full_s and lo_s.size <= lo_t.size:
+        return rows, cols, (lo_s.size, lo_t.size)
+    if full_t and lo_t.size <= lo_s.size:
+        return cols, rows, (lo_t.size, lo_s.size)
+    return None
+
+
+def _transport_structure(model):
+    """Транспортная задача на полной сетке: мощности (<=) и потребности (>= или =)
+
+    Метод потенциалов требует всех маршрутов и неотрицательных затрат.
+    """
+
+    if model.sense != 'min' or (model.c < 0).any() or not np.isinf(model.upper).all():
+        return None
+    net = _bipartite(model)
+    if net is None:
+        return None
+    rows, cols, lo_s, hi_s, lo_t, hi_t = net
+    for supply_side in (0, 1):
+        if supply_side:
+            rows, cols, lo_s, hi_s, lo_t, hi_t = cols, rows, lo_t, hi_t, lo_s, hi_s
+        if np.isneginf(lo_s).all() and np.isfinite(hi_s).all() and \
+                np.isfinite(lo_t).all() and (np.isinf(hi_t) | (hi_t == lo_t)).all():
+            m, n = hi_s.size, lo_t.size
+            if rows.size != m * n or np.unique(rows * n + cols).size != m * n:
+                return None
+            if model.is_mip and ((hi_s != np.round(hi_s)).any() or (lo_t != np.round(lo_t)).any()):
+                return None
+            return rows, cols, hi_s, lo_t
+    return None
+
+
+def _knapsack_structure(model):
+    """Рюкзак с выбором: бинарные переменные, по одной из каждой группы, одна строка веса"""
+
+    if not model.integrality.all() or (model.lower != 0).any() or (model.upper != 1).any():
+        return None
+    A, lo, hi = _rows(model)
+    A = A.tocsr()
+    counts = np.diff(A.indptr)
+    signs = _row_signs(A)
+    not_one = np.zeros(A.shape[0], dtype=bool)
+    not_one[np.repeat(np.arange(A.shape[0]), counts)[A.data != 1]] = True
+    group_rows = ~not_one & (lo == 1) & (hi == 1) & (counts > 0)
+    weight_rows = np.flatnonzero(~group_rows)
+    if weight_rows.size == 0:
+        # Строка веса из единиц с правой частью 1 выглядит как строка группы:
+        # это та строка, что покрывает все столбцы, входящие в две строки
+        twice = np.bincount(A.indices, minlength=A.shape[1]) == 2
+        row_of = np.repeat(np.arange(A.shape[0]), counts)
+        in_twice = np.bincount(row_of, weights=twice[A.indices], minlength=A.shape[0])
+        weight_rows = np.flatnonzero((in_twice == counts) & (counts == twice.sum()))[:1]
+        group_rows[weight_rows] = False
+    if weight_rows.size != 1:
+        return None
+    w_row = weight_rows[0]
+    if signs[w_row] < 0 or not np.isfinite(hi[w_row]):
+        return None
+    exact = lo[w_row] == hi[w_row]
+    if not exact and np.isfinite(lo[w_row]):
+        return None
+
+    G = A[np.flatnonzero(group_rows)].tocsc()
+    if (np.diff(G.indptr) != 1).any():
+        return None
+    groups = G.indices
+    weights = np.asarray(A[w_row].todense()).ravel()
+    capacity = hi[w_row]
+    if (weights != np.round(weights)).any() or capacity != round(capacity) or capacity < 0:
+        return None
+    step = reduce(gcd, [int(w) for w in np.unique(weights)] + [int(capacity)]) or 1
+    if model.num_cols * (capacity // step + 1) > KNAPSACK_MAX_STATES:
+        return None
+    return groups, weights.astype(np.int64), int(capacity), exact
+
+
+def classify(model):
+    """Класс задачи по структуре матрицы: 'assignment', 'transport', 'knapsack', 'lp' или 'mip'"""
+
+    for kind, (detect, _) in STRUCTURES.items():
+        if detect(model) is not None:
+            return kind
+    return 'mip' if model.is_mip else 'lp'
+
+
+def _solve_assignment(model, structure):
+    rows, cols, shape = structure
+    sign = -1.0 if model.sense == 'max' else 1.0
+    k = np.arange(rows.size)
+    # Номер переменной для каждой пары, чтобы вернуть решение в порядке модели
+    lookup = sp.csr_matrix((k + 1, (rows, cols)), shape=shape)
+    try:
+        r, c = sparse_assignment(rows, cols, sign * model.c, shape)
+    except ValueError:
+        return ModelSolution('Infeasible', None, None)
+    x = np.zeros(model.num_cols)
+    x[np.asarray(lookup[r, c]).ravel() - 1] = 1.0
+    return ModelSolution('Optimal', float(model.c @ x), x)
+
+
+def _solve_transport(model, structure):
+    rows, cols, supply, demand = structure
+    if supply.sum() < demand.sum():
+        return ModelSolution('Infeasible', None, None)
+    cost = np.empty((supply.size, demand.size))
+    cost[rows, cols] = model.c
+    flows, objective = solve_transport(supply, demand, cost)
+    return ModelSolution('Optimal', objective, flows[rows, cols])
+
+
+def _solve_knapsack(model, structure):
+    groups, weights, capacity, exact = structure
+    sign = -1.0 if model.sense == 'min' else 1.0
+    try:
+        chosen, _ = solve_mckp(groups, weights, sign * model.c, capacity, exact)
+    except ValueError:
+        return ModelSolution('Infeasible', None, None)
+    x = np.zeros(model.num_cols)
+    x[chosen] = 1.0
+    return ModelSolution('Optimal', float(model.c @ x), x)
+
+
+def _solve_highs(model, threads, time_limit):
+    return model.solve(time_limit=time_limit)
+
+
+def _solve_cbc(model, threads, time_limit):
+    """Резервный решатель: модель передается в PuLP/CBC по строкам CSR"""
+
+    from pulp import (LpProblem, LpVariable, LpAffineExpression, LpConstraint, LpMinimize,
+                      LpMaximize, LpConstraintLE, LpConstraintEQ, LpStatus, PULP_CBC_CMD)
+
+    prob = LpProblem(model.name, LpMaximize if model.sense == 'max' else LpMinimize)
+    x = [LpVariable(f"X{j}", None if np.isinf(lo) else lo, None if np.isinf(up) else up,
+                    cat='Integer' if kind else 'Continuous')
+         for j, (lo, up, kind) in enumerate(zip(model.lower, model.upper, model.integrality))]
+    prob += LpAffineExpression([(x[j], c) for j, c in enumerate(model.c) if c != 0])
+    for A, b, sense, prefix in ((model.A_ub, model.b_ub, LpConstraintLE, 'U'),
+                                (model.A_eq, model.b_eq, LpConstraintEQ, 'E')):
+        for r in range(b.size):
+            start, end = A.indptr[r], A.indptr[r + 1]
+            expr = LpAffineExpression([(x[j], a) for j, a in zip(A.indices[start:end], A.data[start:end])])
+            prob += LpConstraint(expr, sense, f"{prefix}{r}", b[r])
+
+    prob.solve(PULP_CBC_CMD(msg=False, threads=threads, timeLimit=time_limit))
+    if LpStatus[prob.status] != 'Optimal':
+        return ModelSolution(LpStatus[prob.status], None, None)
+    solution = pulp_solution(prob, x)
+    # Переменные, не вошедшие ни в одно выражение, CBC не возвращает
+    missing = np.isnan(solution.x)
+    solution.x[missing] = np.clip(0.0, model.lower, model.upper)[missing]
+    return solution
+
+
+# Специальные алгоритмы: распознавание структуры и решение по ней
+STRUCTURES = {
+    'assignment': (_assignment_structure, _solve_assignment),
+    'transport': (_transport_structure, _solve_transport),
+    'knapsack': (_knapsack_structure, _solve_knapsack),
+}
+
+# Решатели общего назначения
+SOLVERS = {
+    'highs': _solve_highs,
+    'cbc': _solve_cbc,
+}
+
+
+def solve(model, backend='auto', threads=None, time_limit=None):
+    """Решение LinearModel подходящим решателем
+
+    backend='auto' определяет класс задачи по структуре матрицы (classify)
+    и выбирает решатель по ROUTES: задачи о назначениях, транспортные задачи
+    на полной сетке и рюкзаки с выбором небольшой вместимости решаются
+    специальными алгоритмами, остальные ЛП/ЦЛП - HiGHS; CBC - запасной
+    вариант, если HiGHS завершился ошибкой. Можно указать решатель явно
+    (BACKENDS). threads и time_limit по умолчанию берутся из configure()
+    или переменных окружения MS_THREADS, MS_TIME_LIMIT; специальные
+    алгоритмы их не используют.
+
+    Возвращает ModelSolution с полями backend (использованный решатель),
+    kind (класс задачи) и solve_time; решатель и время записываются в метрики.
+    """
+
+    if backend != 'auto' and backend not in BACKENDS:
+        raise ValueError(f"Неизвестный решатель: {backend}")
+    threads = threads if threads is not None else _setting('threads', ENV_THREADS, int)
+    time_limit = time_limit if time_limit is not None else _setting('time_limit', ENV_TIME_LIMIT, float)
+
+    with phase('classify'):
+        kind, structure = 'mip' if model.is_mip else 'lp', None
+        for name, (detect, _) in STRUCTURES.items():
+            if backend in ('auto', name):
+                structure = detect(model)
+                if structure is not None:
+                    kind = name
+                    break
+    if backend in STRUCTURES and structure is None:
+        raise ValueError(f"Модель {model.name} не подходит для решателя '{backend}'")
+    chosen = ROUTES[kind] if backend == 'auto' else backend
+
+    start = time.perf_counter()
+    if chosen in STRUCTURES:
+        solution = STRUCTURES[chosen][1](model, structure)
+    else:
+        try:
+            solution = SOLVERS[chosen](model, threads, time_limit)
+        except Exception:
+            if backend != 'auto' or chosen == 'cbc':
+                raise
+            chosen = 'cbc'
+            solution = _solve_cbc(model, threads, time_limit)
+    solution.solve_time = time.perf_counter() - start
+    solution.backend = chosen
+    solution.kind = kind
+    record(backend=chosen)
+    return solution
@@ -0,0 +1,273 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import ex1
+import ex2
+import ex3
+import ex4
+import metrics
+from bench_ex2 import random_instance as random_transport
+
+PHASES = ('build', 'solve', 'extract', 'report')
+
+# Размеры по умолчанию: контрольный пример, средняя и крупная задача
+DEFAULT_SIZES = {
+    'ex1': [(3, 5), (200, 100), (2000, 500)],       # видов продукции × ресурсов
+    'ex2': [(2, 2), (50, 500), (200, 2000)],        # поставщиков × потребителей
+    'ex3': [(4,), (200,), (1000,)],                 # бригад = объектов
+    'ex4': [(4, 5), (50, 20), (200, 60)],           # объектов × уровней численности
+}
+
+METHODS = {
+    'ex1': ['highs'],
+    'ex2': ['auto', 'modi', 'highs', 'pulp'],
+    'ex3': ['auto', 'hungarian', 'anytime', 'highs', 'pulp'],
+    'ex4': ['auto', 'dp', 'lagrange', 'anytime', 'highs', 'pulp'],
+}
+
+
+def random_production(products, resources, rng):
+    """Задача производства: N видов продукции, M ресурсов с положительными нормами расхода"""
+
+    profit = rng.integers(1, 100, size=products).astype(float)
+    norms = rng.integers(1, 50, size=(resources, products)).astype(float)
+    capacity = rng.integers(100, 1000, size=resources) * max(1, products // 10)
+    return profit, norms, capacity.astype(float)
+
+
+def random_assignment(n, rng):
+    """Целочисленная матрица сроков n × n"""
+
+    return rng.integers(1, 1000, size=(n, n))
+
+
+def random_allocation(objects, levels, rng):
+    """Распределение рабочих: K объектов, L уровней численности с шагом step
+
+    Объем СМР растет с числом рабочих, общее число рабочих C выбирается
+    так, чтобы допустимое распределение существовало.
+    """
+
+    step = int(rng.integers(5, 20))
+    count = step * np.arange(levels)
+    increments = rng.integers(1, 10, size=(levels - 1, objects))
+    CMR = np.vstack([np.zeros((1, objects), dtype=int), np.cumsum(increments, axis=0)])
+    C = int(count[rng.integers(0, levels, size=objects)].sum())
+    return count, CMR, C
+
+
+def _case_call(model, size, method, seed):
+    """Функция без аргументов, решающая экземпляр модели размера size"""
+
+    rng = np.random.default_rng([seed, *size])
+    if model == 'ex1':
+        profit, norms, capacity = random_production(*size, rng)
+        return lambda: ex1.solve_with_highs(profit, norms, capacity, report=True)
+    if model == 'ex2':
+        supply, demand, cost = random_transport(*size, rng)
+        return lambda: ex2.solve_ex2(supply, demand, cost, method=method, report=True)
+    if model == 'ex3':
+        time_matrix = random_assignment(*size, rng)
+        return lambda: ex3.solve_assignment_compact(time_matrix, method=method, report=True)
+    if model == 'ex4':
+        count, CMR, C = random_allocation(*size, rng)
+        return lambda: ex4.ex_4(count, CMR, C, method=method, report=True)
+    raise ValueError(f"Неизвестная модель: {model}")
+
+
+def _num_vars(model, size):
+    return size[0] * size[1] if len(size) == 2 else size[0] ** 2
+
+
+def _run_once(call, memory=False):
+    """Запуск точки входа с перехватом записи метрик; вывод в консоль подавляется"""
+
+    records = []
+    callback = metrics.add_metrics_callback(records.append)
+    if memory:
+        tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            call()
+    finally:
+        metrics.remove_metrics_callback(callback)
+        if memory:
+            records[-1]['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return records[-1]
+
+
+def run_benchmark(models=('ex1', 'ex2', 'ex3', 'ex4'), sizes=None, methods=None, repeat=3,
+                  memory=True, pulp_max_vars=20000, seed=0):
+    """Замер фаз build / solve / extract / report по моделям, методам и размерам
+
+    Время каждой фазы - из лучшего по общему времени из repeat запусков.
+    Пиковая память (tracemalloc, без памяти подпроцесса CBC) измеряется
+    отдельным запуском, чтобы трассировка не искажала время. Ведомости
+    пишутся во временный каталог. Возвращает список записей.
+    """
+
+    sizes = sizes or {}
+    methods = methods or {}
+    results = []
+
+    print(f"{'Модель':<6} {'Метод':<10} {'Размер':>10} " +
+          " ".join(f"{p + ', с':>10}" for p in PHASES) +
+          f" {'Всего, с':>10} {'Память, МБ':>11} {'ЦФ':>14}")
+    print("-" * 122)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for model in models:
+                for size in sizes.get(model, DEFAULT_SIZES[model]):
+                    for method in methods.get(model, METHODS[model]):
+                        if method == 'pulp' and _num_vars(model, size) > pulp_max_vars:
+                            continue
+                        call = _case_call(model, tuple(size), method, seed)
+                        runs = [_run_once(call) for _ in range(repeat)]
+                        best = min(runs, key=lambda r: r['total_time'])
+                        peak = _run_once(call, memory=True)['peak_memory'] if memory else None
+
+                        entry = {
+                            'model': model,
+                            'method': method,
+                            'size': 'x'.join(str(k) for k in size),
+                            'phases': {p: best['phases'].get(p) for p in PHASES},
+                            'total_time': best['total_time'],
+                            'peak_memory': peak,
+                            'status': best['status'],
+                            'objective': best['objective'],
+                            'rows': best['rows'],
+                            'cols': best['cols'],
+                            'nnz': best['nnz'],
+                        }
+                        results.append(entry)
+                        _print_entry(entry)
+        finally:
+            os.chdir(cwd)
+
+    return results
+
+
+def _fmt(value, width, digits=4):
+    return f"{value:{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+
+def _print_entry(entry):
+    peak = entry['peak_memory'] / 2 ** 20 if entry['peak_memory'] is not None else None
+    objective = entry['objective']
+    print(f"{entry['model']:<6} {entry['method']:<10} {entry['size']:>10} " +
+          " ".join(_fmt(entry['phases'][p], 10) for p in PHASES) +
+          f" {_fmt(entry['total_time'], 10)} {_fmt(peak, 11, 1)} "
+          f"{_fmt(objective, 14, 2) if objective is not None else '-':>14}")
+
+
+def save_results(results, filename, seed=0):
+    """Сохранение результатов прогона в JSON вместе с описанием окружения"""
+
+    data = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'seed': seed,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'results': results,
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    return filename
+
+
+def compare_results(baseline, current, threshold=0.1, min_delta=1e-3):
+    """Таблица сравнения двух прогонов: время фаз, общее время и пиковая память
+
+    baseline, current - списки записей или имена JSON-файлов save_results.
+    Отношение больше 1 + threshold помечается как регрессия ('!'), если
+    время выросло не меньше чем на min_delta секунд (шум коротких фаз не
+    отмечается). Возвращает список строк сравнения.
+    """
+
+    if isinstance(baseline, str):
+        with open(baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    if isinstance(current, str):
+        with open(current, encoding='utf-8') as f:
+            current = json.load(f)['results']
+
+    key = lambda r: (r['model'], r['method'], r['size'])
+    base = {key(r): r for r in baseline}
+
+    print(f"{'Модель':<6} {'Метод':<10} {'Размер':>10} {'Показатель':<12} "
+          f"{'Было':>10} {'Стало':>10} {'Отношение':>10}")
+    print("-" * 74)
+
+    rows = []
+    for entry in current:
+        old = base.get(key(entry))
+        if old is None:
+            continue
+        pairs = [(p, old['phases'].get(p), entry['phases'].get(p)) for p in PHASES]
+        pairs.append(('total', old['total_time'], entry['total_time']))
+        pairs.append(('memory_mb',
+                      old['peak_memory'] / 2 ** 20 if old['peak_memory'] is not None else None,
+                      entry['peak_memory'] / 2 ** 20 if entry['peak_memory'] is not None else None))
+        for metric, before, after in pairs:
+            if before is None or after is None:
+                continue
+            ratio = after / before if before > 0 else None
+            noise = metric != 'memory_mb' and after - before < min_delta
+            flag = '!' if ratio is not None and ratio > 1 + threshold and not noise else ''
+            print(f"{entry['model']:<6} {entry['method']:<10} {entry['size']:>10} {metric:<12} "
+                  f"{before:10.4f} {after:10.4f} {_fmt(ratio, 9, 2)}{flag:1}")
+            rows.append({'model': entry['model'], 'method': entry['method'], 'size': entry['size'],
+                         'metric': metric, 'before': before, 'after': after, 'ratio': ratio,
+                         'regression': bool(flag)})
+
+    return rows
+
+
+def _parse_sizes(values):
+    """Размеры вида ex2=50x500 -> {'ex2': [(50, 500)]}"""
+
+    sizes = {}
+    for value in values or []:
+        model, size = value.split('=')
+        sizes.setdefault(model, []).append(tuple(int(k) for k in size.split('x')))
+    return sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк всех четырех моделей (ex1-ex4)")
+    parser.add_argument('--models', nargs='+', default=['ex1', 'ex2', 'ex3', 'ex4'])
+    parser.add_argument('--size', nargs='+', default=None,
+                        help="Размеры вида ex1=200x100 ex2=50x500 ex3=200 ex4=50x20")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="Не измерять пиковую память")
+    parser.add_argument('--pulp-max-vars', type=int, default=20000,
+                        help="Не запускать PuLP, если переменных больше указанного")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="Сохранить результаты в JSON")
+    parser.add_argument('--compare', default=None, help="JSON прошлого прогона для сравнения")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Допустимый рост времени/памяти до пометки регрессии")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.models, _parse_sizes(args.size), repeat=args.repeat,
+                            memory=not args.no_memory, pulp_max_vars=args.pulp_max_vars,
+                            seed=args.seed)
+    if args.output:
+        save_results(results, args.output, args.seed)
+    if args.compare:
+        print()
+        compare_results(args.compare, results, args.threshold)
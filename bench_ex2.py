@@ -0,0 +1,88 @@
+import argparse
+import time
+
+import numpy as np
+from pulp import LpStatus, PULP_CBC_CMD, value
+
+from transport import solve_transport
+from ex2 import build_transport_pulp, build_transport_model
+
+def random_instance(m, n, rng):
+    """Случайная транспортная задача с запасом мощности карьеров 10%"""
+
+    cost = rng.integers(1, 100, size=(m, n)).astype(float)
+    demand = rng.integers(1, 50, size=n).astype(float)
+    supply = np.full(m, np.ceil(demand.sum() * 1.1 / m))
+    return supply, demand, cost
+
+def run_benchmark(sizes=((2, 2), (30, 300), (100, 1000), (300, 3000)), pulp_max_cells=None, seed=0):
+    """Сравнение метода потенциалов, матричной модели (HiGHS) и PuLP/CBC
+
+    Для HiGHS и PuLP построение модели и решение замеряются отдельно.
+    """
+
+    rng = np.random.default_rng(seed)
+    results = []
+
+    print(f"{'Размер':>10} {'MODI, с':>10} {'CSR модель, с':>16} {'HiGHS, с':>10} "
+          f"{'PuLP модель, с':>16} {'PuLP решение, с':>16} {'Совпадает':>10}")
+    print("-" * 94)
+
+    for m, n in sizes:
+        supply, demand, cost = random_instance(m, n, rng)
+
+        start = time.perf_counter()
+        _, total = solve_transport(supply, demand, cost)
+        modi_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model = build_transport_model(supply, demand, cost)
+        matrix_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        solution = model.solve()
+        highs_time = time.perf_counter() - start
+        match = abs(solution.objective - total) <= 1e-6 * max(1.0, total)
+
+        build_time = solve_time = None
+        if pulp_max_cells is None or m * n <= pulp_max_cells:
+            start = time.perf_counter()
+            prob, _ = build_transport_pulp(supply, demand, cost)
+            build_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            prob.solve(PULP_CBC_CMD(msg=False))
+            solve_time = time.perf_counter() - start
+            match = match and LpStatus[prob.status] == 'Optimal' \
+                and abs(value(prob.objective) - total) <= 1e-6 * max(1.0, total)
+
+        fmt = lambda t: f"{t:16.3f}" if t is not None else f"{'пропуск':>16}"
+        match_str = 'да' if match else 'НЕТ'
+        print(f"{f'{m}x{n}':>10} {modi_time:10.3f} {matrix_time:16.3f} {highs_time:10.3f} "
+              f"{fmt(build_time)} {fmt(solve_time)} {match_str:>10}")
+
+        results.append({
+            'm': m,
+            'n': n,
+            'modi': modi_time,
+            'matrix_build': matrix_time,
+            'highs': highs_time,
+            'pulp_build': build_time,
+            'pulp_solve': solve_time,
+            'total_cost': total,
+            'match': match
+        })
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк транспортной задачи (ex2)")
+    parser.add_argument('--sizes', nargs='+', default=['2x2', '30x300', '100x1000', '300x3000'],
+                        help="Размеры в виде MxN")
+    parser.add_argument('--pulp-max-cells', type=int, default=None,
+                        help="Не запускать PuLP, если M*N больше указанного")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = [tuple(int(k) for k in size.split('x')) for size in args.sizes]
+    run_benchmark(sizes, args.pulp_max_cells, args.seed)
@@ -0,0 +1,57 @@
+import argparse
+import time
+
+import numpy as np
+
+from assignment import linear_sum_assignment
+from ex3 import solve_assignment_pulp
+
+def run_benchmark(sizes=(4, 100, 500, 2000), pulp_max_n=None, seed=0):
+    """Сравнение венгерского алгоритма и PuLP/CBC на случайных матрицах времени"""
+
+    rng = np.random.default_rng(seed)
+    results = []
+
+    print(f"{'n':>6} {'Венгерский, с':>15} {'PuLP, с':>12} {'Время':>12} {'Совпадает':>10}")
+    print("-" * 60)
+
+    for n in sizes:
+        # Целочисленная матрица сроков в днях
+        time_matrix = rng.integers(1, 1000, size=(n, n))
+
+        start = time.perf_counter()
+        rows, cols = linear_sum_assignment(time_matrix)
+        hungarian_time = time.perf_counter() - start
+        total = int(time_matrix[rows, cols].sum())
+
+        pulp_time = None
+        match = None
+        if pulp_max_n is None or n <= pulp_max_n:
+            start = time.perf_counter()
+            _, p_rows, p_cols = solve_assignment_pulp(time_matrix)
+            pulp_time = time.perf_counter() - start
+            match = int(time_matrix[p_rows, p_cols].sum()) == total
+
+        pulp_str = f"{pulp_time:12.3f}" if pulp_time is not None else f"{'пропуск':>12}"
+        match_str = {None: '-', True: 'да', False: 'НЕТ'}[match]
+        print(f"{n:>6} {hungarian_time:15.4f} {pulp_str} {total:>12} {match_str:>10}")
+
+        results.append({
+            'n': n,
+            'hungarian': hungarian_time,
+            'pulp': pulp_time,
+            'total_time': total,
+            'match': match
+        })
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк задачи о назначениях (ex3)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4, 100, 500, 2000])
+    parser.add_argument('--pulp-max-n', type=int, default=None,
+                        help="Не запускать PuLP для n больше указанного")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, args.pulp_max_n, args.seed)
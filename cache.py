@@ -0,0 +1,185 @@
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def _feed(digest, value):
+    """Добавляет значение в хеш вместе с типом и формой, чтобы [1, 2] и [[1], [2]] различались"""
+
+    if value is None:
+        digest.update(b'N')
+        return
+    if isinstance(value, str):
+        data = value.encode('utf-8')
+        digest.update(b'S%d:' % len(data) + data)
+        return
+    array = np.asarray(value)
+    if array.dtype == bool:
+        array = array.astype(np.uint8)
+    elif array.dtype.kind in 'iuf':
+        # -0.0 и 0.0, а также целые и вещественные записи одного числа дают один ключ
+        array = array.astype(np.float64) + 0.0
+    else:
+        raise ValueError(f"Неподдерживаемый тип данных для ключа кеша: {array.dtype}")
+    digest.update(b'A' + array.dtype.str.encode() + repr(array.shape).encode())
+    digest.update(np.ascontiguousarray(array).tobytes())
+
+
+def fingerprint(*parts):
+    """Ключ кеша по набору строк, чисел и массивов (BLAKE2b, 32 байта в hex)"""
+
+    digest = hashlib.blake2b(digest_size=32)
+    for part in parts:
+        _feed(digest, part)
+    return digest.hexdigest()
+
+
+def _canonical_csr(A):
+    """CSR без явных нулей и дубликатов, индексы столбцов в строках отсортированы"""
+
+    A = sp.csr_matrix(A, dtype=float, copy=True)
+    A.sum_duplicates()
+    A.eliminate_zeros()
+    A.sort_indices()
+    return A
+
+
+def model_fingerprint(model):
+    """Ключ кеша для LinearModel по канонической форме модели
+
+    Учитываются направление оптимизации, коэффициенты ЦФ, матрицы
+    ограничений (отсортированные ненулевые коэффициенты по строкам),
+    правые части, границы переменных и признаки целочисленности. Имя
+    модели в ключ не входит.
+    """
+
+    parts = [model.sense, model.c]
+    for A, b in ((model.A_ub, model.b_ub), (model.A_eq, model.b_eq)):
+        A = _canonical_csr(A)
+        parts += [np.asarray(A.shape), A.indptr, A.indices, A.data, b]
+    parts += [model.lower, model.upper, model.integrality]
+    return fingerprint(*parts)
+
+
+def _dump(value):
+    """Словарь массивов и скаляров -> npz без pickle"""
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **{k: np.asarray(v) for k, v in value.items()})
+    return buffer.getvalue()
+
+
+def _load(blob):
+    with np.load(io.BytesIO(blob), allow_pickle=False) as data:
+        return {k: _freeze(data[k]) for k in data.files}
+
+
+def _freeze(value):
+    """0-мерные массивы -> скаляры Python, остальные массивы - только для чтения"""
+
+    if isinstance(value, np.ndarray):
+        if value.ndim == 0:
+            return value.item()
+        value.setflags(write=False)
+    return value
+
+
+class SolutionCache:
+    """Кеш оптимальных решений: LRU в памяти и необязательное хранилище SQLite
+
+    Значения - словари из массивов NumPy и скаляров (статус, значение ЦФ,
+    переменные). Массивы из кеша возвращаются только для чтения, без
+    копирования. При заданном path запись идет и в файл SQLite, так что
+    решения переживают перезапуск процесса; при промахе в памяти значение
+    ищется в файле. Кеш потокобезопасен.
+    """
+
+    def __init__(self, maxsize=256, path=None):
+        if maxsize < 1:
+            raise ValueError("maxsize должен быть положительным")
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS solutions "
+                             "(key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL)")
+            self._db.commit()
+
+    def get(self, key):
+        """Значение по ключу или None"""
+
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM solutions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = _load(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        value = {k: _freeze(np.array(v) if isinstance(v, np.ndarray) else v) for k, v in value.items()}
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)",
+                                 (key, _dump(value), time.time()))
+                self._db.commit()
+
+    def _remember(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self, disk=False):
+        """Очистка памяти (и файла SQLite при disk=True); счетчики обнуляются"""
+
+        with self._lock:
+            self._items.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            if disk and self._db is not None:
+                self._db.execute("DELETE FROM solutions")
+                self._db.commit()
+
+    def stats(self):
+        """Счетчики попаданий и промахов"""
+
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._items),
+                'maxsize': self.maxsize,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self):
+        return len(self._items)
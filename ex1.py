@@ -1,172 +1,239 @@
+import numpy as np
 from pulp import *
-import pandas as pd
 
-def solve_with_pulp():
-    #Создаем функцию и задаем задачу, название задачи, LpMaximize - максимизация ЦФ
-    prob = LpProblem("Ballast_Production", LpMaximize)
+import backends
+from lp_matrix import LinearModel, pulp_solution
+from simplex import SimplexModel
+from report import Column, ReportSpec, render_report, write_sensitivity_sheet
+from metrics import instrument, phase, record, record_model, record_solution
+from result import SolveResult, finish_result, print_lines
+
+# Данные задачи: прибыль по видам балласта, нормы расхода ресурсов и их запасы
+PROFIT = [6, 10, 12]
+RESOURCES = [
+    [13, 27, 24],  # Excavators
+    [8, 4, 6],     # Bulldozers
+    [50, 30, 50],  # Labor
+    [0, 1, 0],     # Demand_x2
+    [0, 0, 1]      # Demand_x3
+]
+CAPACITY = [230, 50, 610, 8, 5]
+CONSTRAINT_NAMES = ["Excavators", "Bulldozers", "Labor", "Demand_x2", "Demand_x3"]
+
+def build_production_model(profit=PROFIT, resources=RESOURCES, capacity=CAPACITY):
+    """Модель производства балласта в матричной форме"""
     
-    # Переменные решения, название, lowBound - неотрицательность (>=0), cat='Continuous' - непрерывные переменные
-    x1 = LpVariable("x1", lowBound=0, cat='Continuous')# Объем 1-го типа балласта (песчаного)
-    x2 = LpVariable("x2", lowBound=0, cat='Continuous')# Объем 2-го типа балласта (песчано-гравийного)
-    x3 = LpVariable("x3", lowBound=0, cat='Continuous')# Объем 3-го типа балласта (щебеночного)
+    return LinearModel(profit, A_ub=resources, b_ub=capacity, sense='max', name="Ballast_Production")
+
+@instrument('ex1')
+def solve_with_highs(profit=PROFIT, resources=RESOURCES, capacity=CAPACITY, backend='highs',
+                     report=False, verbose=True):
+    """Решение матричной модели через HiGHS
+    
+    backend - решатель backends.solve ('highs', 'cbc' или 'auto').
+    report - вывести ведомость сразу (True или имя файла); иначе ведомость
+    выводится по запросу result.report(). verbose=False отключает печать.
+    Возвращает SolveResult с массивом объемов x.
+    """
+    
+    with phase('build'):
+        model = build_production_model(profit, resources, capacity)
+    record_model(model)
+    with phase('solve'):
+        solution = backends.solve(model, backend)
+    record(method=backend)
+    record_solution(solution)
+    
+    result = production_result(solution.status, solution.objective, solution.x, profit, backend,
+                               solution=solution)
+    return finish_result(result, report, verbose)
+
+def production_result(status, objective, x, profit=PROFIT, method=None, prob=None, solution=None):
+    """SolveResult задачи производства: печать и ведомость по объемам x"""
+    
+    def show():
+        print("=" * 50)
+        print("РЕШЕНИЕ")
+        print("=" * 50)
+        print(f"Статус: {status}")
+        print(f"Максимальная прибыль: {objective:.2f} тыс. ден. ед.")
+        print(f"\nОптимальные объемы:")
+        print_lines(range(len(x)), lambda j: f"x{j+1} = {x[j]:.2f} тыс. м³")
+    
+    return SolveResult('ex1', status, objective, method, prob=prob, solution=solution, x=x,
+                       render=lambda filename: create_excel_report(x, profit, filename=filename),
+                       show=show, filename="VolumeStatement.xlsx")
+
+def build_production_simplex(profit=PROFIT, resources=RESOURCES, capacity=CAPACITY):
+    """Постоянная модель производства для повторных решений с теплым стартом
     
-    # Целевая функция
-    prob += 6*x1 + 10*x2 + 12*x3, "Total_Profit"
+    Ограничения доступны по именам: model.update_rhs("Labor", 650).
+    """
     
-    # Ограничения
-    prob += 13*x1 + 27*x2 + 24*x3 <= 230, "Excavators"
-    prob += 8*x1 + 4*x2 + 6*x3 <= 50, "Bulldozers"
-    prob += 50*x1 + 30*x2 + 50*x3 <= 610, "Labor"
-    prob += x2 <= 8, "Demand_x2"
-    prob += x3 <= 5, "Demand_x3"
+    return SimplexModel(profit, resources, capacity, sense='max', row_names=CONSTRAINT_NAMES)
+
+def compare_resolve(changes, model=None):
+    """Применяет последовательность изменений ресурсов и сравнивает теплое и холодное решение
     
-    # Решение задачи
-    prob.solve()
+    changes - список словарей {имя ограничения: новая правая часть}.
+    """
     
-    # Вывод результатов в консоль
-    print("=" * 50)
-    print("РЕШЕНИЕ")
-    print("=" * 50)
-    print(f"Статус: {LpStatus[prob.status]}")
-    print(f"Максимальная прибыль: {value(prob.objective):.2f} тыс. ден. ед.")
-    print(f"\nОптимальные объемы:")
-    for v in prob.variables():
-        print(f"{v.name} = {v.varValue:.2f} тыс. м³")
+    if model is None:
+        model = build_production_simplex()
+    model.solve()
     
-    # Создание Excel документа
-    create_excel_report(prob)
+    print(f"{'Изменение':<32} {'Прибыль':>10} {'Тепл., мс':>10} {'Итер.':>6} {'Хол., мс':>10} {'Итер.':>6}")
+    print("-" * 80)
     
-    return prob
-
-def create_excel_report(prob):
-    """Создание Excel ведомости в формате исходного документа"""
-    
-    # Получаем результаты
-    results = {}
-    for v in prob.variables():
-        results[v.name] = v.varValue
-    
-    # Создаем данные для таблицы
-    data = []
-    
-    # Заголовок таблицы
-    data.append(['Ведомость объема работ'])
-    data.append([])  # Пустая строка
-    
-    # Шапка таблицы
-    data.append(['№ пп', 'Наименование', 'Объем работ', '', 'Стоимость работ', ''])
-    data.append(['', '', 'Ед.изм.', 'Кол-во', 'Ед.изм.', 'Кол-во'])
-    data.append(['1', '2', '3', '4', '5', '6'])
-    
-    # Данные по балласту
-    data.append([
-        '1',
-        'Добыча и производство песчаного балласта',
-        'м³',
-        f"{results['x1']:.2f}",
-        'тыс.ден.ед',
-        f"{6 * results['x1']:.2f}"
-    ])
-    
-    data.append([
-        '2',
-        'Добыча и производство песчано-гравийного балласта',
-        'м³',
-        f"{results['x2']:.2f}",
-        'тыс.ден.ед',
-        f"{10 * results['x2']:.2f}"
-    ])
-    
-    data.append([
-        '3',
-        'Добыча и производство щебеночного балласта',
-        'м³',
-        f"{results['x3']:.2f}",
-        'тыс.ден.ед',
-        f"{12 * results['x3']:.2f}"
-    ])
-    
-    # Итоги
-    #total_volume = sum(results.values())
-    total_cost = 6*results['x1'] + 10*results['x2'] + 12*results['x3']
-    data.append(['Итого', '', '', '', '', f"{total_cost:.2f}"])
-    
-    # Пустые строки перед подписью
-    data.append([])
-    data.append([])
-    
-    # Подпись
-    data.append(['', '', '',  'Составил:','', 'Романова О.А.'])
-    
-    # Создаем DataFrame
-    df = pd.DataFrame(data)
-    
-    # Создаем Excel файл
-    filename = f"VolumeStatement.xlsx"
-    
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Ведомость', index=False, header=False)
-        
-        # Получаем workbook и worksheet для форматирования
-        workbook = writer.book
-        worksheet = writer.sheets['Ведомость']
-        
-        # Настраиваем ширину колонок
-        column_widths = [8, 50, 10, 14, 14, 14]
-        for i, width in enumerate(column_widths, 1):
-            worksheet.column_dimensions[chr(64 + i)].width = width
-        
-        # Форматируем заголовок
-        from openpyxl.styles import Font, Alignment, Border, Side
+    rows = []
+    for change in changes:
+        for name, rhs in change.items():
+            model.update_rhs(name, rhs)
+        warm = model.solve()
         
-        # Стиль для заголовка
-        title_font = Font(size=16, bold=True)
-        worksheet['A1'].font = title_font
-        worksheet.merge_cells('A1:F1')
-        worksheet['A1'].alignment = Alignment(horizontal='center')
+        # Холодное решение той же задачи на копии модели
+        cold_model = SimplexModel(model.c, model.A, model.b, sense=model.sense,
+                                  row_senses=model.row_senses, row_names=model.row_names)
+        cold = cold_model.solve()
         
-        # Стиль для шапки таблицы
-        header_font = Font(bold=True)
-        for row in range(3, 6):  # Строки с заголовками
-            for col in range(1, 7):
-                cell = worksheet.cell(row=row, column=col)
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Объединяем ячейки шапки
-        worksheet.merge_cells('A3:A4')  # № пп
-        worksheet.merge_cells('B3:B4')  # Наименование
-        worksheet.merge_cells('C3:D3')  # Объем работ
-        worksheet.merge_cells('E3:F3')  # Стоимость работ
-        worksheet.merge_cells('A9:C9')  # Итого
-        
-        # Границы для таблицы
-        thin_border = Border(left=Side(style='thin'), 
-                           right=Side(style='thin'), 
-                           top=Side(style='thin'), 
-                           bottom=Side(style='thin'))
-        
-        # Применяем границы ко всей таблице
-        for row in range(3, 10):  # От заголовков до итогов
-            for col in range(1, 7):
-                worksheet.cell(row=row, column=col).border = thin_border
+        label = ", ".join(f"{name}={rhs}" for name, rhs in change.items())
+        profit = f"{warm.objective:.2f}" if warm.status == 'Optimal' else warm.status
+        print(f"{label:<32} {profit:>10} {warm.solve_time * 1000:10.3f} {warm.iterations:>6} "
+              f"{cold.solve_time * 1000:10.3f} {cold.iterations:>6}")
+        rows.append({'change': change, 'objective': warm.objective,
+                     'warm_time': warm.solve_time, 'warm_iterations': warm.iterations,
+                     'cold_time': cold.solve_time, 'cold_iterations': cold.iterations})
+    
+    return rows
+
+def analyze_sensitivity(model=None, sweep=None, report=True):
+    """Анализ чувствительности оптимального плана по финальному базису
+    
+    sweep - необязательный параметрический анализ: (имя ограничения, конечное
+    значение правой части), например ("Labor", 300). Результаты выводятся в
+    консоль и на отдельный лист Excel ведомости.
+    report - True (имя по умолчанию с уникальным суффиксом), имя файла или
+    False (без ведомости).
+    """
+    
+    if model is None:
+        model = build_production_simplex()
+    solution = model.solve()
+    if solution.status != 'Optimal':
+        raise ValueError(f"Задача не решена: {solution.status}")
+    
+    constraints, variables = model.sensitivity()
+    sweep_table = model.parametric_rhs(*sweep) if sweep is not None else None
+    
+    print("=" * 50)
+    print("АНАЛИЗ ЧУВСТВИТЕЛЬНОСТИ")
+    print("=" * 50)
+    print(constraints.to_string(index=False))
+    print()
+    print(variables.to_string(index=False))
+    if sweep_table is not None:
+        print(f"\nПараметрический анализ: {sweep[0]}")
+        print(sweep_table.to_string(index=False))
+    
+    if report:
+        sensitivity = (constraints, variables, sweep_table, sweep[0] if sweep else None)
+        result = SolveResult('ex1', solution.status, solution.objective, 'sensitivity', solution=solution,
+                             filename="VolumeStatement.xlsx",
+                             render=lambda filename: create_excel_report(solution.x, model.c, sensitivity,
+                                                                         filename))
+        filename = result.report(report if isinstance(report, str) else None)
+        print(f"\nExcel ведомость сохранена как: {filename}")
+    
+    return constraints, variables, sweep_table
+
+@instrument('ex1')
+def solve_with_pulp(report=False, verbose=True):
+    """Решение контрольного примера через PuLP/CBC (параметры - как у solve_with_highs)"""
+    
+    with phase('build'):
+        #Создаем функцию и задаем задачу, название задачи, LpMaximize - максимизация ЦФ
+        prob = LpProblem("Ballast_Production", LpMaximize)
         
-        # Выравнивание для числовых данных
-        for row in range(6, 9):  # Строки с данными
-            worksheet.cell(row=row, column=4).alignment = Alignment(horizontal='right')
-            worksheet.cell(row=row, column=6).alignment = Alignment(horizontal='right')
+        # Переменные решения, название, lowBound - неотрицательность (>=0), cat='Continuous' - непрерывные переменные
+        x1 = LpVariable("x1", lowBound=0, cat='Continuous')# Объем 1-го типа балласта (песчаного)
+        x2 = LpVariable("x2", lowBound=0, cat='Continuous')# Объем 2-го типа балласта (песчано-гравийного)
+        x3 = LpVariable("x3", lowBound=0, cat='Continuous')# Объем 3-го типа балласта (щебеночного)
         
-        # Итоговая строка
-        worksheet.cell(row=12, column=4).alignment = Alignment(horizontal='right')
-        worksheet.cell(row=12, column=6).alignment = Alignment(horizontal='right')
-        worksheet.cell(row=12, column=1).font = Font(bold=True)
+        # Целевая функция
+        prob += 6*x1 + 10*x2 + 12*x3, "Total_Profit"
         
-        # Подпись
-        worksheet.cell(row=14, column=5).font = Font(bold=True)
-        worksheet.cell(row=15, column=5).font = Font(bold=True)
-    
-        print(f"\nExcel ведомость сохранена как: {filename}")
+        # Ограничения
+        prob += 13*x1 + 27*x2 + 24*x3 <= 230, "Excavators"
+        prob += 8*x1 + 4*x2 + 6*x3 <= 50, "Bulldozers"
+        prob += 50*x1 + 30*x2 + 50*x3 <= 610, "Labor"
+        prob += x2 <= 8, "Demand_x2"
+        prob += x3 <= 5, "Demand_x3"
+    record_model(prob)
+    
+    # Решение задачи: запись LP-файла, запуск CBC и чтение решения внутри PuLP
+    with phase('solve'):
+        prob.solve(PULP_CBC_CMD(msg=verbose))
+    with phase('extract'):
+        solution = pulp_solution(prob, [x1, x2, x3], prob.constraints.values())
+    record(method='pulp', status=solution.status, objective=solution.objective)
+    
+    result = production_result(solution.status, solution.objective, solution.x, PROFIT, 'pulp',
+                               prob=prob, solution=solution)
+    return finish_result(result, report, verbose)
+
+BALLAST_NAMES = [
+    'Добыча и производство песчаного балласта',
+    'Добыча и производство песчано-гравийного балласта',
+    'Добыча и производство щебеночного балласта'
+]
+
+# Формат ведомости объема работ
+REPORT_SPEC = ReportSpec(
+    title='Ведомость объема работ',
+    columns=[
+        Column('#', width=8, style='cell'),
+        Column('name', width=50),
+        Column(value='м³', width=10),
+        Column('volume', style='number'),
+        Column(value='тыс.ден.ед'),
+        Column('cost', style='number', total=True, total_style='number'),
+    ],
+    header=[
+        ['№ пп', 'Наименование', 'Объем работ', '', 'Стоимость работ', ''],
+        ['', '', 'Ед.изм.', 'Кол-во', 'Ед.изм.', 'Кол-во'],
+        ['1', '2', '3', '4', '5', '6'],
+    ],
+    header_merges=[(1, 1, 2, 1), (1, 2, 2, 2), (1, 3, 1, 4), (1, 5, 1, 6)],
+    total_span=3,
+    signature=['', '', '', 'Составил:', '', 'Романова О.А.'],
+    signature_styles=[None, None, None, 'sign', None, 'sign'],
+)
+
+def create_excel_report(volumes, profit=PROFIT, sensitivity=None, filename="VolumeStatement.xlsx"):
+    """Создание Excel ведомости в формате исходного документа
+    
+    volumes - объемы по видам продукции в порядке profit (массив или список).
+    sensitivity - (ограничения, переменные, параметрический анализ, имя ограничения)
+    для дополнительного листа с анализом чувствительности. Если filename
+    оканчивается на .csv, ведомость сохраняется в CSV.
+    """
+    
+    volumes = np.asarray(volumes, dtype=float)
+    costs = np.asarray(profit, dtype=float) * volumes
+    names = [BALLAST_NAMES[k] if k < len(BALLAST_NAMES) else f"Продукция {k + 1}"
+             for k in range(volumes.size)]
+    records = np.rec.fromarrays([names, volumes, costs], names='name,volume,cost')
+    
+    # Лист с анализом чувствительности
+    extra_sheets = None
+    if sensitivity is not None:
+        def extra_sheets(writer):
+            write_sensitivity_sheet(writer, *sensitivity)
+    
+    render_report(REPORT_SPEC, records, filename, extra_sheets)
+    
+    return filename
 
 # Запуск решения
 if __name__ == "__main__":
-    solve_with_pulp()
\ No newline at end of file
+    solve_with_highs(report=True)
\ No newline at end of file
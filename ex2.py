@@ -1,191 +1,345 @@
+import numpy as np
 from pulp import *
-import pandas as pd
 
-def solve_ex2():
+import scipy.sparse as sp
+
+import backends
+from arcs import as_arcs, arc_values, check_transport, is_sparse_cost
+from transport import solve_transport
+from lp_matrix import LinearModel, pulp_solution
+from simplex import SimplexModel
+from report import Column, ReportSpec, render_report, write_sensitivity_sheet
+from metrics import instrument, phase, record, record_model, record_solution
+from cache import fingerprint
+from result import SolveResult, finish_result, print_lines
+
+# Данные из контрольного примера
+SUPPLY = [35, 25]  # Мощность карьеров
+DEMAND = [27, 15]  # Потребность участков
+COST = [
+    [10, 9],  # Затраты на перевозку с 1-го карьера
+    [4, 5]    # Затраты на перевозку со 2-го карьера
+]
+
+def build_transport_pulp(supply, demand, cost, shape=None):
+    """Модель транспортной задачи в PuLP
+    
+    Переменные создаются только для разрешенных маршрутов (см. arcs.as_arcs):
+    конечных элементов плотной матрицы или хранимых элементов разреженной.
+    Выражения собираются сразу из списков пар (переменная, коэффициент),
+    без поэлементного сложения через lpSum. Возвращает задачу и словарь
+    переменных {(i, j): x}.
+    """
+    
+    rows, cols, costs, (m, n) = as_arcs(cost, shape)
     
     #Создаем функцию и задаем задачу, название задачи, LpMinimize - минимизация ЦФ
     prob = LpProblem("Ballast_Traffic", LpMinimize)
     
-    # Переменные решения, название, lowBound - неотрицательность (>=0), cat='Continuous' - непрерывные переменные
-    x11 = LpVariable("x11", lowBound=0, cat='Continuous')  # Объем балласта 1-го карьера на 1-ый участок 
-    x12 = LpVariable("x12", lowBound=0, cat='Continuous')  # Объем балласта 1-го карьера на 2-ый участок 
-    x21 = LpVariable("x21", lowBound=0, cat='Continuous')  # Объем балласта 2-го карьера на 1-ый участок
-    x22 = LpVariable("x22", lowBound=0, cat='Continuous')  # Объем балласта 2-го карьера на 2-ый участок
+    # Переменные решения: объем балласта i-го карьера на j-ый участок
+    x = {(i, j): LpVariable(f"x{i+1}_{j+1}", lowBound=0, cat='Continuous')
+         for i, j in zip(rows.tolist(), cols.tolist())}
     
     # Целевая функция
-    prob += 10*x11 + 9*x12 + 4*x21 + 5*x22, "Total_Profit"
+    prob += LpAffineExpression(list(zip(x.values(), costs.tolist()))), "Total_Cost"
+    
+    # Ограничения: переменные по строкам и столбцам собираются за один проход
+    by_row = [[] for _ in range(m)]
+    by_col = [[] for _ in range(n)]
+    for (i, j), var in x.items():
+        by_row[i].append((var, 1))
+        by_col[j].append((var, 1))
+    for i in range(m):
+        prob += LpConstraint(LpAffineExpression(by_row[i]),
+                             LpConstraintLE, f"Supply_{i+1}", supply[i])
+    for j in range(n):
+        prob += LpConstraint(LpAffineExpression(by_col[j]),
+                             LpConstraintGE, f"Demand_{j+1}", demand[j])
+    
+    return prob, x
+
+def _arc_model(supply, demand, rows, cols, costs, shape):
+    """LinearModel по списку дуг: переменная k - перевозка по дуге (rows[k], cols[k])"""
+    
+    m, n = shape
+    k = np.arange(rows.size)
+    ones = np.ones(rows.size)
+    
+    # Мощность: сумма по строке <= supply; потребность: -сумма по столбцу <= -demand
+    A_supply = sp.csr_matrix((ones, (rows, k)), shape=(m, rows.size))
+    A_demand = sp.csr_matrix((-ones, (cols, k)), shape=(n, rows.size))
+    A_ub = sp.vstack([A_supply, A_demand], format='csr')
+    b_ub = np.concatenate([np.asarray(supply, dtype=float), -np.asarray(demand, dtype=float)])
+    
+    return LinearModel(costs, A_ub=A_ub, b_ub=b_ub, name="Ballast_Traffic")
+
+def build_transport_model(supply, demand, cost, shape=None):
+    """Модель транспортной задачи в матричной форме
+    
+    Переменные - только разрешенные маршруты в порядке arcs.as_arcs; для
+    плотной матрицы без запретов переменная x[i, j] имеет номер i * n + j.
+    """
+    
+    rows, cols, costs, shape = as_arcs(cost, shape)
+    return _arc_model(supply, demand, rows, cols, costs, shape)
+
+def _nonzero_flows(flows):
+    """Ненулевые перевозки плотной или разреженной матрицы: массивы (i, j, объем) по строкам"""
+    
+    if sp.issparse(flows):
+        coo = sp.coo_matrix(flows)
+        keep = coo.data != 0
+        rows, cols, volumes = coo.row[keep], coo.col[keep], coo.data[keep]
+        order = np.lexsort((cols, rows))
+        return rows[order], cols[order], volumes[order]
+    rows, cols = np.nonzero(flows)
+    return rows, cols, flows[rows, cols]
+
+def solve_transport_model(supply, demand, cost, shape=None, backend='highs'):
+    """Решение матричной модели транспортной задачи по разрешенным маршрутам
+    
+    backend - решатель backends.solve: 'highs' (по умолчанию), 'cbc' или
+    'auto' (метод потенциалов для полной сетки, иначе HiGHS). Возвращает
+    ModelSolution и матрицу перевозок: плотную для плотной матрицы затрат,
+    CSR - для разреженных данных.
+    """
+    
+    with phase('build'):
+        rows, cols, costs, shape_ = as_arcs(cost, shape)
+        model = _arc_model(supply, demand, rows, cols, costs, shape_)
+    record_model(model)
+    with phase('solve'):
+        solution = backends.solve(model, backend)
+    record_solution(solution)
+    if solution.status != 'Optimal':
+        raise ValueError(f"Задача не решена: {solution.status}")
+    with phase('extract'):
+        flows = solution.as_matrix(shape_, rows, cols, sparse=is_sparse_cost(cost, shape))
+    return solution, flows
+
+def build_transport_simplex(supply, demand, cost):
+    """Транспортная задача как SimplexModel: ограничения Supply_i (<=) и Demand_j (>=)"""
+    
+    cost = np.asarray(cost, dtype=float)
+    m, n = cost.shape
+    A = np.vstack([np.kron(np.eye(m), np.ones(n)), np.kron(np.ones(m), np.eye(n))])
+    b = np.concatenate([np.asarray(supply, dtype=float), np.asarray(demand, dtype=float)])
+    
+    return SimplexModel(cost.ravel(), A, b, sense='min',
+                        row_senses=['<='] * m + ['>='] * n,
+                        row_names=[f"Supply_{i+1}" for i in range(m)] + [f"Demand_{j+1}" for j in range(n)],
+                        col_names=[f"x{i+1}_{j+1}" for i in range(m) for j in range(n)])
+
+def analyze_sensitivity(supply=None, demand=None, cost=None, sweep=None, report=True):
+    """Анализ чувствительности транспортной задачи по финальному базису
     
-    # Ограничения
-    prob += x11 + x12 <= 35, "Power first provider"
-    prob += x21 + x22 <= 25, "Power second provider"
-    prob += x11 + x21 >= 27, "Demand first field"
-    prob += x12 + x22 >= 15, "Demand second field"
+    sweep - необязательный параметрический анализ: (имя ограничения, конечное
+    значение), например ("Demand_1", 40). Плотная модель, рассчитана на
+    задачи умеренного размера.
+    report - True (имя по умолчанию с уникальным суффиксом), имя файла или
+    False (без ведомости).
+    """
     
-    # Решение задачи
-    prob.solve()
+    if supply is None:
+        supply, demand, cost = SUPPLY, DEMAND, COST
+    cost = np.asarray(cost, dtype=float)
+    model = build_transport_simplex(supply, demand, cost)
+    solution = model.solve()
+    if solution.status != 'Optimal':
+        raise ValueError(f"Задача не решена: {solution.status}")
+    
+    constraints, variables = model.sensitivity()
+    sweep_table = model.parametric_rhs(*sweep) if sweep is not None else None
     
-    # Вывод результатов
     print("=" * 50)
-    print("РЕШЕНИЕ")
+    print("АНАЛИЗ ЧУВСТВИТЕЛЬНОСТИ")
     print("=" * 50)
-    print(f"Статус: {LpStatus[prob.status]}")
-    print(f"Минимальные затраты: {value(prob.objective):.2f} тыс. ден. ед.")
-    print(f"\nОптимальные объемы:")
-    for v in prob.variables():
-        print(f"{v.name} = {v.varValue:.2f} тыс. м³")
-     # Создание Excel документа
-    create_excel_report(prob)
-    
-    return prob
-    
-def create_excel_report(prob):
-    """Создание Excel ведомости в формате исходного документа"""
-    
-    # Получаем результаты
-    results = {}
-    for v in prob.variables():
-        results[v.name] = v.varValue
-    
-    # Создаем данные для таблицы
-    data = []
-    
-    # Заголовок таблицы
-    data.append(['Ведомость объема работ'])
-    data.append([])  # Пустая строка
-    
-    # Шапка таблицы
-    data.append(['№ пп', 'Наименование', 'Поставщик', 'Потребитель','Объем работ', '', 'Затраты', ''])
-    data.append(['', '','', '', 'Ед.изм.', 'Кол-во', 'Ед.изм.', 'Кол-во'])
-    data.append(['1', '2', '3', '4', '5', '6','7','8'])
-    
-    # Данные по балласту
-    data.append([
-        '1',
-        'Балласт',
-        '1',
-        '1',
-        'м³',
-        f"{results['x11']:.2f}",
-        'тыс.ден.ед',
-        f"{10 * results['x11']:.2f}"
-    ])
-    
-    data.append([
-        '2',
-        'Балласт',
-        '1',
-        '2',
-        'м³',
-        f"{results['x12']:.2f}",
-        'тыс.ден.ед',
-        f"{9* results['x12']:.2f}"
-    ])
-    
-    data.append([
-        '3',
-        'Балласт',
-        '2',
-        '1',
-        'м³',
-        f"{results['x21']:.2f}",
-        'тыс.ден.ед',
-        f"{4 * results['x21']:.2f}"
-    ])
-
-    data.append([
-        '4',
-        'Балласт',
-        '2',
-        '2',
-        'м³',
-        f"{results['x22']:.2f}",
-        'тыс.ден.ед',
-        f"{5 * results['x22']:.2f}"
-    ])
-    
-    # Итоги
-    #total_volume = sum(results.values())
-    total_cost = 10*results['x11'] + 9*results['x12'] + 4*results['x21'] + 5*results['x22']
-    data.append(['Итого', '', '', '', '','', '', f"{total_cost:.2f}"])
-    
-    # Пустые строки перед подписью
-    data.append([])
-    data.append([])
-    
-    # Подпись
-    data.append(['', '', '',  'Составил:','', 'Романова О.А.'])
-    
-    # Создаем DataFrame
-    df = pd.DataFrame(data)
-    
-    # Создаем Excel файл
-    filename = f"VolumeStatement_2.xlsx"
-    
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Ведомость', index=False, header=False)
-        
-        # Получаем workbook и worksheet для форматирования
-        workbook = writer.book
-        worksheet = writer.sheets['Ведомость']
-        
-        # Настраиваем ширину колонок
-        column_widths = [8, 25, 15, 15, 14, 14, 14, 14]
-        for i, width in enumerate(column_widths, 1):
-            worksheet.column_dimensions[chr(64 + i)].width = width
-        
-        # Форматируем заголовок
-        from openpyxl.styles import Font, Alignment, Border, Side
-        
-        # Стиль для заголовка
-        title_font = Font(size=16, bold=True)
-        worksheet['A1'].font = title_font
-        worksheet.merge_cells('A1:F1')
-        worksheet['A1'].alignment = Alignment(horizontal='center')
-        
-        # Стиль для шапки таблицы
-        header_font = Font(bold=True)
-        for row in range(3, 10):  # Строки с заголовками
-            for col in range(1, 9):
-                cell = worksheet.cell(row=row, column=col)
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Объединяем ячейки шапки
-        worksheet.merge_cells('A3:A4')  # № пп
-        worksheet.merge_cells('B3:B4')  # Наименование
-        worksheet.merge_cells('C3:C4')  # Поставщик
-        worksheet.merge_cells('D3:D4')  # Потребитель
-        worksheet.merge_cells('E3:F3')  # Объем работ
-        worksheet.merge_cells('G3:H3')  # Затраты
-        worksheet.merge_cells('A10:G10')  # Итого
-        
-        # Границы для таблицы
-        thin_border = Border(left=Side(style='thin'), 
-                           right=Side(style='thin'), 
-                           top=Side(style='thin'), 
-                           bottom=Side(style='thin'))
-        
-        # Применяем границы ко всей таблице
-        for row in range(3, 11):  # От заголовков до итогов
-            for col in range(1, 9):
-                worksheet.cell(row=row, column=col).border = thin_border
-        
-        # Выравнивание для числовых данных
-        for row in range(6, 11):  # Строки с данными
-            worksheet.cell(row=row, column=6).alignment = Alignment(horizontal='right')
-            worksheet.cell(row=row, column=8).alignment = Alignment(horizontal='right')
-        
-        # Итоговая строка
-        worksheet.cell(row=10, column=6).alignment = Alignment(horizontal='right')
-        worksheet.cell(row=10, column=8).alignment = Alignment(horizontal='right')
-        worksheet.cell(row=10, column=1).font = Font(bold=True)
-        
-        # Подпись
-        worksheet.cell(row=13, column=4).font = Font(bold=True)
-        worksheet.cell(row=13, column=6).font = Font(bold=True)
+    print(constraints.to_string(index=False))
+    print()
+    print(variables.to_string(index=False))
+    if sweep_table is not None:
+        print(f"\nПараметрический анализ: {sweep[0]}")
+        print(sweep_table.to_string(index=False))
     
+    if report:
+        flows = solution.as_matrix(cost.shape)
+        sensitivity = (constraints, variables, sweep_table, sweep[0] if sweep else None)
+        result = SolveResult('ex2', solution.status, solution.objective, 'sensitivity', solution=solution,
+                             flows=flows, filename="VolumeStatement_2.xlsx",
+                             render=lambda filename: create_excel_report(flows, cost, sensitivity,
+                                                                         filename))
+        filename = result.report(report if isinstance(report, str) else None)
         print(f"\nExcel ведомость сохранена как: {filename}")
+    
+    return constraints, variables, sweep_table
+
+def solve_transport_pulp(supply, demand, cost, shape=None):
+    """Решение транспортной задачи через PuLP/CBC (режим проверки)"""
+    
+    with phase('build'):
+        prob, x = build_transport_pulp(supply, demand, cost, shape)
+    record_model(prob)
+    with phase('solve'):
+        prob.solve(PULP_CBC_CMD(msg=False))
+    record(status=LpStatus[prob.status])
+    if LpStatus[prob.status] != 'Optimal':
+        raise ValueError(f"Задача не решена: {LpStatus[prob.status]}")
+    
+    with phase('extract'):
+        rows, cols, _, shape_ = as_arcs(cost, shape)
+        solution = pulp_solution(prob, x.values(), prob.constraints.values())
+        flows = solution.as_matrix(shape_, rows, cols, sparse=is_sparse_cost(cost, shape))
+    return prob, flows
+
+@instrument('ex2')
+def solve_ex2(supply=None, demand=None, cost=None, method='auto', cache=None, shape=None,
+              report=False, verbose=True):
+    """Транспортная задача: перевозка балласта с карьеров на участки
+    
+    method='modi' - метод Фогеля + метод потенциалов, method='highs' - матричная
+    модель через HiGHS, method='pulp' - LP через CBC, method='auto' - выбор
+    решателя по структуре модели (backends.solve): метод потенциалов для
+    полной сетки маршрутов, HiGHS - для остальных данных.
+    cost - плотная матрица (inf - маршрут запрещен), разреженная матрица
+    SciPy или список ребер (i, j, затраты) вместе с shape = (m, n);
+    переменные создаются только для разрешенных маршрутов, а покрытие
+    потребностей заранее проверяется расчетом максимального потока.
+    cache - необязательный SolutionCache: задача с теми же данными и методом
+    повторно не решается (prob при попадании в кеш - None).
+    report - вывести ведомость сразу (True или имя файла); иначе ведомость
+    выводится по запросу result.report(). verbose=False отключает печать.
+    Возвращает SolveResult с матрицей перевозок flows.
+    """
+    
+    if supply is None:
+        supply, demand, cost = SUPPLY, DEMAND, COST
+    sparse = is_sparse_cost(cost, shape)
+    if not sparse:
+        cost = np.asarray(cost, dtype=float)
+    arc_rows, arc_cols, arc_costs, shape_ = as_arcs(cost, shape)
+    m, n = shape_
+    complete = arc_rows.size == m * n
+    
+    if method == 'modi' and not complete:
+        raise ValueError("Метод потенциалов требует полной матрицы затрат; "
+                         "для запрещенных маршрутов используйте method='highs' или 'pulp'")
+    
+    key = None
+    if cache is not None:
+        if sparse:
+            key = fingerprint('ex2-arcs', method, supply, demand, np.asarray(shape_),
+                              arc_rows, arc_cols, arc_costs)
+        else:
+            key = fingerprint('ex2', method, supply, demand, cost)
+    hit = cache.get(key) if key is not None else None
+    
+    if hit is None and not complete:
+        with phase('check'):
+            check_transport(supply, demand, arc_rows, arc_cols, shape_)
+    
+    prob = None
+    solution = None
+    if hit is not None:
+        if sparse:
+            flows = sp.csr_matrix((hit['values'], (hit['rows'], hit['cols'])), shape=shape_)
+        else:
+            flows = hit['flows']
+        total_cost = hit['objective']
+        record(status='Optimal', cache_hit=True)
+    elif method == 'modi':
+        record(rows=m + n, cols=m * n, nnz=2 * m * n)
+        with phase('solve'):
+            flows, total_cost = solve_transport(supply, demand, cost)
+        record(status='Optimal')
+    elif method in ('highs', 'auto'):
+        solution, flows = solve_transport_model(supply, demand, cost, shape, method)
+        total_cost = solution.objective
+    elif method == 'pulp':
+        prob, flows = solve_transport_pulp(supply, demand, cost, shape)
+        total_cost = value(prob.objective)
+    else:
+        raise ValueError(f"Неизвестный метод: {method}")
+    if key is not None and hit is None:
+        if sparse:
+            coo = flows.tocoo()
+            cache.put(key, {'rows': coo.row, 'cols': coo.col, 'values': coo.data,
+                            'objective': total_cost})
+        else:
+            cache.put(key, {'flows': flows, 'objective': total_cost})
+    record(objective=total_cost)
+    
+    def show():
+        print("=" * 50)
+        print("РЕШЕНИЕ")
+        print("=" * 50)
+        print(f"Метод: {method}" + (f" ({solution.backend})" if method == 'auto' and solution else ""))
+        print(f"Минимальные затраты: {total_cost:.2f} тыс. ден. ед.")
+        print(f"\nОптимальные объемы:")
+        rows, cols, volumes = _nonzero_flows(flows)
+        print_lines(range(rows.size),
+                    lambda k: f"x{rows[k]+1}_{cols[k]+1} = {volumes[k]:.2f} тыс. м³")
+    
+    result = SolveResult('ex2', 'Optimal', total_cost, method, prob=prob, solution=solution,
+                         flows=flows, show=show, filename="VolumeStatement_2.xlsx",
+                         render=lambda filename: create_excel_report(flows, cost, filename=filename,
+                                                                     shape=shape))
+    return finish_result(result, report, verbose)
+    
+# Формат ведомости перевозок
+REPORT_SPEC = ReportSpec(
+    title='Ведомость объема работ',
+    title_span=6,
+    columns=[
+        Column('#', width=8, style='cell_bold_center'),
+        Column(value='Балласт', width=25, style='cell_bold_center'),
+        Column('supplier', width=15, style='cell_bold_center', fmt='{}'),
+        Column('consumer', width=15, style='cell_bold_center', fmt='{}'),
+        Column(value='м³', style='cell_bold_center'),
+        Column('volume', style='number_bold'),
+        Column(value='тыс.ден.ед', style='cell_bold_center'),
+        Column('cost', style='number_bold', total=True, total_style='number'),
+    ],
+    header=[
+        ['№ пп', 'Наименование', 'Поставщик', 'Потребитель','Объем работ', '', 'Затраты', ''],
+        ['', '','', '', 'Ед.изм.', 'Кол-во', 'Ед.изм.', 'Кол-во'],
+        ['1', '2', '3', '4', '5', '6','7','8'],
+    ],
+    header_merges=[(1, 1, 2, 1), (1, 2, 2, 2), (1, 3, 2, 3), (1, 4, 2, 4), (1, 5, 1, 6), (1, 7, 1, 8)],
+    total_span=7,
+    signature=['', '', '',  'Составил:','', 'Романова О.А.'],
+    signature_styles=[None, None, None, 'sign', None, 'sign'],
+)
+
+def create_excel_report(flows, cost, sensitivity=None, filename="VolumeStatement_2.xlsx",
+                        shape=None):
+    """Создание Excel ведомости в формате исходного документа
+    
+    flows - плотная или разреженная матрица перевозок, cost - затраты в
+    любом формате arcs.as_arcs (для списка ребер нужен shape).
+    sensitivity - (ограничения, переменные, параметрический анализ, имя ограничения)
+    для дополнительного листа с анализом чувствительности. Если filename
+    оканчивается на .csv, ведомость сохраняется в CSV.
+    """
+    
+    # Получаем результаты: только клетки с ненулевым объемом перевозок
+    rows, cols, volumes = _nonzero_flows(flows)
+    if is_sparse_cost(cost, shape):
+        unit_costs = arc_values(*as_arcs(cost, shape), rows, cols)
+    else:
+        unit_costs = np.asarray(cost, dtype=float)[rows, cols]
+    records = np.rec.fromarrays([rows + 1, cols + 1, volumes, unit_costs * volumes],
+                                names='supplier,consumer,volume,cost')
+    
+    # Лист с анализом чувствительности
+    extra_sheets = None
+    if sensitivity is not None:
+        def extra_sheets(writer):
+            write_sensitivity_sheet(writer, *sensitivity)
+    
+    render_report(REPORT_SPEC, records, filename, extra_sheets)
+    
+    return filename
 
 # Запуск решения
 if __name__ == "__main__":
-    solve_ex2()
\ No newline at end of file
+    solve_ex2(report=True)
\ No newline at end of file
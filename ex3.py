@@ -1,218 +1,444 @@
+import numpy as np
 from pulp import *
-import pandas as pd
 
-def create_assignment_matrix(prob):
-    """Создает матрицу распределения 0 и 1"""
-    
-    # Создаем пустую матрицу 4x4
-    assignment_matrix = [[0] * 4 for _ in range(4)]
+import scipy.sparse as sp
+
+import backends
+from anytime import anytime_assignment, solve_anytime
+from arcs import as_arcs, arc_values, check_assignment, is_sparse_cost
+from assignment import linear_sum_assignment, sparse_assignment, assignment_to_records
+from generalized import solve_gap_branch_price, solve_gap_lagrange
+from lp_matrix import LinearModel, pulp_solution
+from report import Column, ReportSpec, render_report
+from metrics import instrument, phase, record, record_model, record_solution
+from cache import fingerprint
+from result import PRINT_LIMIT, SolveResult, finish_result, print_lines
+
+# Матрица времени из контрольного примера
+TIME_MATRIX = [
+    [30, 40, 50, 60],  # Бригада 1
+    [37, 47, 57, 58],  # Бригада 2
+    [27, 44, 49, 57],  # Бригада 3
+    [35, 37, 47, 63]   # Бригада 4
+]
+
+# Фонды рабочего времени бригад для обобщенной задачи, дней (нагрузка объекта - его срок)
+CAPACITY = [90, 90, 90, 70]
+
+def create_assignment_matrix(rows, cols, shape):
+    """Создает матрицу распределения 0 и 1 (массив NumPy n x m)"""
     
-    # Заполняем матрицу значениями из решения
-    for i in range(4):
-        for j in range(4):
-            var_name = f"x{i+1}{j+1}"
-            var_value = prob.variablesDict()[var_name].varValue
-            assignment_matrix[i][j] = int(var_value)  # Преобразуем в 0 или 1
+    assignment_matrix = np.zeros(shape, dtype=int)
+    assignment_matrix[rows, cols] = 1
     
     return assignment_matrix
 
 def print_assignment_matrix(assignment_matrix):
     """Выводит матрицу распределения в консоль"""
     
+    n = len(assignment_matrix)
+    m = len(assignment_matrix[0]) if n else 0
+    
     print("\nМАТРИЦА РАСПРЕДЕЛЕНИЯ:")
-    print("       Объект1  Объект2  Объект3  Объект4")
-    print("      " + "-" * 35)
+    print("       " + "".join(f"Объект{j+1}  " for j in range(m)))
+    print("      " + "-" * (9 * m - 1))
     
-    for i in range(4):
+    for i in range(n):
         row_str = f"Бриг{i+1} |"
-        for j in range(4):
+        for j in range(m):
             row_str += f"    {assignment_matrix[i][j]}     "
         print(row_str)
 
-def solve_assignment_compact():
-    prob = LpProblem("Brigade_Assignment", LpMinimize)
-    
-    # Матрица времени
-    time_matrix = [
-        [30, 40, 50, 60],  # Бригада 1
-        [37, 47, 57, 58],  # Бригада 2
-        [27, 44, 49, 57],  # Бригада 3
-        [35, 37, 47, 63]   # Бригада 4
-    ]
+def build_assignment_model(time_matrix, forbidden=None, shape=None):
+    """Модель задачи о назначениях в матричной форме
     
-    # Создаем переменные
-    x = [[LpVariable(f"x{i+1}{j+1}", cat='Binary') for j in range(4)] for i in range(4)]
+    Переменные создаются только для разрешенных пар: конечных и не
+    запрещенных элементов плотной матрицы или хранимых элементов разреженной
+    (матрица SciPy или список ребер с shape, см. arcs.as_arcs). Возвращает
+    модель и массивы (строка, столбец) для каждой переменной.
+    """
     
-    # Целевая функция
-    prob += lpSum(time_matrix[i][j] * x[i][j] for i in range(4) for j in range(4))
+    rows, cols, costs, (n, m) = as_arcs(time_matrix, shape, forbidden)
+    k = np.arange(rows.size)
+    ones = np.ones(rows.size)
     
-    # Ограничения
-    for i in range(4):  # Каждая бригада на одном объекте
-        prob += lpSum(x[i][j] for j in range(4)) == 1
+    A_rows = sp.csr_matrix((ones, (rows, k)), shape=(n, rows.size))
+    A_cols = sp.csr_matrix((ones, (cols, k)), shape=(m, rows.size))
     
-    for j in range(4):  # На каждый объект одна бригада
-        prob += lpSum(x[i][j] for i in range(4)) == 1
+    # Назначается min(n, m) пар, поэтому для большей стороны ограничение <= 1
+    if n <= m:
+        A_eq, b_eq, A_ub, b_ub = A_rows, np.ones(n), A_cols, np.ones(m)
+    else:
+        A_eq, b_eq, A_ub, b_ub = A_cols, np.ones(m), A_rows, np.ones(n)
     
-    # Решение
-    prob.solve()
-    
-    print("\n" + "=" * 60)
-    print("РЕЗУЛЬТАТЫ РАСПРЕДЕЛЕНИЯ БРИГАД")
-    print("=" * 60)
-    print(f"Статус: {LpStatus[prob.status]}")
-    print(f"Минимальное суммарное время: {value(prob.objective)} дней")
-    
-    # СОЗДАЕМ МАТРИЦУ РАСПРЕДЕЛЕНИЯ
-    assignment_matrix = create_assignment_matrix(prob)
+    model = LinearModel(costs, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                        bounds=(0, 1), integrality=1, name="Brigade_Assignment")
+    return model, rows, cols
+
+def solve_assignment_pulp(time_matrix, forbidden=None, shape=None):
+    """Решение задачи о назначениях через PuLP/CBC (режим проверки)"""
     
-    # ВЫВОДИМ МАТРИЦУ
-    print_assignment_matrix(assignment_matrix)
+    rows, cols, costs, (n, m) = as_arcs(time_matrix, shape, forbidden)
     
-    # Собираем результаты назначений
-    assignments = []
-    print("\nНазначения:")
-    for i in range(4):
-        for j in range(4):
-            if x[i][j].varValue == 1:
-                print(f"Бригада {i+1} → Объект {j+1} (время: {time_matrix[i][j]} дней)")
-                assignments.append({
-                    'brigade': i+1,
-                    'object': j+1,
-                    'time': time_matrix[i][j]
-                })
-    
-    # Создание Excel документа
-    create_excel_report(assignments)
-    
-    return prob, assignments
-
-def create_excel_report(assignments):
-    """Создание Excel ведомости в точном формате"""
-    
-    # Создаем данные для таблицы
-    data = []
-    
-    # Заголовок таблицы
-    data.append(['Ведомость распределения бригад по объектам строительства'])
-    data.append([])  # Пустая строка
-    
-    # Шапка таблицы - ПРАВИЛЬНАЯ СТРУКТУРА
-    data.append(['', '', '', 'Срок', ''])  # Верхняя строка шапки
-    data.append(['№ пп', 'Бригада', 'Объект', 'Ед.изм.', 'Кол-во'])  # Основная шапка
-    data.append(['1', '2', '3', '4', '5'])  # Нумерация колонок
-    
-    # Данные по назначениям
-    total_time = 0
-    for idx, assignment in enumerate(assignments, 1):
-        data.append([
-            idx,
-            assignment['brigade'],
-            assignment['object'],
-            'дни',
-            assignment['time']
-        ])
-        total_time += assignment['time']
-    
-    # Итоги
-    data.append(['Итого', '', '', '', total_time])
-    
-    # Пустые строки перед подписью
-    data.append([])
-    data.append([])
-    
-    # Подпись
-    data.append(['', '', '', 'Составил:', 'Романова О.А.'])
-    
-    # Создаем DataFrame
-    df = pd.DataFrame(data)
-    
-    # Создаем Excel файл
-    filename = "Brigade_Assignment_Report.xlsx"
-    
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Ведомость', index=False, header=False)
-        
-        # Получаем workbook и worksheet для форматирования
-        workbook = writer.book
-        worksheet = writer.sheets['Ведомость']
-        
-        # Настраиваем ширину колонок
-        column_widths = [8, 11, 11, 14, 14]
-        for i, width in enumerate(column_widths, 1):
-            worksheet.column_dimensions[chr(64 + i)].width = width
+    with phase('build'):
+        prob = LpProblem("Brigade_Assignment", LpMinimize)
         
-        # Форматируем заголовок
-        from openpyxl.styles import Font, Alignment, Border, Side
+        # Создаем переменные только для разрешенных пар
+        x = {(i, j): LpVariable(f"x{i+1}_{j+1}", cat='Binary')
+             for i, j in zip(rows.tolist(), cols.tolist())}
         
-        # Стиль для заголовка
-        title_font = Font(size=11, bold=True) 
-        worksheet['A1'].font = title_font
-        worksheet.merge_cells('A1:E1')
-        worksheet['A1'].alignment = Alignment(horizontal='center')
+        # Целевая функция
+        prob += lpSum(c * var for c, var in zip(costs.tolist(), x.values()))
         
-        # Стиль для шапки таблицы
-        header_font = Font(bold=True)
+        # Переменные по строкам и столбцам собираются за один проход по парам
+        by_row = [[] for _ in range(n)]
+        by_col = [[] for _ in range(m)]
+        for (i, j), var in x.items():
+            by_row[i].append(var)
+            by_col[j].append(var)
         
-        # Объединяем ячейки шапки ПРАВИЛЬНО
-        worksheet.merge_cells('D3:E3')  # Объединяем "Срок" по горизонтали
+        # Ограничения: назначается min(n, m) пар, поэтому для большей стороны <= 1
+        row_sense = (lambda e: e == 1) if n <= m else (lambda e: e <= 1)
+        col_sense = (lambda e: e == 1) if m <= n else (lambda e: e <= 1)
+        for items in by_row:  # Каждая бригада не более чем на одном объекте
+            prob += row_sense(lpSum(items))
         
-        # Применяем стиль ко всем строкам шапки
-        for row in [3, 4, 5]:
-            for col in range(1, 6):
-                cell = worksheet.cell(row=row, column=col)
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Границы для таблицы
-        thin_border = Border(left=Side(style='thin'), 
-                           right=Side(style='thin'), 
-                           top=Side(style='thin'), 
-                           bottom=Side(style='thin'))
-        
-        # Применяем границы ко всей таблице (от шапки до итогов)
-        start_row = 3  # Начало таблицы (первая строка шапки)
-        end_row = 5 + len(assignments) + 1  # До строки с итогами включительно
-        
-        for row in range(start_row, end_row + 1):
-            for col in range(1, 6):
-                if row <= worksheet.max_row and col <= 5:
-                    worksheet.cell(row=row, column=col).border = thin_border
-        
-        # ВЫРАВНИВАНИЕ ПО ЦЕНТРУ для всех данных
-        for row in range(6, 6 + len(assignments)):  # Строки с данными
-            for col in range(1, 6):  # Все колонки
-                worksheet.cell(row=row, column=col).alignment = Alignment(
-                    horizontal='center', 
-                    vertical='center'
-                )
-        
-        # Итоговая строка
-        total_row = 6 + len(assignments)
-        worksheet.cell(row=total_row, column=1).font = Font(bold=True)
-        worksheet.cell(row=total_row, column=5).font = Font(bold=True)
-        worksheet.cell(row=total_row, column=5).alignment = Alignment(
-            horizontal='center', 
-            vertical='center'
-        )
-        
-        # Объединяем ячейки для "Итого"
-        worksheet.merge_cells(f'A{total_row}:D{total_row}')
+        for items in by_col:  # На каждый объект не более одной бригады
+            prob += col_sense(lpSum(items))
+    record_model(prob)
+    
+    # Решение
+    with phase('solve'):
+        prob.solve(PULP_CBC_CMD(msg=False))
+    record(status=LpStatus[prob.status])
+    if LpStatus[prob.status] != 'Optimal':
+        raise ValueError(f"Допустимого назначения не существует: {LpStatus[prob.status]}")
+    
+    with phase('extract'):
+        chosen = pulp_solution(prob, x.values()).x > 0.5
+        rows, cols = rows[chosen], cols[chosen]
+    
+    return prob, rows, cols
+
+@instrument('ex3')
+def solve_assignment_compact(time_matrix=None, forbidden=None, method='hungarian', verify=False,
+                             cache=None, shape=None, report=False, verbose=True,
+                             time_limit=None, callback=None):
+    """Распределение бригад по объектам
+    
+    method='hungarian' - венгерский алгоритм на NumPy (для разреженных данных -
+    LAPJVsp из SciPy), method='highs' - матричная модель через HiGHS,
+    method='pulp' - MIP через CBC, method='auto' - матричная модель с выбором
+    решателя по ее структуре (backends.solve), method='anytime' - рекорды по
+    мере улучшения (жадное назначение, обмены, LAPJVsp; anytime.anytime_assignment):
+    каждый рекорд передается в callback, а по истечении time_limit (с)
+    возвращается лучший найденный со статусом 'Feasible' и разрывом result.gap
+    (точный этап прерывается по времени, жадный и обмены проверяют его между
+    проходами, так что превышение - не больше одного прохода).
+    time_matrix - плотная матрица (inf - запрещенная пара), разреженная
+    матрица SciPy или список ребер (i, j, срок) вместе с shape = (n, m);
+    переменные создаются только для разрешенных пар. Если разрешены не все
+    пары, существование назначения заранее проверяется поиском максимального
+    паросочетания.
+    verify=True дополнительно решает задачу через PuLP и сверяет суммарное время.
+    cache - необязательный SolutionCache: задача с той же матрицей, запретами
+    и методом повторно не решается (prob при попадании в кеш - None).
+    report - вывести ведомость сразу (True или имя файла); иначе ведомость
+    выводится по запросу result.report(). verbose=False отключает печать.
+    Возвращает SolveResult с массивами rows, cols, times и записями assignments.
+    """
+    
+    if time_matrix is None:
+        time_matrix = TIME_MATRIX
+    sparse = is_sparse_cost(time_matrix, shape)
+    if not sparse:
+        time_matrix = np.asarray(time_matrix)
+    arc_rows, arc_cols, arc_costs, dims = as_arcs(time_matrix, shape, forbidden)
+    n, m = dims
+    
+    key = None
+    if cache is not None:
+        if sparse:
+            key = fingerprint('ex3-arcs', method, np.asarray(dims), arc_rows, arc_cols, arc_costs)
+        else:
+            key = fingerprint('ex3', method, time_matrix,
+                              None if forbidden is None else np.asarray(forbidden, dtype=bool))
+    hit = cache.get(key) if key is not None else None
+    
+    if hit is None and arc_rows.size < n * m:
+        with phase('check'):
+            check_assignment(arc_rows, arc_cols, dims)
+    
+    prob = solution = best = None
+    status = 'Optimal'
+    if hit is not None:
+        rows, cols = hit['rows'], hit['cols']
+        record(status='Optimal', cache_hit=True)
+    elif method == 'hungarian':
+        record(rows=n + m, cols=arc_rows.size, nnz=2 * arc_rows.size)
+        with phase('solve'):
+            if sparse:
+                rows, cols = sparse_assignment(arc_rows, arc_cols, arc_costs, dims)
+            else:
+                rows, cols = linear_sum_assignment(time_matrix, forbidden)
+        record(status='Optimal')
+    elif method == 'anytime':
+        if sparse:
+            raise ValueError("Метод anytime работает с плотной матрицей сроков")
+        record(rows=n + m, cols=arc_rows.size, nnz=2 * arc_rows.size)
+        with phase('solve'):
+            best = solve_anytime(anytime_assignment(time_matrix, forbidden, time_limit), callback)
+        if best is None:
+            raise ValueError("Допустимое назначение не найдено за отведенное время")
+        rows, cols = best.rows, best.cols
+        status = 'Optimal' if best.gap == 0 else 'Feasible'
+        record(status=status, mip_gap=best.gap)
+    elif method in ('highs', 'auto'):
+        with phase('build'):
+            model, var_rows, var_cols = build_assignment_model(time_matrix, forbidden, shape)
+        record_model(model)
+        with phase('solve'):
+            solution = backends.solve(model, method)
+        record_solution(solution)
+        if solution.status != 'Optimal':
+            raise ValueError(f"Допустимого назначения не существует: {solution.status}")
+        with phase('extract'):
+            chosen = solution.x > 0.5
+            rows, cols = var_rows[chosen], var_cols[chosen]
+    elif method == 'pulp':
+        prob, rows, cols = solve_assignment_pulp(time_matrix, forbidden, shape)
+    else:
+        raise ValueError(f"Неизвестный метод: {method}")
+    if key is not None and hit is None and status == 'Optimal':
+        cache.put(key, {'rows': rows, 'cols': cols})
+    
+    if sparse:
+        times = arc_values(arc_rows, arc_cols, arc_costs, dims, rows, cols)
+    else:
+        times = time_matrix[rows, cols]
+    total_time = times.sum()
+    record(objective=total_time)
+    
+    if verify and method != 'pulp' and status == 'Optimal':
+        prob, _, _ = solve_assignment_pulp(time_matrix, forbidden, shape)
+        if abs(value(prob.objective) - total_time) > 1e-6:
+            raise RuntimeError(
+                f"Расхождение с PuLP: {value(prob.objective)} != {total_time}")
+    
+    # Собираем результаты назначений
+    assignments = assignment_to_records(None, rows, cols, times)
+    
+    def show():
+        print("\n" + "=" * 60)
+        print("РЕЗУЛЬТАТЫ РАСПРЕДЕЛЕНИЯ БРИГАД")
+        print("=" * 60)
+        print(f"Метод: {method}")
+        print(f"Минимальное суммарное время: {total_time} дней")
+        if best is not None:
+            print(f"Этап: {best.stage}, нижняя оценка: {best.bound:g} дней, разрыв: {best.gap:.4%}")
         
-        # Подпись
-        signature_row = total_row + 3
-        worksheet.cell(row=signature_row, column=4).font = Font(bold=True)
-        worksheet.cell(row=signature_row, column=5).font = Font(bold=True)
-        worksheet.cell(row=signature_row, column=4).alignment = Alignment(horizontal='right')
-        worksheet.cell(row=signature_row, column=5).alignment = Alignment(horizontal='center')
+        # Матрица распределения выводится только для небольших плотных данных
+        if not sparse and max(dims) <= PRINT_LIMIT:
+            print_assignment_matrix(create_assignment_matrix(rows, cols, dims))
         
-        # Выравнивание для пустых ячеек в подписи
-        for col in [1, 2, 3]:
-            worksheet.cell(row=signature_row, column=col).alignment = Alignment(horizontal='center')
+        print("\nНазначения:")
+        print_lines(assignments,
+                    lambda a: f"Бригада {a['brigade']} → Объект {a['object']} (время: {a['time']} дней)")
     
-    print(f"\nExcel ведомость сохранена как: {filename}")
+    result = SolveResult('ex3', status, total_time, method, prob=prob, solution=solution,
+                         rows=rows, cols=cols, times=times, assignments=assignments, show=show,
+                         bound=None if best is None else best.bound,
+                         gap=None if best is None else best.gap,
+                         filename="Brigade_Assignment_Report.xlsx",
+                         render=lambda filename: create_excel_report(assignments, filename))
+    return finish_result(result, report, verbose)
+
+# Формат ведомости распределения бригад
+REPORT_SPEC = ReportSpec(
+    title='Ведомость распределения бригад по объектам строительства',
+    title_style='title_11',
+    columns=[
+        Column('#', width=8, style='cell_center'),
+        Column('brigade', width=11, style='cell_center'),
+        Column('object', width=11, style='cell_center'),
+        Column(value='дни', style='cell_center'),
+        Column('time', style='cell_center', total=True, total_style='cell_bold_center'),
+    ],
+    header=[
+        ['', '', '', 'Срок', ''],
+        ['№ пп', 'Бригада', 'Объект', 'Ед.изм.', 'Кол-во'],
+        ['1', '2', '3', '4', '5'],
+    ],
+    header_merges=[(1, 4, 1, 5)],
+    total_span=4,
+    signature=['', '', '', 'Составил:', 'Романова О.А.'],
+    signature_styles=['center', 'center', 'center', 'sign_right', 'sign_center'],
+)
+
+def create_excel_report(assignments, filename="Brigade_Assignment_Report.xlsx"):
+    """Создание Excel ведомости в точном формате (CSV, если filename оканчивается на .csv)"""
+    
+    render_report(REPORT_SPEC, assignments, filename)
     
     return filename
 
+def build_generalized_model(time_matrix, load, capacity, forbidden=None):
+    """Модель обобщенной задачи о назначениях в матричной форме
+
+    Каждый объект назначается ровно одной бригаде, суммарная нагрузка
+    бригады не больше ее фонда. Переменные создаются только для
+    разрешенных пар, нагрузка которых помещается в фонд бригады.
+    Возвращает модель и массивы (бригада, объект) для каждой переменной.
+    """
+
+    time_matrix = np.asarray(time_matrix, dtype=float)
+    load = np.asarray(load)
+    capacity = np.asarray(capacity)
+    n, m = time_matrix.shape
+    allowed = np.isfinite(time_matrix) & (load <= capacity[:, None])
+    if forbidden is not None:
+        allowed &= ~np.asarray(forbidden, dtype=bool)
+    rows, cols = np.nonzero(allowed)
+    k = np.arange(rows.size)
+
+    A_eq = sp.csr_matrix((np.ones(rows.size), (cols, k)), shape=(m, rows.size))
+    A_ub = sp.csr_matrix((load[rows, cols].astype(float), (rows, k)), shape=(n, rows.size))
+    model = LinearModel(time_matrix[rows, cols], A_ub=A_ub, b_ub=capacity, A_eq=A_eq, b_eq=np.ones(m),
+                        bounds=(0, 1), integrality=1, name="Brigade_GAP")
+    return model, rows, cols
+
+def solve_generalized_pulp(time_matrix, load, capacity, forbidden=None):
+    """Решение обобщенной задачи о назначениях через PuLP/CBC"""
+
+    model, rows, cols = build_generalized_model(time_matrix, load, capacity, forbidden)
+    n, m = np.shape(time_matrix)
+
+    with phase('build'):
+        prob = LpProblem("Brigade_GAP", LpMinimize)
+        x = [LpVariable(f"x{i+1}_{j+1}", cat='Binary') for i, j in zip(rows.tolist(), cols.tolist())]
+        prob += lpSum(c * var for c, var in zip(model.c.tolist(), x))
+
+        by_row = [[] for _ in range(n)]
+        by_col = [[] for _ in range(m)]
+        for (i, j, a), var in zip(zip(rows.tolist(), cols.tolist(), model.A_ub.data.tolist()), x):
+            by_row[i].append((a, var))
+            by_col[j].append(var)
+        for i, items in enumerate(by_row):  # Нагрузка бригады в пределах фонда
+            prob += lpSum(a * var for a, var in items) <= float(capacity[i])
+        for items in by_col:  # Каждый объект - ровно одной бригаде
+            prob += lpSum(items) == 1
+    record_model(prob)
+
+    with phase('solve'):
+        prob.solve(PULP_CBC_CMD(msg=False))
+    record(status=LpStatus[prob.status])
+    if LpStatus[prob.status] != 'Optimal':
+        raise ValueError(f"Распределения в пределах фондов бригад не существует: {LpStatus[prob.status]}")
+
+    with phase('extract'):
+        chosen = pulp_solution(prob, x).x > 0.5
+    return prob, rows[chosen], cols[chosen]
+
+@instrument('ex3')
+def solve_generalized_assignment(time_matrix=None, load=None, capacity=None, forbidden=None,
+                                 method='lagrange', workers=None, time_limit=None,
+                                 report=False, verbose=True):
+    """Распределение бригад по объектам с фондами времени (обобщенная задача о назначениях)
+
+    Бригада может взять несколько объектов, пока их суммарная нагрузка
+    load[i][j] (по умолчанию - сам срок) не превышает фонд capacity[i];
+    каждый объект назначается ровно одной бригаде, минимизируется
+    суммарный срок. method='lagrange' - лагранжева оценка и локальный поиск
+    (generalized.solve_gap_lagrange, для тысяч объектов; нижняя оценка и
+    разрыв - в result.bound и result.gap), method='branch_price' - точный
+    метод ветвей и цен с перебором узлов в workers процессах (по умолчанию
+    число ядер) и необязательным пределом time_limit, с, method='highs' -
+    MIP через HiGHS, method='pulp' - MIP через CBC.
+    report - вывести ведомость сразу (True или имя файла); иначе ведомость
+    выводится по запросу result.report(). verbose=False отключает печать.
+    Возвращает SolveResult с бригадой каждого объекта brigade, массивами
+    rows, cols, times и записями assignments.
+    """
+
+    if time_matrix is None:
+        time_matrix = TIME_MATRIX
+        if capacity is None:
+            capacity = CAPACITY
+    time_matrix = np.asarray(time_matrix, dtype=float)
+    load = time_matrix if load is None else np.asarray(load)
+    if capacity is None:
+        raise ValueError("Для обобщенной задачи нужны фонды бригад capacity")
+    capacity = np.asarray(capacity)
+    n, m = time_matrix.shape
+    record(rows=n + m, cols=n * m, nnz=2 * n * m)
+
+    prob = solution = bound = nodes = None
+    status = 'Optimal'
+    if method == 'lagrange':
+        with phase('solve'):
+            brigade, total, bound = solve_gap_lagrange(time_matrix, load, capacity, forbidden)
+        status = 'Optimal' if total <= bound else 'Feasible'
+    elif method == 'branch_price':
+        with phase('solve'):
+            brigade, total, bound, nodes = solve_gap_branch_price(time_matrix, load, capacity, forbidden,
+                                                                  workers, time_limit)
+        status = 'Optimal' if total <= bound else 'Feasible'
+        record(nodes=nodes)
+    elif method in ('highs', 'auto'):
+        with phase('build'):
+            model, var_rows, var_cols = build_generalized_model(time_matrix, load, capacity, forbidden)
+        record_model(model)
+        with phase('solve'):
+            solution = backends.solve(model, method, time_limit=time_limit)
+        record_solution(solution)
+        if solution.status != 'Optimal':
+            raise ValueError(f"Распределения в пределах фондов бригад не существует: {solution.status}")
+        with phase('extract'):
+            chosen = solution.x > 0.5
+            brigade = np.empty(m, dtype=int)
+            brigade[var_cols[chosen]] = var_rows[chosen]
+    elif method == 'pulp':
+        prob, var_rows, var_cols = solve_generalized_pulp(time_matrix, load, capacity, forbidden)
+        brigade = np.empty(m, dtype=int)
+        brigade[var_cols] = var_rows
+    else:
+        raise ValueError(f"Неизвестный метод: {method}")
+
+    cols = np.lexsort((np.arange(m), brigade))
+    rows = brigade[cols]
+    times = time_matrix[rows, cols]
+    total_time = times.sum()
+    used = np.bincount(rows, weights=np.asarray(load)[rows, cols], minlength=n)
+    gap = None if bound is None else (total_time - bound) / max(1.0, abs(bound))
+    record(status=status, objective=total_time)
+    if gap is not None:
+        record(mip_gap=gap)
+    assignments = assignment_to_records(None, rows, cols, times)
+
+    def show():
+        print("\n" + "=" * 60)
+        print("РАСПРЕДЕЛЕНИЕ БРИГАД С ФОНДАМИ ВРЕМЕНИ")
+        print("=" * 60)
+        print(f"Метод: {method}")
+        print(f"Минимальное суммарное время: {total_time:g} дней")
+        if bound is not None:
+            print(f"Нижняя оценка: {bound:g} дней, разрыв: {gap:.4%}")
+        if nodes is not None:
+            print(f"Узлов дерева ветвлений: {nodes}")
+
+        print("\nЗагрузка бригад:")
+        print_lines(np.arange(n), lambda i: f"Бригада {i+1}: {used[i]:g} из {capacity[i]:g} дней")
+        print("\nНазначения:")
+        print_lines(assignments,
+                    lambda a: f"Бригада {a['brigade']} → Объект {a['object']} (время: {a['time']:g} дней)")
+
+    result = SolveResult('ex3', status, total_time, method, prob=prob, solution=solution,
+                         brigade=brigade, rows=rows, cols=cols, times=times, used=used,
+                         assignments=assignments, bound=bound, gap=gap, nodes=nodes, show=show,
+                         filename="Brigade_GAP_Report.xlsx",
+                         render=lambda filename: create_excel_report(assignments, filename))
+    return finish_result(result, report, verbose)
+
 # Запуск решения
 if __name__ == "__main__":
-    prob, assignments = solve_assignment_compact()
\ No newline at end of file
+    solve_assignment_compact(report=True)
\ No newline at end of file
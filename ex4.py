@@ -1,231 +1,221 @@
 import numpy as np
 from pulp import *
-import pandas as pd
 
-def ex_4():
+import scipy.sparse as sp
 
-    # Данные из контрольного примера
-    count = [0, 17, 34, 51, 68]  # Количество рабочих
+import backends
+from anytime import anytime_allocation, solve_anytime
+from allocation import solve_allocation_dp, solve_allocation_lagrange, allocation_to_records
+from lp_matrix import LinearModel, pulp_solution
+from report import Column, ReportSpec, render_report
+from metrics import instrument, phase, record, record_model, record_solution
+from result import PRINT_LIMIT, SolveResult, finish_result, print_lines
 
-    CMR = np.array([
-        [0,  0,  0,  0],
-        [8,  9,  7, 6],
-        [14, 16, 16, 10],
-        [24, 25, 22, 18],
-        [32, 33, 30, 24]
-    ])
+# Данные из контрольного примера
+COUNT = [0, 17, 34, 51, 68]  # Количество рабочих
 
+CMR_EXAMPLE = np.array([
+    [0,  0,  0,  0],
+    [8,  9,  7, 6],
+    [14, 16, 16, 10],
+    [24, 25, 22, 18],
+    [32, 33, 30, 24]
+])
+
+C_EXAMPLE = 68  # Всего рабочих
+
+def build_allocation_model(count, CMR, C):
+    """Модель распределения рабочих в матричной форме (переменная v[i, j] - номер i * objects + j)"""
+    
+    CMR = np.asarray(CMR, dtype=float)
+    levels, objects = CMR.shape
+    
+    # Строка 0 - общее число рабочих, далее по одной группе на каждый объект
+    A_budget = sp.csr_matrix(np.repeat(np.asarray(count, dtype=float), objects)[None, :])
+    A_objects = sp.kron(np.ones((1, levels)), sp.identity(objects), format='csr')
+    A_eq = sp.vstack([A_budget, A_objects], format='csr')
+    b_eq = np.concatenate([[C], np.ones(objects)])
+    
+    return LinearModel(CMR.ravel(), A_eq=A_eq, b_eq=b_eq, bounds=(0, 1), integrality=1,
+                       sense='max', name='Maximize_CMR')
+
+def solve_allocation_pulp(count, CMR, C):
+    """Решение задачи распределения рабочих через PuLP/CBC (режим проверки)"""
+    
+    levels, objects = CMR.shape
+    
     # Бинарные переменные
-    v = np.array([
-        [LpVariable("v11", cat='Binary'), LpVariable("v12", cat='Binary'), 
-        LpVariable("v13", cat='Binary'), LpVariable("v14", cat='Binary')],
-        [LpVariable("v21", cat='Binary'), LpVariable("v22", cat='Binary'), 
-        LpVariable("v23", cat='Binary'), LpVariable("v24", cat='Binary')],
-        [LpVariable("v31", cat='Binary'), LpVariable("v32", cat='Binary'), 
-        LpVariable("v33", cat='Binary'), LpVariable("v34", cat='Binary')],
-        [LpVariable("v41", cat='Binary'), LpVariable("v42", cat='Binary'), 
-        LpVariable("v43", cat='Binary'), LpVariable("v44", cat='Binary')],
-        [LpVariable("v51", cat='Binary'), LpVariable("v52", cat='Binary'), 
-        LpVariable("v53", cat='Binary'), LpVariable("v54", cat='Binary')]
-    ])
-
-    C = 68  # Всего рабочих
+    v = np.array([[LpVariable(f"v{i+1}_{j+1}", cat='Binary') for j in range(objects)]
+                  for i in range(levels)])
 
     problem = LpProblem('Maximize_CMR', LpMaximize)
 
-    # Целевая функция
-    profit = lpSum(CMR[i][j] * v[i][j] for i in range(5) for j in range(4))
-    problem += profit
+    with phase('build'):
+        # Целевая функция
+        profit = lpSum(CMR[i][j] * v[i][j] for i in range(levels) for j in range(objects))
+        problem += profit
 
-    # Ограничение на общее количество рабочих
-    problem += (lpSum(count[i] * v[i][j] for i in range(5) for j in range(4)) == C)
+        # Ограничение на общее количество рабочих
+        problem += (lpSum(count[i] * v[i][j] for i in range(levels) for j in range(objects)) == C)
 
-    # Каждому объекту назначается ровно одна группа рабочих
-    for j in range(4):
-        problem += lpSum(v[i][j] for i in range(5)) == 1
+        # Каждому объекту назначается ровно одна группа рабочих
+        for j in range(objects):
+            problem += lpSum(v[i][j] for i in range(levels)) == 1
+    record_model(problem)
 
     # Решение
-    status = problem.solve()
-
-    print("Матрица распределения:")
-    print("=" * 50)
-    print("Объекты →", end=" ")
-    for j in range(4):
-        print(f"  {j+1}  ", end=" ")
-    print("\n" + "=" * 50)
-
-    for i in range(5):
-        print(f"Группа {i} ({count[i]} раб.) |", end=" ")
-        for j in range(4):
-            val = v[i][j].varValue 
-            print(f" {val:5.1f} ", end=" ")
-        print()
-
-    print("=" * 50)
-    print("Status:", LpStatus[status])
-    print("Result:")
-    for i in range(5):
-        print(f"Группа {i}:", end=" ")
-        for j in range(4):
-            print(f"{v[i][j].varValue:>4}", end=" ")
-        print()
-
-    # Используем pulp.value() явно
-    print("Максимальный объем СМР:", pulp.value(problem.objective))
-
-    # Проверка распределения рабочих
-    total_workers = 0
-    total_cmr = 0
-    assignments = []
-    for j in range(4):
-        for i in range(5):
-            if v[i][j].varValue == 1:
-                total_workers += count[i]
-                total_cmr += CMR[i][j]
-                print(f"Объект {j+1}: {count[i]} рабочих, СМР = {CMR[i][j]} тыс.руб")
-                assignments.append({
-                    'object': j+1,
-                    'count': count[i],
-                    'cmr': CMR[i][j]
-                })
-
-    print(f"Всего распределено рабочих: {total_workers}")
-    print(f"Суммарный объем СМР: {total_cmr} тыс.руб")
-    # Создание Excel документа
-    create_excel_report(assignments)
+    with phase('solve'):
+        status = problem.solve(PULP_CBC_CMD(msg=False))
+    record(status=LpStatus[status])
+    if LpStatus[status] != 'Optimal':
+        raise ValueError(f"Невозможно распределить ровно {C} рабочих: {LpStatus[status]}")
+
+    with phase('extract'):
+        groups = pulp_solution(problem, v.ravel()).as_matrix((levels, objects)).argmax(axis=0)
     
-    return problem, assignments
+    return problem, groups
 
-def create_excel_report(assignments):
-    """Создание Excel ведомости в точном формате"""
-    
-    # Создаем данные для таблицы
-    data = []
+@instrument('ex4')
+def ex_4(count=None, CMR=None, C=None, method='dp', report=False, verbose=True,
+         time_limit=None, callback=None):
+    """Распределение рабочих по объектам
     
-    # Заголовок таблицы
-    data.append(['Ведомость распределения рабочих по объектам строительства'])
-    data.append([])  # Пустая строка
-    
-    # Шапка таблицы 
-    data.append(['№ пп', 'Объект', 'Количество рабочих','', 'Объем СМР',''])  # Основная шапка
-    data.append(['', '', 'Ед.изм.','Кол-во', 'Ед.изм.','Кол-во'])
-    data.append(['1', '2', '3', '4', '5','6'])  # Нумерация колонок
-    
-    # Данные по назначениям
-    total_cmr = 0
-    for idx, assignment in enumerate(assignments, 1):
-        data.append([
-            idx,
-            assignment['object'],
-            'чел',
-            assignment['count'],
-            'тыс.руб',
-            assignment['cmr']
-        ])
-        total_cmr += assignment['cmr']
-    
-    # Итоги
-    data.append(['Итого', '', '', '', '',total_cmr])
-    
-    # Пустые строки перед подписью
-    data.append([])
-    data.append([])
-    
-    # Подпись
-    data.append(['', '', '', 'Составил:', 'Романова О.А.'])
-    
-    # Создаем DataFrame
-    df = pd.DataFrame(data)
-    
-    # Создаем Excel файл
-    filename = "Ex4.xlsx"
-    
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Ведомость', index=False, header=False)
-        
-        # Получаем workbook и worksheet для форматирования
-        workbook = writer.book
-        worksheet = writer.sheets['Ведомость']
-        
-        # Настраиваем ширину колонок
-        column_widths = [8, 12, 12, 14, 14]
-        for i, width in enumerate(column_widths, 1):
-            worksheet.column_dimensions[chr(64 + i)].width = width
-        
-        # Форматируем заголовок
-        from openpyxl.styles import Font, Alignment, Border, Side
-        
-        # Стиль для заголовка
-        title_font = Font(size=11, bold=True) 
-        worksheet['A1'].font = title_font
-        worksheet.merge_cells('A1:F1')
-        worksheet['A1'].alignment = Alignment(horizontal='center')
-        
-        # Стиль для шапки таблицы
-        header_font = Font(bold=True)
-        
-        # Объединяем ячейки шапки ПРАВИЛЬНО
-        worksheet.merge_cells('C3:D3')
-        worksheet.merge_cells('A3:A4')
-        worksheet.merge_cells('B3:B4')
-        
-        # Применяем стиль ко всем строкам шапки
-        for row in [3, 4]:
-            for col in range(1, 7):
-                cell = worksheet.cell(row=row, column=col)
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Границы для таблицы
-        thin_border = Border(left=Side(style='thin'), 
-                           right=Side(style='thin'), 
-                           top=Side(style='thin'), 
-                           bottom=Side(style='thin'))
-        
-        # Применяем границы ко всей таблице (от шапки до итогов)
-        start_row = 3  # Начало таблицы (первая строка шапки)
-        end_row = 5 + len(assignments) + 1  # До строки с итогами включительно
-        
-        for row in range(start_row, end_row + 1):
-            for col in range(1, 7):
-                if row <= worksheet.max_row and col <= 6:
-                    worksheet.cell(row=row, column=col).border = thin_border
-        
-        # ВЫРАВНИВАНИЕ ПО ЦЕНТРУ для всех данных
-        for row in range(5, 5 + len(assignments) + 1):  # Строки с данными
-            for col in range(1, 7):  # Все колонки
-                worksheet.cell(row=row, column=col).alignment = Alignment(
-                    horizontal='center', 
-                    vertical='center'
-                )
-        
-        # Итоговая строка
-        total_row = 6 + len(assignments)
-        worksheet.cell(row=total_row, column=1).font = Font(bold=True)
-        worksheet.cell(row=total_row, column=5).font = Font(bold=True)
-        worksheet.cell(row=total_row, column=5).alignment = Alignment(
-            horizontal='center', 
-            vertical='center'
-        )
-        
-        # Объединяем ячейки для "Итого"
-        worksheet.merge_cells(f'A{total_row}:D{total_row}')
-        
-        # Подпись
-        signature_row = total_row + 3
-        worksheet.cell(row=signature_row, column=4).font = Font(bold=True)
-        worksheet.cell(row=signature_row, column=5).font = Font(bold=True)
-        worksheet.cell(row=signature_row, column=4).alignment = Alignment(horizontal='right')
-        worksheet.cell(row=signature_row, column=5).alignment = Alignment(horizontal='center')
-        
-        # Выравнивание для пустых ячеек в подписи
-        for col in [1, 2, 3]:
-            worksheet.cell(row=signature_row, column=col).alignment = Alignment(horizontal='center')
+    method='dp' - динамическое программирование на NumPy, method='highs' - матричная
+    модель через HiGHS, method='pulp' - MIP через CBC, method='auto' - матричная
+    модель с выбором решателя по ее структуре (backends.solve), method='lagrange' -
+    лагранжева релаксация бюджета рабочих с отсечением вариантов по оценке
+    (для тысяч объектов; верхняя оценка и разрыв - в result.bound и result.gap),
+    method='anytime' - рекорды по мере улучшения (жадное распределение,
+    релаксация, точный шаг; anytime.anytime_allocation): каждый рекорд
+    передается в callback, а по истечении time_limit (с) возвращается лучший
+    найденный со статусом 'Feasible' (бисекция прекращается, точный шаг
+    прерывается; после истечения времени выполняется только восстановление
+    рекорда по найденному множителю).
+    report - вывести ведомость сразу (True или имя файла); иначе ведомость
+    выводится по запросу result.report(). verbose=False отключает печать.
+    Возвращает SolveResult с номерами групп groups и записями assignments.
+    """
+
+    if count is None:
+        count, CMR, C = COUNT, CMR_EXAMPLE, C_EXAMPLE
+    count = np.asarray(count)
+    CMR = np.asarray(CMR)
+    levels, objects = CMR.shape
+
+    problem = solution = bound = incumbent = None
+    status = 'Optimal'
+    if method == 'dp':
+        record(rows=objects + 1, cols=levels * objects, nnz=2 * levels * objects)
+        with phase('solve'):
+            groups, best = solve_allocation_dp(count, CMR, C)
+        record(status='Optimal', objective=best)
+    elif method == 'lagrange':
+        record(rows=objects + 1, cols=levels * objects, nnz=2 * levels * objects)
+        with phase('solve'):
+            groups, best, bound = solve_allocation_lagrange(count, CMR, C)
+        # Если точный шаг превысил предел состояний, остается рекорд с ненулевым разрывом
+        status = 'Optimal' if bound - best <= 1e-9 * max(1.0, abs(bound)) else 'Feasible'
+        record(status=status, objective=best, mip_gap=(bound - best) / max(1.0, abs(bound)))
+    elif method == 'anytime':
+        record(rows=objects + 1, cols=levels * objects, nnz=2 * levels * objects)
+        with phase('solve'):
+            incumbent = solve_anytime(anytime_allocation(count, CMR, C, time_limit), callback)
+        if incumbent is None:
+            raise ValueError(f"Распределение ровно {C} рабочих не найдено за отведенное время")
+        groups, bound = incumbent.groups, incumbent.bound
+        status = 'Optimal' if incumbent.gap == 0 else 'Feasible'
+        record(status=status, mip_gap=incumbent.gap)
+    elif method in ('highs', 'auto'):
+        with phase('build'):
+            model = build_allocation_model(count, CMR, C)
+        record_model(model)
+        with phase('solve'):
+            solution = backends.solve(model, method)
+        record_solution(solution)
+        if solution.status != 'Optimal':
+            raise ValueError(f"Невозможно распределить ровно {C} рабочих: {solution.status}")
+        with phase('extract'):
+            groups = solution.as_matrix((levels, objects)).argmax(axis=0)
+    elif method == 'pulp':
+        problem, groups = solve_allocation_pulp(count, CMR, C)
+    else:
+        raise ValueError(f"Неизвестный метод: {method}")
+
+    # Проверка распределения рабочих
+    assignments = allocation_to_records(count, CMR, groups)
+    total_workers = assignments['count'].sum()
+    total_cmr = assignments['cmr'].sum()
+    record(objective=total_cmr)
+    gap = None if bound is None else (bound - total_cmr) / max(1.0, abs(bound))
+
+    def show():
+        # Матрица распределения 0/1 (группа × объект) - только для небольших задач
+        if objects <= PRINT_LIMIT:
+            v = np.zeros((levels, objects))
+            v[groups, np.arange(objects)] = 1
+
+            print("Матрица распределения:")
+            print("=" * 50)
+            print("Объекты →", end=" ")
+            for j in range(objects):
+                print(f"  {j+1}  ", end=" ")
+            print("\n" + "=" * 50)
+
+            for i in range(levels):
+                print(f"Группа {i} ({count[i]} раб.) |", end=" ")
+                for j in range(objects):
+                    print(f" {v[i][j]:5.1f} ", end=" ")
+                print()
+
+            print("=" * 50)
+        print("Метод:", method)
+        print_lines(assignments,
+                    lambda a: f"Объект {a['object']}: {a['count']} рабочих, СМР = {a['cmr']} тыс.руб")
+        print("Максимальный объем СМР:", total_cmr)
+        print(f"Всего распределено рабочих: {total_workers}")
+        print(f"Суммарный объем СМР: {total_cmr} тыс.руб")
+        if incumbent is not None:
+            print(f"Этап: {incumbent.stage}")
+        if bound is not None:
+            print(f"Верхняя оценка: {bound:g} тыс.руб, разрыв: {gap:.4%}")
+
+    result = SolveResult('ex4', status, total_cmr, method, prob=problem, solution=solution,
+                         groups=groups, assignments=assignments, bound=bound, gap=gap,
+                         show=show, filename="Ex4.xlsx",
+                         render=lambda filename: create_excel_report(assignments, filename))
+    return finish_result(result, report, verbose)
+
+# Формат ведомости распределения рабочих
+REPORT_SPEC = ReportSpec(
+    title='Ведомость распределения рабочих по объектам строительства',
+    title_style='title_11',
+    columns=[
+        Column('#', width=8, style='cell_center'),
+        Column('object', width=12, style='cell_center'),
+        Column(value='чел', width=12, style='cell_center'),
+        Column('count', style='cell_center'),
+        Column(value='тыс.руб', style='cell_center'),
+        Column('cmr', style='cell_center', total=True, total_style='cell_bold_center'),
+    ],
+    header=[
+        ['№ пп', 'Объект', 'Количество рабочих','', 'Объем СМР',''],
+        ['', '', 'Ед.изм.','Кол-во', 'Ед.изм.','Кол-во'],
+        ['1', '2', '3', '4', '5','6'],
+    ],
+    header_styles=['header', 'header', 'cell_center'],
+    header_merges=[(1, 3, 1, 4), (1, 1, 2, 1), (1, 2, 2, 2)],
+    total_span=4,
+    signature=['', '', '', 'Составил:', 'Романова О.А.'],
+    signature_styles=['center', 'center', 'center', 'sign_right', 'sign_center'],
+)
+
+def create_excel_report(assignments, filename="Ex4.xlsx"):
+    """Создание Excel ведомости в точном формате (CSV, если filename оканчивается на .csv)"""
     
-    print(f"\nExcel ведомость сохранена как: {filename}")
+    render_report(REPORT_SPEC, assignments, filename)
     
     return filename
 
 # Запуск решения
 if __name__ == "__main__":
-    problem, assignments = ex_4()
\ No newline at end of file
+    ex_4(report=True)
\ No newline at end of file
@@ -0,0 +1,493 @@
+import heapq
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from math import gcd
+
+import numpy as np
+import scipy.sparse as sp
+
+from lp_matrix import LinearModel
+
+SUBGRADIENT_ITERATIONS = 300  # Предел шагов субградиентного метода
+SUBGRADIENT_PATIENCE = 20     # Шагов без улучшения оценки до уменьшения шага вдвое
+SWAP_BLOCK = 4 * 10 ** 6      # Предел элементов матрицы выигрышей обменов за один блок
+
+
+def _validate(cost, load, capacity, forbidden=None):
+    """Проверяет данные и приводит их к массивам NumPy
+
+    Возвращает стоимости (inf - запрещенная пара, в том числе пары, нагрузка
+    которых больше фонда бригады), целые нагрузки и фонды бригад.
+    """
+
+    cost = np.array(cost, dtype=float)
+    if cost.ndim != 2:
+        raise ValueError("Матрица сроков должна быть двумерной")
+    cost[np.isnan(cost)] = np.inf
+    if forbidden is not None:
+        cost[np.asarray(forbidden, dtype=bool)] = np.inf
+    load = np.asarray(load)
+    capacity = np.asarray(capacity)
+    if load.shape != cost.shape:
+        raise ValueError("Матрица нагрузок должна совпадать по размеру с матрицей сроков")
+    if capacity.shape != (cost.shape[0],):
+        raise ValueError("Длина capacity должна совпадать с числом бригад")
+    for name, values in (('Нагрузки', load), ('Фонды бригад', capacity)):
+        if (values != np.round(values)).any() or (values < 0).any():
+            raise ValueError(f"{name} должны быть неотрицательными целыми")
+    load = np.round(load).astype(np.int64)
+    capacity = np.round(capacity).astype(np.int64)
+
+    cost[load > capacity[:, None]] = np.inf
+    lonely = np.flatnonzero(~np.isfinite(cost).any(axis=0))
+    if lonely.size:
+        raise ValueError(f"Объект {lonely[0] + 1} не может принять ни одна бригада")
+    return cost, load, capacity
+
+
+def _used(load, brigade, n):
+    """Загрузка бригад при распределении brigade (номер бригады для каждого объекта)"""
+
+    return np.bincount(brigade, weights=load[brigade, np.arange(brigade.size)], minlength=n)
+
+
+def _repair(cost, load, capacity, brigade):
+    """Снятие перегрузки переводом объектов в бригады с запасом фонда
+
+    За проход для каждого объекта перегруженной бригады векторно ищется
+    самая дешевая бригада, в которую он помещается; переводы применяются по
+    возрастанию прироста стоимости на день снятой нагрузки. Возвращает
+    допустимое распределение или None, если перегрузку снять не удалось.
+    """
+
+    n = cost.shape[0]
+    brigade = brigade.copy()
+    used = _used(load, brigade, n)
+    while True:
+        over = used > capacity
+        if not over.any():
+            return brigade
+        on = np.flatnonzero(over[brigade])
+        fits = (load[:, on] <= (capacity - used)[:, None]) & ~over[:, None]
+        delta = np.where(fits, cost[:, on] - cost[brigade[on], on], np.inf)
+        target = delta.argmin(axis=0)
+        score = delta[target, np.arange(on.size)] / np.maximum(load[brigade[on], on], 1)
+
+        moved = False
+        for k in np.argsort(score, kind='stable'):
+            if not np.isfinite(score[k]):
+                break
+            j, t = on[k], target[k]
+            s = brigade[j]
+            if used[s] <= capacity[s] or used[t] + load[t, j] > capacity[t]:
+                continue
+            brigade[j] = t
+            used[s] -= load[s, j]
+            used[t] += load[t, j]
+            moved = True
+        if not moved:
+            return None
+
+
+def _greedy(load, capacity, desire):
+    """Жадное построение по сожалению (эвристика Мартелло - Тота)
+
+    На каждом шаге выбирается объект с наибольшей разностью между вторым и
+    первым по желательности desire (меньше - лучше) вариантами среди
+    бригад, где он помещается, и назначается лучшей из них. Возвращает
+    распределение или None, если очередной объект не поместился.
+    """
+
+    n, m = desire.shape
+    brigade = np.full(m, -1)
+    spare = capacity.copy()
+    options = np.where(load <= spare[:, None], desire, np.inf)
+
+    def regret_of(columns):
+        part = options[:, columns]
+        two = np.partition(part, 1, axis=0)[:2] if n > 1 else np.vstack([part, np.full(part.shape[1], np.inf)])
+        with np.errstate(invalid='ignore'):
+            return np.where(np.isfinite(two[1]), two[1] - two[0], np.inf), np.isfinite(two[0])
+
+    regret, feasible = regret_of(np.arange(m))
+    for _ in range(m):
+        j = int(regret.argmax())
+        if not feasible[j]:
+            return None
+        i = int(options[:, j].argmin())
+        brigade[j] = i
+        spare[i] -= load[i, j]
+        options[:, j] = np.inf
+        regret[j] = -np.inf
+        # Сожаление пересчитывается только для объектов, переставших помещаться в бригаду i
+        lost = np.flatnonzero(np.isfinite(options[i]) & (load[i] > spare[i]))
+        if lost.size:
+            options[i, lost] = np.inf
+            regret[lost], feasible[lost] = regret_of(lost)
+    return brigade
+
+
+def _improve(cost, load, capacity, brigade):
+    """Локальный поиск переводами и обменами объектов между бригадами
+
+    Переводы объекта в другую бригаду с запасом фонда и обмены объектов двух
+    бригад оцениваются векторно; за проход применяются лучшие переводы с
+    проверкой фонда, а если их нет - лучшие обмены, не затрагивающие одну
+    бригаду дважды (так фонды не нарушаются).
+    Возвращает распределение в локальном оптимуме.
+    """
+
+    n, m = cost.shape
+    brigade = brigade.copy()
+    sites = np.arange(m)
+    used = _used(load, brigade, n)
+    tol = 1e-9 * max(1.0, np.abs(cost[brigade, sites]).max(initial=0.0))
+    cheapest = cost.min(axis=0)
+    while True:
+        current = cost[brigade, sites]
+
+        # Переводы: gain[i, j] - экономия от перевода объекта j в бригаду i
+        with np.errstate(invalid='ignore'):
+            gain = np.where(load <= (capacity - used)[:, None], current - cost, -np.inf)
+        target = gain.argmax(axis=0)
+        best = gain[target, sites]
+        improved = False
+        for j in np.argsort(-best, kind='stable'):
+            if not best[j] > tol:
+                break
+            s, t = brigade[j], target[j]
+            if used[t] + load[t, j] > capacity[t]:
+                continue
+            brigade[j] = t
+            used[s] -= load[s, j]
+            used[t] += load[t, j]
+            improved = True
+        if improved:
+            continue
+
+        # Обмены: объекты j1 (бригада b1) и j2 (бригада b2) меняются бригадами.
+        # Выигрыш возможен, только если хотя бы один из них не в самой дешевой
+        # для него бригаде, поэтому j1 перебирается лишь среди таких объектов
+        spare = capacity - used
+        touched = np.zeros(n, dtype=bool)
+        swap_gain = np.full(m, -np.inf)
+        partner = np.zeros(m, dtype=int)
+        unhappy = np.flatnonzero(current > cheapest + tol)
+        block = max(1, SWAP_BLOCK // max(m, 1))
+        for start in range(0, unhappy.size, block):
+            rows = unhappy[start:start + block]
+            b1 = brigade[rows]
+            with np.errstate(invalid='ignore'):
+                gain = (current[rows, None] + current[None, :]
+                        - cost[brigade[None, :], rows[:, None]] - cost[b1[:, None], sites[None, :]])
+            fits = ((load[b1[:, None], sites[None, :]] - load[b1, rows][:, None] <= spare[b1][:, None])
+                    & (load[brigade[None, :], rows[:, None]] - load[brigade, sites][None, :]
+                       <= spare[brigade][None, :])
+                    & (b1[:, None] != brigade[None, :]))
+            gain = np.where(fits & ~np.isnan(gain), gain, -np.inf)
+            partner[rows] = gain.argmax(axis=1)
+            swap_gain[rows] = gain[np.arange(rows.size), partner[rows]]
+
+        for j1 in np.argsort(-swap_gain, kind='stable'):
+            if not swap_gain[j1] > tol:
+                break
+            j2 = partner[j1]
+            b1, b2 = brigade[j1], brigade[j2]
+            if touched[b1] or touched[b2]:
+                continue
+            brigade[j1], brigade[j2] = b2, b1
+            used[b1] += load[b1, j2] - load[b1, j1]
+            used[b2] += load[b2, j1] - load[b2, j2]
+            touched[b1] = touched[b2] = True
+            improved = True
+        if not improved:
+            return brigade
+
+
+def _is_integral(cost):
+    finite = cost[np.isfinite(cost)]
+    return bool((finite == np.round(finite)).all())
+
+
+def solve_gap_lagrange(cost, load, capacity, forbidden=None, iterations=SUBGRADIENT_ITERATIONS):
+    """Обобщенная задача о назначениях: лагранжева оценка и локальный поиск
+
+    Каждый объект j назначается одной бригаде i (срок cost[i][j], нагрузка
+    load[i][j] дней), суммарная нагрузка бригады не больше capacity[i];
+    минимизируется суммарный срок. Ограничения по фондам переносятся в
+    целевую функцию с множителями lam >= 0, и релаксация распадается на
+    выбор для каждого объекта бригады с минимумом cost + lam * load
+    (векторно по всей матрице). Множители уточняются субградиентным методом,
+    решения релаксации превращаются в допустимые снятием перегрузки (или
+    жадным построением по приведенным срокам) и улучшаются локальным
+    поиском. Возвращает (бригада каждого объекта, суммарный срок, нижняя
+    оценка).
+    """
+
+    cost, load, capacity = _validate(cost, load, capacity, forbidden)
+    n, m = cost.shape
+    sites = np.arange(m)
+    integral = _is_integral(cost)
+
+    lam = np.zeros(n)
+    best, upper, lower = None, np.inf, -np.inf
+    theta, stale = 2.0, 0
+    for _ in range(iterations):
+        reduced = cost + lam[:, None] * load
+        pick = reduced.argmin(axis=0)
+        dual = reduced[pick, sites].sum() - lam @ capacity
+        improved = dual - lower > 1e-9 * max(1.0, abs(dual))
+        if improved:
+            lower, stale = dual, 0
+        else:
+            stale += 1
+            if stale >= SUBGRADIENT_PATIENCE:
+                theta, stale = theta / 2, 0
+        # Пока рекорда нет, допустимое решение ищется на каждом шаге, затем - при росте оценки
+        if improved or best is None:
+            candidate = _repair(cost, load, capacity, pick)
+            if candidate is None:
+                candidate = _greedy(load, capacity, reduced)
+            if candidate is not None:
+                candidate = _improve(cost, load, capacity, candidate)
+                value = cost[candidate, sites].sum()
+                if value < upper:
+                    best, upper = candidate, value
+
+        limit = np.ceil(lower - 1e-6) if integral else lower
+        if upper - limit <= 1e-9 * max(1.0, abs(limit)) or theta < 1e-4:
+            break
+        # Субградиент: превышение фондов, для нулевых множителей - только положительная часть
+        g = _used(load, pick, n) - capacity
+        g[(lam <= 0) & (g < 0)] = 0
+        norm = g @ g
+        if norm == 0:
+            break
+        target = upper if np.isfinite(upper) else dual + 0.05 * abs(dual) + 1.0
+        lam = np.maximum(0.0, lam + theta * (target - dual) / norm * g)
+
+    if best is None:
+        # Запасной вариант - жадное построение по доле фонда, занимаемой объектом
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(np.isfinite(cost), load / np.maximum(capacity, 1)[:, None], np.inf)
+        best = _greedy(load, capacity, share)
+        if best is not None:
+            best = _improve(cost, load, capacity, best)
+            upper = cost[best, sites].sum()
+    if best is None:
+        raise ValueError("Эвристика не нашла распределения в пределах фондов бригад "
+                         "(точный метод - solve_gap_branch_price)")
+    if integral:
+        lower = np.ceil(lower - 1e-6)
+    return best, upper, min(lower, upper)
+
+
+def _knapsack(profit, weight, capacity):
+    """0/1-рюкзак динамическим программированием по целой вместимости
+
+    Рассматриваются только предметы с положительной ценностью. Возвращает
+    (номера выбранных предметов, наибольшая суммарная ценность).
+    """
+
+    items = np.flatnonzero((profit > 0) & (weight <= capacity))
+    if items.size == 0:
+        return items, 0.0
+    step = reduce(gcd, [int(w) for w in np.unique(weight[items])] + [int(capacity)]) or 1
+    units = weight[items] // step
+    cap = int(capacity) // step
+
+    dp = np.zeros(cap + 1)
+    keep = np.zeros((items.size, cap + 1), dtype=bool)
+    for r, (u, p) in enumerate(zip(units, profit[items])):
+        take = dp[:cap + 1 - u] + p
+        keep[r, u:] = take > dp[u:]
+        dp[u:] = np.maximum(dp[u:], take)
+
+    chosen = []
+    w = cap
+    for r in range(items.size - 1, -1, -1):
+        if keep[r, w]:
+            chosen.append(items[r])
+            w -= units[r]
+    return np.array(chosen[::-1], dtype=int), dp[cap]
+
+
+def _solve_node(task):
+    """Генерация столбцов в узле дерева ветвлений (в рабочем процессе)
+
+    task - (сроки, нагрузки, фонды, разрешенные пары, закрепленные пары,
+    столбцы узла, порог отсечения, целые ли сроки). Главная задача -
+    покрытие объектов наборами (бригада, объекты) не более одного на
+    бригаду, с искусственными переменными большого штрафа; новые наборы
+    дает рюкзак по двойственным оценкам. При целых сроках генерация
+    прекращается, как только округленная вверх оценка Лэсдона сравнялась
+    с округленным значением главной задачи. Возвращает (исход, оценка,
+    данные, новые столбцы): исход 'pruned', 'infeasible', 'integer' (данные
+    - бригада каждого объекта) или 'branch' (данные - пара (i, j)).
+    """
+
+    cost, load, capacity, allowed, forced, columns, cutoff, integral = task
+    n, m = cost.shape
+    penalty = np.where(np.isfinite(cost), cost, 0.0).max(axis=0).sum() + 1.0
+    reserved = (load * forced).sum(axis=1)
+    fixed = [np.flatnonzero(forced[i]) for i in range(n)]
+    free = allowed & ~forced
+    prices = [cost[i, s].sum() for i, s in columns]
+    created = []
+    while True:
+        k = len(columns)
+        owner = np.array([i for i, _ in columns], dtype=int)
+        lengths = np.array([s.size for _, s in columns], dtype=int)
+        flat = np.concatenate([s for _, s in columns]) if k else np.empty(0, dtype=int)
+        cover = sp.csr_matrix((np.ones(flat.size), (flat, np.repeat(np.arange(k), lengths))), shape=(m, k))
+        model = LinearModel(np.concatenate([prices, np.full(m, penalty)]),
+                            A_ub=sp.csr_matrix((np.ones(k), (owner, np.arange(k))), shape=(n, k + m)),
+                            b_ub=np.ones(n),
+                            A_eq=sp.hstack([cover, sp.identity(m)], format='csr'), b_eq=np.ones(m),
+                            name='GAP_Master')
+        solution = model.solve()
+        if solution.status != 'Optimal':
+            raise ValueError(f"Главная задача не решена: {solution.status}")
+        pi, mu = solution.duals_eq, solution.duals_ub
+        artificial = solution.x[k:].sum()
+
+        # Оценка узла по Лэсдону: значение главной задачи плюс отрицательные приведенные стоимости
+        fresh = []
+        bound = solution.objective
+        for i in range(n):
+            room = capacity[i] - reserved[i]
+            if room < 0:
+                continue
+            picked, value = _knapsack(np.where(free[i], pi - cost[i], 0.0), load[i], room)
+            value += (pi[fixed[i]] - cost[i, fixed[i]]).sum()
+            reduced = -value - mu[i]
+            if reduced < -1e-9 * max(1.0, abs(solution.objective)):
+                bound += reduced
+                fresh.append((i, np.sort(np.concatenate([fixed[i], picked]))))
+        if bound >= cutoff:
+            return 'pruned', bound, None, created
+        if not fresh:
+            break
+        if integral and artificial <= 1e-6 and np.ceil(bound - 1e-6) >= np.ceil(solution.objective - 1e-6):
+            bound = np.ceil(bound - 1e-6)
+            break
+        columns = columns + fresh
+        prices += [cost[i, s].sum() for i, s in fresh]
+        created += fresh
+
+    if artificial > 1e-6:
+        return 'infeasible', np.inf, None, created
+    share = np.zeros((n, m))
+    for (i, s), weight in zip(columns, solution.x[:k]):
+        if weight > 1e-9:
+            share[i, s] += weight
+    if np.abs(share - np.round(share)).max() <= 1e-6:
+        return 'integer', solution.objective, share.argmax(axis=0), created
+    i, j = np.unravel_index(np.abs(share - 0.5).argmin(), share.shape)
+    return 'branch', bound, (int(i), int(j)), created
+
+
+def _node_masks(allowed, fixes):
+    """Разрешенные и закрепленные пары узла по списку ветвлений ((i, j), значение)"""
+
+    allowed = allowed.copy()
+    forced = np.zeros_like(allowed)
+    for (i, j), value in fixes:
+        if value:
+            allowed[:, j] = False
+            allowed[i, j] = forced[i, j] = True
+        else:
+            allowed[i, j] = False
+    return allowed, forced
+
+
+def solve_gap_branch_price(cost, load, capacity, forbidden=None, workers=None, time_limit=None,
+                           incumbent=None):
+    """Обобщенная задача о назначениях методом ветвей и цен (точное решение)
+
+    Главная задача - выбор для каждой бригады одного набора объектов,
+    помещающегося в ее фонд; наборы порождаются генерацией столбцов с
+    подзадачей о рюкзаке для каждой бригады, оценка узла - по Лэсдону.
+    Ветвление - по самой дробной паре (бригада, объект): объект закрепляется
+    за бригадой или запрещается для нее. Узлы перебираются по наименьшей
+    оценке пачками по workers штук в пуле процессов (по умолчанию число
+    ядер, 1 - без пула); общий набор столбцов пополняется столбцами всех
+    узлов. Начальный рекорд - решение solve_gap_lagrange (или incumbent).
+    По истечении time_limit (с) возвращается лучший найденный рекорд.
+    Возвращает (бригада каждого объекта, суммарный срок, нижняя оценка,
+    число узлов).
+    """
+
+    start = time.perf_counter()
+    cost, load, capacity = _validate(cost, load, capacity, forbidden)
+    m = cost.shape[1]
+    sites = np.arange(m)
+    integral = _is_integral(cost)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    best, upper = None, np.inf
+    if incumbent is None:
+        try:
+            incumbent, _, _ = solve_gap_lagrange(cost, load, capacity)
+        except ValueError:
+            incumbent = None
+    if incumbent is not None:
+        best, upper = np.asarray(incumbent), cost[incumbent, sites].sum()
+
+    def cutoff():
+        return upper - 1 + 1e-6 if integral else upper - 1e-9 * max(1.0, abs(upper))
+
+    pool = {}
+    if best is not None:
+        for i in np.unique(best):
+            members = np.flatnonzero(best == i)
+            pool[(i, members.tobytes())] = (i, members)
+    allowed = np.isfinite(cost)
+    tree = [(-np.inf, 0, ())]
+    count = nodes = 0
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while tree:
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+            batch = []
+            while tree and len(batch) < workers:
+                bound, _, fixes = heapq.heappop(tree)
+                if bound < cutoff():
+                    batch.append((bound, fixes))
+            if not batch:
+                break
+
+            tasks = []
+            for _, fixes in batch:
+                node_allowed, forced = _node_masks(allowed, fixes)
+                columns = [(i, s) for i, s in pool.values()
+                           if node_allowed[i, s].all() and forced[i, s].sum() == forced[i].sum()]
+                tasks.append((cost, load, capacity, node_allowed, forced, columns, cutoff(), integral))
+            results = executor.map(_solve_node, tasks) if executor is not None else map(_solve_node, tasks)
+            nodes += len(tasks)
+
+            for (_, fixes), (outcome, bound, data, created) in zip(batch, results):
+                for i, s in created:
+                    pool.setdefault((i, s.tobytes()), (i, s))
+                if outcome == 'integer' and bound < upper:
+                    best, upper = data, cost[data, sites].sum()
+                elif outcome == 'branch' and bound < cutoff():
+                    for value in (1, 0):
+                        count += 1
+                        heapq.heappush(tree, (bound, count, fixes + ((data, value),)))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if best is None:
+        if tree:
+            raise ValueError("Распределение в пределах фондов не найдено за отведенное время")
+        raise ValueError("Распределения в пределах фондов бригад не существует")
+    lower = min([upper] + [bound for bound, _, _ in tree])
+    if integral and np.isfinite(lower):
+        lower = min(upper, np.ceil(lower - 1e-6))
+    return best, upper, lower, nodes
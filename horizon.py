@@ -0,0 +1,355 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+import backends
+import ex1
+from lp_matrix import LinearModel
+from simplex import SimplexModel
+from report import Column, ReportSpec, render_report
+from metrics import instrument, phase, record, record_model, record_solution
+from result import SolveResult, finish_result, print_lines
+
+WINDOW = 12  # Периодов в окне скользящего планирования (недель)
+
+
+def _per_period(values, periods, width, name):
+    """Данные по периодам: вектор (одинаков для всех периодов) или матрица периоды × width"""
+
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 0:
+        values = np.full(width, float(values))
+    if values.ndim == 1:
+        values = np.broadcast_to(values, (periods, values.size))
+    if values.shape != (periods, width):
+        raise ValueError(f"{name}: ожидается форма ({periods}, {width}) или ({width},), "
+                         f"получено {values.shape}")
+    return values
+
+
+def horizon_data(profit, resources, capacity, demand, periods=None):
+    """Приведение данных многопериодной задачи к матрицам периоды × (продукция | ресурсы)
+
+    profit, capacity и demand задаются вектором (одинаково для всех периодов)
+    или матрицей по периодам; число периодов берется из матриц или periods.
+    """
+
+    resources = np.asarray(resources, dtype=float)
+    m, n = resources.shape
+    if periods is None:
+        periods = max((np.shape(v)[0] for v in (profit, capacity, demand) if np.ndim(v) == 2),
+                      default=None)
+        if periods is None:
+            raise ValueError("Число периодов не задано: передайте periods или данные по периодам")
+    return (_per_period(profit, periods, n, 'profit'), resources,
+            _per_period(capacity, periods, m, 'capacity'), _per_period(demand, periods, n, 'demand'))
+
+
+def horizon_matrix(resources, periods, storage=False):
+    """Матрица ограничений многопериодной задачи (CSR)
+
+    Переменные периода t: выпуск x_t и запас на конец периода s_t (по 2n
+    столбцов на период). Продажи y_t = s_{t-1} + x_t - s_t в модель не
+    входят, а выражаются через них. Строки периода t:
+    - ресурсы: resources @ x_t <= capacity_t;
+    - продажи неотрицательны: s_t - s_{t-1} - x_t <= 0;
+    - продажи не больше спроса: x_t + s_{t-1} - s_t <= demand_t;
+    - при storage=True - вместимость склада: s_t <= storage.
+    Структура одинакова для всех периодов, поэтому окна скользящего
+    планирования одной длины используют одну и ту же матрицу.
+    """
+
+    resources = sp.csr_matrix(np.asarray(resources, dtype=float))
+    m, n = resources.shape
+    eye = sp.identity(n, format='csr')
+    zero = sp.csr_matrix((n, n))
+    own = [[resources, sp.csr_matrix((m, n))], [-eye, eye], [eye, -eye]]
+    previous = [[sp.csr_matrix((m, n)), sp.csr_matrix((m, n))], [zero, -eye], [zero, eye]]
+    if storage:
+        own.append([zero, eye])
+        previous.append([zero, zero])
+    block = sp.bmat(own)
+    link = sp.bmat(previous)
+    A = sp.kron(sp.identity(periods), block) + sp.kron(sp.eye(periods, k=-1), link)
+    return A.tocsr()
+
+
+def horizon_vectors(profit, capacity, demand, holding=0.0, storage=None, initial=None):
+    """ЦФ, правые части и постоянное слагаемое ЦФ для периодов из матриц данных
+
+    Прибыль от продаж p_t @ y_t за вычетом хранения holding @ s_t, записанная
+    через x и s: у x_t коэффициент p_t, у s_t - (p_{t+1} - p_t - holding);
+    запас на конец последнего периода не оценивается. Начальный запас initial
+    входит в правые части первого периода и в постоянное слагаемое p_0 @ initial.
+    """
+
+    periods, n = profit.shape
+    holding = np.broadcast_to(np.asarray(holding, dtype=float), (n,))
+    initial = np.zeros(n) if initial is None else np.asarray(initial, dtype=float)
+
+    next_profit = np.vstack([profit[1:], np.zeros((1, n))])
+    c = np.hstack([profit, next_profit - profit - holding]).ravel()
+
+    blocks = [capacity, np.zeros((periods, n)), demand.copy()]
+    blocks[1][0] += initial
+    blocks[2][0] -= initial
+    if storage is not None:
+        blocks.append(np.broadcast_to(np.asarray(storage, dtype=float), (periods, n)))
+    b = np.hstack(blocks).ravel()
+    return c, b, float(profit[0] @ initial)
+
+
+def _plan_arrays(x, periods, n, initial):
+    """Выпуск, запасы и продажи по периодам из вектора решения"""
+
+    blocks = x.reshape(periods, 2, n)
+    production, inventory = blocks[:, 0], blocks[:, 1]
+    previous = np.vstack([initial[None, :], inventory[:-1]])
+    sales = previous + production - inventory
+    return production, inventory, sales
+
+
+# Формат ведомости плана производства по периодам
+PLAN_SPEC = ReportSpec(
+    title='План производства балласта по периодам',
+    columns=[
+        Column('period', width=10, style='cell_center'),
+        Column('product', width=12, style='cell_center'),
+        Column('production', style='number', total=True, total_style='number_bold'),
+        Column('sales', style='number', total=True, total_style='number_bold'),
+        Column('inventory', style='number'),
+    ],
+    header=[
+        ['Период', 'Продукция', 'Выпуск, тыс. м³', 'Продажи, тыс. м³', 'Запас, тыс. м³'],
+    ],
+    total_span=2,
+    sheet_name='План',
+)
+
+
+def create_plan_report(production, sales, inventory, filename="ProductionPlan.xlsx"):
+    """Ведомость плана по периодам: строка на период и вид продукции"""
+
+    periods, n = production.shape
+    records = np.rec.fromarrays([np.repeat(np.arange(1, periods + 1), n), np.tile(np.arange(1, n + 1), periods),
+                                 production.ravel(), sales.ravel(), inventory.ravel()],
+                                names='period,product,production,sales,inventory')
+    return render_report(PLAN_SPEC, records, filename)
+
+
+def plan_result(name, status, objective, production, inventory, sales, method=None, solution=None,
+                **values):
+    """SolveResult многопериодного плана: печать итогов и ведомость по периодам"""
+
+    def show():
+        print("=" * 50)
+        print("ПЛАН ПО ПЕРИОДАМ")
+        print("=" * 50)
+        print(f"Статус: {status}")
+        print(f"Прибыль за горизонт: {objective:.2f} тыс. ден. ед.")
+        print(f"\nВыпуск / продажи / запас на конец периода:")
+        print_lines(range(len(production)),
+                    lambda t: f"{t+1:>3}: " + "  ".join(
+                        f"x{j+1}={production[t, j]:.2f}/{sales[t, j]:.2f}/{inventory[t, j]:.2f}"
+                        for j in range(production.shape[1])))
+
+    return SolveResult(name, status, objective, method, solution=solution, production=production,
+                       inventory=inventory, sales=sales, show=show, filename="ProductionPlan.xlsx",
+                       render=lambda filename: create_plan_report(production, sales, inventory, filename),
+                       **values)
+
+
+@instrument('horizon')
+def solve_horizon(demand, profit=ex1.PROFIT, resources=ex1.RESOURCES, capacity=ex1.CAPACITY,
+                  periods=None, holding=0.0, storage=None, initial=None, backend='highs',
+                  report=False, verbose=True):
+    """План производства на весь горизонт одной моделью
+
+    Периоды - модели ex1 (ресурсы и запасы на период), связанные балансом
+    запасов продукции; demand - спрос по периодам (периоды × виды
+    продукции), holding - затраты на хранение единицы за период, storage -
+    вместимость склада по видам, initial - начальный запас.
+    Возвращает SolveResult с матрицами production, inventory, sales.
+    """
+
+    profit, resources, capacity, demand = horizon_data(profit, resources, capacity, demand, periods)
+    periods, n = demand.shape
+    with phase('build'):
+        c, b, constant = horizon_vectors(profit, capacity, demand, holding, storage, initial)
+        model = LinearModel(c, A_ub=horizon_matrix(resources, periods, storage is not None), b_ub=b,
+                            sense='max', name='Ballast_Horizon')
+    record_model(model)
+    with phase('solve'):
+        solution = backends.solve(model, backend)
+    record(method=backend)
+    record_solution(solution)
+    if solution.status != 'Optimal':
+        raise ValueError(f"План не найден: {solution.status}")
+
+    with phase('extract'):
+        initial = np.zeros(n) if initial is None else np.asarray(initial, dtype=float)
+        production, inventory, sales = _plan_arrays(solution.x, periods, n, initial)
+    objective = solution.objective + constant
+    record(objective=objective)
+    result = plan_result('horizon', solution.status, objective, production, inventory, sales,
+                         backend, solution)
+    return finish_result(result, report, verbose)
+
+
+class RollingPlanner:
+    """Скользящее планирование окнами по window периодов
+
+    Все окна одной длины имеют одну и ту же матрицу ограничений, поэтому
+    модель окна (SimplexModel) строится один раз: при сдвиге окна меняются
+    только ЦФ и правые части, а базис предыдущего окна сдвигается на число
+    прошедших периодов и служит стартовым базисом нового. Окна у конца
+    горизонта дополняются периодами без спроса. reuse=False - для
+    сравнения: модель каждого окна строится заново и решается с нуля.
+    """
+
+    def __init__(self, demand, profit=ex1.PROFIT, resources=ex1.RESOURCES, capacity=ex1.CAPACITY,
+                 window=WINDOW, periods=None, holding=0.0, storage=None, reuse=True):
+        self.profit, self.resources, self.capacity, self.demand = \
+            horizon_data(profit, resources, capacity, demand, periods)
+        self.periods, self.n = self.demand.shape
+        self.window = window
+        self.holding = holding
+        self.storage = storage
+        self.reuse = reuse
+        self.matrix = horizon_matrix(self.resources, window, storage is not None).toarray()
+        self.rows_per_period = self.matrix.shape[0] // window
+        self.model = None
+        self.start = None
+
+    def _window_data(self, start):
+        """Данные периодов start .. start + window - 1 (за горизонтом - без спроса)"""
+
+        stop = min(start + self.window, self.periods)
+        pad = self.window - (stop - start)
+        take = np.r_[start:stop, np.full(pad, self.periods - 1, dtype=int)].astype(int)
+        demand = self.demand[take].copy()
+        demand[stop - start:] = 0.0
+        return self.profit[take], self.capacity[take], demand
+
+    def _shifted_basis(self, shift):
+        """Базис предыдущего окна, сдвинутый на shift периодов (кандидаты для warm_start)"""
+
+        cols = 2 * self.n
+        total = self.window * cols
+        rows = self.rows_per_period
+        candidates = []
+        for j in self.model.basis:
+            if j < total:
+                period, offset, moved = j // cols, j, j - shift * cols
+            else:
+                period, offset, moved = (j - total) // rows, j, j - shift * rows
+            candidates.append((moved if period >= shift else None, period, offset))
+        # Сначала сдвинутые переменные, затем прежний рисунок базиса хвостовых периодов
+        return [moved for moved, _, _ in candidates if moved is not None] + \
+            [offset for _, period, offset in candidates if period >= self.window - shift]
+
+    def plan(self, start, initial=None):
+        """Решение окна, начинающегося с периода start; возвращает ModelSolution
+
+        В решении дополнительно: production, inventory, sales (окно × виды
+        продукции) и objective с учетом начального запаса.
+        """
+
+        initial = np.zeros(self.n) if initial is None else np.asarray(initial, dtype=float)
+        profit, capacity, demand = self._window_data(start)
+        c, b, constant = horizon_vectors(profit, capacity, demand, self.holding, self.storage, initial)
+
+        if self.model is None or not self.reuse:
+            self.model = SimplexModel(c, self.matrix, b, sense='max')
+        else:
+            shift = start - self.start
+            self.model.update_objective(c)
+            self.model.update_rhs(b)
+            if 0 < shift < self.window and self.model.basis is not None:
+                self.model.warm_start(self._shifted_basis(shift))
+            elif shift != 0:
+                self.model.reset()
+        self.start = start
+
+        solution = self.model.solve()
+        if solution.status != 'Optimal':
+            raise ValueError(f"Окно с периода {start + 1} не решено: {solution.status}")
+        solution.objective += constant
+        solution.production, solution.inventory, solution.sales = \
+            _plan_arrays(solution.x, self.window, self.n, initial)
+        return solution
+
+    def roll(self, start=0, stop=None, initial=None):
+        """Скользящее планирование: в каждом окне фиксируется решение первого периода
+
+        Запас на конец зафиксированного периода становится начальным запасом
+        следующего окна. Возвращает (выпуск, запас, продажи) по периодам
+        start .. stop - 1, прибыль и статистику решений окон.
+        """
+
+        stop = self.periods if stop is None else stop
+        initial = np.zeros(self.n) if initial is None else np.asarray(initial, dtype=float)
+        holding = np.broadcast_to(np.asarray(self.holding, dtype=float), (self.n,))
+        production = np.zeros((stop - start, self.n))
+        inventory = np.zeros_like(production)
+        sales = np.zeros_like(production)
+        iterations = np.zeros(stop - start, dtype=int)
+        solve_time = np.zeros(stop - start)
+        for k, t in enumerate(range(start, stop)):
+            solution = self.plan(t, initial)
+            production[k], inventory[k], sales[k] = \
+                solution.production[0], solution.inventory[0], solution.sales[0]
+            iterations[k], solve_time[k] = solution.iterations, solution.solve_time
+            initial = inventory[k]
+        profit = float((self.profit[start:stop] * sales).sum() - (inventory @ holding).sum())
+        return production, inventory, sales, profit, {'iterations': iterations, 'solve_time': solve_time}
+
+
+@instrument('horizon')
+def rolling_horizon(demand, profit=ex1.PROFIT, resources=ex1.RESOURCES, capacity=ex1.CAPACITY,
+                    window=WINDOW, periods=None, holding=0.0, storage=None, initial=None,
+                    reuse=True, report=False, verbose=True):
+    """Скользящее планирование на весь горизонт окнами по window периодов
+
+    Каждое окно планируется с теплым стартом от предыдущего (RollingPlanner),
+    исполняется только первый период. Параметры - как у solve_horizon.
+    Возвращает SolveResult с матрицами production, inventory, sales и
+    статистикой окон: iterations, solve_time.
+    """
+
+    with phase('build'):
+        planner = RollingPlanner(demand, profit, resources, capacity, window, periods, holding,
+                                 storage, reuse)
+    record(rows=planner.matrix.shape[0], cols=planner.matrix.shape[1],
+           nnz=int(np.count_nonzero(planner.matrix)))
+    with phase('solve'):
+        production, inventory, sales, objective, stats = planner.roll(initial=initial)
+    record(method='rolling', status='Optimal', objective=objective,
+           iterations=int(stats['iterations'].sum()))
+    result = plan_result('horizon', 'Optimal', objective, production, inventory, sales, 'rolling',
+                         **stats)
+    return finish_result(result, report, verbose)
+
+
+def seasonal_demand(periods=52, base=(6.0, 9.0, 6.0), amplitude=0.5, seed=0):
+    """Спрос по неделям с сезонным пиком летом (пример данных для горизонта)"""
+
+    rng = np.random.default_rng(seed)
+    season = 1 + amplitude * np.sin(2 * np.pi * (np.arange(periods) - periods / 4) / periods)
+    noise = rng.uniform(0.9, 1.1, size=(periods, len(base)))
+    return np.round(np.outer(season, base) * noise, 2)
+
+
+# Запуск решения
+if __name__ == "__main__":
+    demand = seasonal_demand()
+    full = solve_horizon(demand, holding=0.1, verbose=False)
+    print(f"Весь горизонт ({len(demand)} нед.): прибыль {full.objective:.2f}")
+
+    for reuse in (True, False):
+        start = time.perf_counter()
+        rolled = rolling_horizon(demand, holding=0.1, reuse=reuse, verbose=False)
+        label = "с теплым стартом" if reuse else "с перестроением"
+        print(f"Скользящее окно {WINDOW} нед. ({label}): прибыль {rolled.objective:.2f}, "
+              f"итераций {rolled.iterations.sum()}, {time.perf_counter() - start:.3f} с")
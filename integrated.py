@@ -0,0 +1,249 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+
+import ex1
+import ex2
+from arcs import as_arcs
+from lp_matrix import LinearModel
+from metrics import instrument, phase, record
+from result import SolveResult, finish_result, print_lines
+
+# Карьеры контрольного примера: модель производства ex1 с запасами ресурсов,
+# масштабированными под мощности карьеров ex2 (35 и 25 тыс. м³)
+QUARRIES = [
+    (ex1.PROFIT, ex1.RESOURCES, [3.6 * v for v in ex1.CAPACITY]),
+    (ex1.PROFIT, ex1.RESOURCES, [2.6 * v for v in ex1.CAPACITY]),
+]
+
+
+def _quarry_model(profit, resources, capacity, volume, supply):
+    """Модель карьера: максимум прибыли при отгрузке не меньше supply
+
+    Последняя строка -volume @ x <= -supply - объем продукции, отгружаемой
+    на участки; ее двойственная оценка дает наклон отсечения Бендерса.
+    """
+
+    A = np.vstack([np.asarray(resources, dtype=float), -np.asarray(volume, dtype=float)])
+    b = np.append(np.asarray(capacity, dtype=float), -supply)
+    return LinearModel(profit, A_ub=A, b_ub=b, sense='max', name='Quarry_Production')
+
+
+def _solve_quarries(tasks):
+    """Решение подзадач блока карьеров (в рабочем процессе)
+
+    tasks - (прибыль, нормы, запасы, объем единицы продукции, отгрузка);
+    отгрузка None - вместо подзадачи ищется наибольший объем отгрузки.
+    Возвращает по карьеру (прибыль, двойственная оценка отгрузки, выпуск).
+    """
+
+    results = []
+    for profit, resources, capacity, volume, supply in tasks:
+        if supply is None:
+            solution = LinearModel(volume, A_ub=resources, b_ub=capacity, sense='max').solve()
+            if solution.status != 'Optimal':
+                raise ValueError(f"Подзадача карьера не решена: {solution.status}")
+            results.append((solution.objective, 0.0, solution.x))
+            continue
+        solution = _quarry_model(profit, resources, capacity, volume, supply).solve()
+        if solution.status != 'Optimal':
+            raise ValueError(f"Подзадача карьера не решена: {solution.status}")
+        results.append((solution.objective, solution.duals_ub[-1], solution.x))
+    return results
+
+
+class _QuarryPool:
+    """Решение подзадач карьеров блоками: в пуле процессов или в текущем процессе"""
+
+    def __init__(self, quarries, volume, workers):
+        self.quarries = quarries
+        self.volume = volume
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def solve(self, supply):
+        tasks = [(profit, resources, capacity, self.volume[q], None if supply is None else supply[q])
+                 for q, (profit, resources, capacity) in enumerate(self.quarries)]
+        if self.pool is None:
+            return _solve_quarries(tasks)
+        size = -(-len(tasks) // self.workers)
+        chunks = [tasks[k:k + size] for k in range(0, len(tasks), size)]
+        return [item for part in self.pool.map(_solve_quarries, chunks) for item in part]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def _master_model(arc_rows, arc_cols, arc_costs, shape, demand, max_supply, top, cuts):
+    """Главная задача: транспорт, отгрузки карьеров и оценки их прибыли по отсечениям
+
+    Переменные: перевозки по дугам, отгрузка s_q и оценка прибыли theta_q.
+    Отсечение (q, прибыль, оценка u, отгрузка s0): theta_q + u * s_q <= прибыль + u * s0.
+    """
+
+    m, n = shape
+    arcs = arc_rows.size
+    c = np.concatenate([-arc_costs, np.zeros(m), np.ones(m)])
+
+    # Отгрузка карьера равна сумме перевозок из него, потребности участков покрываются
+    flow = sp.csr_matrix((np.ones(arcs), (arc_rows, np.arange(arcs))), shape=(m, arcs))
+    need = sp.csr_matrix((np.ones(arcs), (arc_cols, np.arange(arcs))), shape=(n, arcs))
+    A_eq = sp.vstack([sp.hstack([flow, -sp.identity(m), sp.csr_matrix((m, m))]),
+                      sp.hstack([need, sp.csr_matrix((n, 2 * m))])], format='csr')
+    b_eq = np.concatenate([np.zeros(m), demand])
+
+    quarry, value, slope, point = (np.array(v) for v in zip(*cuts))
+    k = quarry.size
+    A_ub = sp.csr_matrix((np.concatenate([slope, np.ones(k)]),
+                          (np.tile(np.arange(k), 2), np.concatenate([arcs + quarry, arcs + m + quarry]))),
+                         shape=(k, arcs + 2 * m))
+    b_ub = value + slope * point
+
+    lower = np.concatenate([np.zeros(arcs + m), np.full(m, -np.inf)])
+    upper = np.concatenate([np.full(arcs, np.inf), max_supply, top])
+    return LinearModel(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                       bounds=(lower, upper), sense='max', name='Integrated_Master')
+
+
+@instrument('integrated')
+def solve_integrated(quarries=None, cost=None, demand=None, volume=None, workers=None, tol=1e-6,
+                     max_iter=100, report=False, verbose=True):
+    """Совместное планирование производства на карьерах и перевозок на участки
+
+    Декомпозиция Бендерса: главная задача - транспортная (ex2) с отгрузками
+    карьеров и оценками их прибыли, подзадачи - модели производства (ex1)
+    отдельных карьеров при заданной отгрузке; подзадачи решаются в пуле из
+    workers процессов (по умолчанию число ядер, 1 - без пула). Каждая
+    подзадача добавляет в главную отсечение по двойственной оценке
+    отгрузки. Итерации продолжаются, пока разрыв между верхней (главная
+    задача) и нижней (лучший найденный план) оценками не меньше tol
+    (относительно).
+    quarries - список (прибыль, нормы расхода, запасы ресурсов) карьеров,
+    cost - затраты на перевозку (карьеры × участки, в любом формате
+    arcs.as_arcs), demand - потребности участков, volume - объем единицы
+    каждого вида продукции в отгрузке (по умолчанию 1).
+    Возвращает SolveResult с выпуском production, отгрузками supply,
+    перевозками flows и оценками по итерациям history.
+    """
+
+    if quarries is None:
+        quarries, cost, demand = QUARRIES, ex2.COST, ex2.DEMAND
+    quarries = [(np.asarray(p, dtype=float), np.asarray(r, dtype=float), np.asarray(b, dtype=float))
+                for p, r, b in quarries]
+    demand = np.asarray(demand, dtype=float)
+    arc_rows, arc_cols, arc_costs, shape = as_arcs(cost)
+    if shape != (len(quarries), demand.size):
+        raise ValueError(f"Затраты на перевозку имеют форму {shape}, "
+                         f"ожидается ({len(quarries)}, {demand.size})")
+    if volume is None:
+        volume = [np.ones(p.size) for p, _, _ in quarries]
+    elif np.ndim(volume) == 1:
+        volume = [np.asarray(volume, dtype=float)] * len(quarries)
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(quarries))
+
+    pool = _QuarryPool(quarries, volume, workers)
+    history = []
+    try:
+        # Наибольшие отгрузки и прибыль карьеров без обязательной отгрузки
+        with phase('subproblems'):
+            max_supply = np.array([value for value, _, _ in pool.solve(None)])
+            top = pool.solve(np.zeros(len(quarries)))
+        if max_supply.sum() < demand.sum() - 1e-9:
+            raise ValueError(f"Суммарная мощность карьеров {max_supply.sum():g} меньше "
+                             f"потребности {demand.sum():g}")
+        cuts = [(q, value, slope, 0.0) for q, (value, slope, _) in enumerate(top)]
+        top = np.array([value for value, _, _ in top])
+
+        lower, upper, best = -np.inf, np.inf, None
+        if verbose:
+            print(f"{'Итерация':>8} {'Нижняя':>14} {'Верхняя':>14} {'Разрыв':>10}")
+        for iteration in range(1, max_iter + 1):
+            with phase('master'):
+                master = _master_model(arc_rows, arc_cols, arc_costs, shape, demand, max_supply, top,
+                                       cuts).solve()
+            if master.status != 'Optimal':
+                raise ValueError(f"Главная задача не решена: {master.status}")
+            upper = min(upper, master.objective)
+            flows = master.x[:arc_rows.size]
+            supply = master.x[arc_rows.size:arc_rows.size + len(quarries)]
+
+            with phase('subproblems'):
+                parts = pool.solve(supply)
+            value = sum(v for v, _, _ in parts) - arc_costs @ flows
+            if value > lower:
+                lower, best = value, (flows, supply, [x for _, _, x in parts])
+            cuts += [(q, v, u, supply[q]) for q, (v, u, _) in enumerate(parts)]
+
+            gap = (upper - lower) / max(1.0, abs(upper))
+            history.append((iteration, lower, upper, gap))
+            if verbose:
+                print(f"{iteration:>8} {lower:>14.4f} {upper:>14.4f} {gap:>10.2e}")
+            if gap <= tol:
+                break
+    finally:
+        pool.close()
+
+    flows, supply, production = best
+    flow_matrix = np.zeros(shape)
+    flow_matrix[arc_rows, arc_cols] = flows
+    history = np.rec.fromarrays([np.array(h) for h in zip(*history)],
+                                names='iteration,lower,upper,gap')
+    status = 'Optimal' if history.gap[-1] <= tol else 'Not Solved'
+    record(status=status, objective=lower, iterations=len(history), mip_gap=history.gap[-1])
+
+    def show():
+        print("=" * 50)
+        print("СОВМЕСТНЫЙ ПЛАН ПРОИЗВОДСТВА И ПЕРЕВОЗОК")
+        print("=" * 50)
+        print(f"Статус: {status}, итераций: {len(history)}, разрыв: {history.gap[-1]:.2e}")
+        print(f"Прибыль за вычетом перевозок: {lower:.2f} тыс. ден. ед.")
+        print(f"\nВыпуск и отгрузка по карьерам:")
+        print_lines(range(len(quarries)), lambda q: f"Карьер {q+1}: " + ", ".join(
+            f"x{j+1} = {v:.2f}" for j, v in enumerate(production[q])) + f"; отгрузка {supply[q]:.2f} тыс. м³")
+        print(f"\nПеревозки:")
+        print_lines(np.flatnonzero(flows > 1e-9),
+                    lambda k: f"x{arc_rows[k]+1}_{arc_cols[k]+1} = {flows[k]:.2f} тыс. м³")
+
+    result = SolveResult('integrated', status, lower, 'benders', production=production, supply=supply,
+                         flows=flow_matrix, history=history, show=show, filename="VolumeStatement_2.xlsx",
+                         render=lambda filename: ex2.create_excel_report(flow_matrix, cost, filename=filename))
+    return finish_result(result, report, verbose)
+
+
+def solve_monolithic(quarries=None, cost=None, demand=None, volume=None):
+    """Та же задача одной моделью (для проверки декомпозиции): прибыль и решение"""
+
+    if quarries is None:
+        quarries, cost, demand = QUARRIES, ex2.COST, ex2.DEMAND
+    demand = np.asarray(demand, dtype=float)
+    arc_rows, arc_cols, arc_costs, (m, n) = as_arcs(cost)
+    sizes = [np.asarray(p).size for p, _, _ in quarries]
+    if volume is None:
+        volume = [np.ones(k) for k in sizes]
+    elif np.ndim(volume) == 1:
+        volume = [np.asarray(volume, dtype=float)] * len(quarries)
+
+    # Переменные: выпуск всех карьеров подряд, затем перевозки по дугам
+    offset = np.concatenate([[0], np.cumsum(sizes)])
+    arcs = arc_rows.size
+    c = np.concatenate([np.asarray(p, dtype=float) for p, _, _ in quarries] + [-arc_costs])
+    A_res = sp.hstack([sp.block_diag([np.asarray(r, dtype=float) for _, r, _ in quarries]),
+                       sp.csr_matrix((sum(len(b) for _, _, b in quarries), arcs))])
+    b_res = np.concatenate([np.asarray(b, dtype=float) for _, _, b in quarries])
+    # Отгрузка карьера не больше его выпуска
+    ship = sp.hstack([-sp.block_diag([np.asarray(v, dtype=float)[None, :] for v in volume]),
+                      sp.csr_matrix((np.ones(arcs), (arc_rows, np.arange(arcs))), shape=(m, arcs))])
+    need = sp.hstack([sp.csr_matrix((n, offset[-1])),
+                      sp.csr_matrix((np.ones(arcs), (arc_cols, np.arange(arcs))), shape=(n, arcs))])
+    model = LinearModel(c, A_ub=sp.vstack([A_res, ship]), b_ub=np.concatenate([b_res, np.zeros(m)]),
+                        A_eq=need, b_eq=demand, sense='max', name='Integrated')
+    return model.solve()
+
+
+# Запуск решения
+if __name__ == "__main__":
+    solve_integrated(workers=1)
@@ -0,0 +1,299 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Входные данные моделей: имя аргумента точки входа -> (размерность, допускается ли inf)
+# inf в матрицах затрат и сроков означает запрещенную пару (см. arcs.as_arcs)
+SCHEMAS = {
+    'ex1': {'profit': (1, False), 'resources': (2, False), 'capacity': (1, False)},
+    'ex2': {'supply': (1, False), 'demand': (1, False), 'cost': (2, True)},
+    'ex3': {'time_matrix': (2, True), 'forbidden': (2, False)},
+    'ex4': {'count': (1, False), 'CMR': (2, False), 'C': (0, False)},
+}
+
+# Неотрицательные величины: мощности, потребности, запасы, численность
+NONNEGATIVE = {'capacity', 'supply', 'demand', 'count', 'C', 'time_matrix'}
+
+EXTENSIONS = ('.npy', '.parquet', '.csv', '.txt')
+
+CHECK_ROWS = 1 << 22  # Элементов в блоке при проверке отображенных в память матриц
+
+
+def _read_header(path):
+    """Первая строка CSV: разделитель и признак строки заголовка"""
+
+    with open(path, encoding='utf-8-sig') as f:
+        first = f.readline()
+    delimiter = ';' if ';' in first else ',' if ',' in first else None
+    fields = first.strip().split(delimiter)
+    try:
+        [float(v) for v in fields if v.strip()]
+        header = False
+    except ValueError:
+        header = True
+    return delimiter, header
+
+
+def _read_csv(path, dtype):
+    """Числовой CSV -> массив NumPy без промежуточных объектов Python
+
+    Разделитель (',', ';' или пробелы) и строка заголовка определяются по
+    первой строке файла. Пустые поля и 'inf' читаются как nan и inf.
+    """
+
+    delimiter, header = _read_header(path)
+    return np.loadtxt(path, dtype=dtype, delimiter=delimiter, skiprows=int(header),
+                      ndmin=1, encoding='utf-8-sig')
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Для чтения Parquet требуется пакет pyarrow") from None
+    return pq
+
+
+def _read_parquet(path, dtype):
+    """Parquet -> массив NumPy: столбцы таблицы копируются по одному в готовый массив"""
+
+    table = _parquet().read_table(path, memory_map=True)
+    if table.num_columns == 1:
+        return table.column(0).to_numpy().astype(dtype, copy=False)
+    out = np.empty((table.num_rows, table.num_columns), dtype=dtype)
+    for k, column in enumerate(table.columns):
+        out[:, k] = column.to_numpy()
+    return out
+
+
+def load_array(path, dtype=float, mmap=True):
+    """Массив из файла .npy, .csv/.txt или .parquet
+
+    .npy при mmap=True отображается в память без копирования (только для
+    чтения); приведение типа выполняется, только если тип в файле другой.
+    CSV и Parquet читаются сразу в непрерывный массив. Для многократной
+    работы с большими матрицами CSV удобно один раз перевести в .npy
+    функцией to_npy.
+    """
+
+    ext = os.path.splitext(path)[1].lower()
+    dtype = np.dtype(dtype)
+    if ext == '.npy':
+        array = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        return array if array.dtype == dtype else array.astype(dtype)
+    if ext in ('.csv', '.txt'):
+        return _read_csv(path, dtype)
+    if ext == '.parquet':
+        return _read_parquet(path, dtype)
+    raise ValueError(f"Неподдерживаемый формат файла: {path}")
+
+
+def load_sparse(path, shape=None, columns=('i', 'j', 'cost')):
+    """Разреженная матрица затрат из таблицы ребер (CSV или Parquet)
+
+    Таблица в длинном формате: номер строки, номер столбца (с нуля) и
+    значение; имена столбцов задаются columns. Возвращает COO-матрицу,
+    которую принимают ex2.solve_ex2 и ex3.solve_assignment_compact. Размер
+    по умолчанию - по наибольшим номерам.
+    """
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        table = _parquet().read_table(path, columns=list(columns), memory_map=True)
+        rows, cols, values = (table.column(name).to_numpy() for name in columns)
+    elif ext in ('.csv', '.txt'):
+        delimiter, _ = _read_header(path)
+        frame = pd.read_csv(path, sep=delimiter or r'\s+', usecols=list(columns),
+                            dtype={columns[0]: np.int64, columns[1]: np.int64, columns[2]: np.float64},
+                            encoding='utf-8-sig')
+        rows, cols, values = (frame[name].to_numpy() for name in columns)
+    else:
+        raise ValueError(f"Неподдерживаемый формат таблицы ребер: {path}")
+
+    if rows.size and (rows.min() < 0 or cols.min() < 0):
+        raise ValueError(f"{path}: номера строк и столбцов должны быть неотрицательными")
+    if shape is None:
+        shape = (int(rows.max()) + 1, int(cols.max()) + 1) if rows.size else (0, 0)
+    return sp.coo_matrix((values, (rows, cols)), shape=shape)
+
+
+def to_npy(source, target=None, dtype=float):
+    """Перевод CSV/Parquet в .npy для последующего отображения в память
+
+    Возвращает имя созданного файла (по умолчанию - рядом с исходным).
+    """
+
+    if target is None:
+        target = os.path.splitext(source)[0] + '.npy'
+    np.save(target, load_array(source, dtype, mmap=False))
+    return target
+
+
+def _first_bad(array, bad):
+    """Индекс первого элемента, для которого bad(блок) истинно (None, если таких нет)
+
+    Матрица проверяется блоками строк, так что для отображенного в память
+    файла временные массивы не превышают CHECK_ROWS элементов.
+    """
+
+    if array.ndim < 2:
+        hits = np.flatnonzero(bad(array))
+        return (int(hits[0]),) if hits.size else None
+    step = max(1, CHECK_ROWS // max(1, array.shape[1]))
+    for start in range(0, array.shape[0], step):
+        block = bad(array[start:start + step])
+        if block.any():
+            i, j = np.argwhere(block)[0]
+            return (start + int(i), int(j))
+    return None
+
+
+def validate_array(array, name, ndim=None, allow_inf=False, nonnegative=False):
+    """Векторизованная проверка массива: размерность, тип, NaN, inf и знак
+
+    Ошибка - ValueError с именем массива и индексом первого неверного элемента.
+    """
+
+    if sp.issparse(array):
+        data = array.data
+        if not allow_inf and not np.isfinite(data).all():
+            raise ValueError(f"{name}: недопустимые значения NaN/inf")
+        if nonnegative and (data < 0).any():
+            raise ValueError(f"{name}: отрицательные значения")
+        return array
+
+    array = np.asarray(array)
+    if ndim is not None and array.ndim != ndim:
+        raise ValueError(f"{name}: ожидается размерность {ndim}, получено {array.ndim} "
+                         f"(форма {array.shape})")
+    if array.dtype == bool:
+        return array
+    if array.dtype.kind not in 'iuf':
+        raise ValueError(f"{name}: ожидаются числа, получен тип {array.dtype}")
+    if array.dtype.kind == 'f':
+        bad = (lambda a: ~(np.isfinite(a) | np.isposinf(a))) if allow_inf else (lambda a: ~np.isfinite(a))
+        where = _first_bad(array, bad)
+        if where is not None:
+            raise ValueError(f"{name}: недопустимое значение {array[where]} в позиции {where}")
+    if nonnegative:
+        where = _first_bad(array, lambda a: a < 0)
+        if where is not None:
+            raise ValueError(f"{name}: отрицательное значение {array[where]} в позиции {where}")
+    return array
+
+
+def _check_shapes(model, data):
+    """Согласованность размеров входных массивов модели"""
+
+    def shape(key):
+        return np.shape(data[key]) if key in data else None
+
+    expected = {}
+    if model == 'ex1' and 'resources' in data:
+        rows, cols = shape('resources')
+        expected = {'profit': (cols,), 'capacity': (rows,)}
+    elif model == 'ex2' and 'cost' in data:
+        rows, cols = shape('cost')
+        expected = {'supply': (rows,), 'demand': (cols,)}
+    elif model == 'ex3' and 'time_matrix' in data:
+        expected = {'forbidden': shape('time_matrix')}
+    elif model == 'ex4' and 'CMR' in data:
+        expected = {'count': (shape('CMR')[0],)}
+    for key, want in expected.items():
+        if key in data and shape(key) != want:
+            raise ValueError(f"{model}: {key} имеет форму {shape(key)}, ожидается {want}")
+
+
+def _find_file(directory, key):
+    for ext in EXTENSIONS:
+        path = os.path.join(directory, key + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_inputs(model, source=None, mmap=True, **paths):
+    """Входные данные модели из файлов - словарь аргументов точки входа
+
+    source - каталог с файлами <имя>.npy|.parquet|.csv|.txt (например,
+    cost.npy, supply.csv для ex2); paths - отдельные файлы или уже готовые
+    массивы (в том числе разреженные, см. load_sparse) по именам аргументов.
+    Отсутствующие аргументы не включаются, и точка входа берет значения
+    контрольного примера. Все массивы проверяются, после чего словарь
+    передается напрямую: ex2.solve_ex2(**load_inputs('ex2', 'data/ex2')).
+    """
+
+    if model not in SCHEMAS:
+        raise ValueError(f"Неизвестная модель: {model}")
+    schema = SCHEMAS[model]
+    unknown = set(paths) - set(schema)
+    if unknown:
+        raise ValueError(f"{model}: неизвестные входные данные {sorted(unknown)}")
+
+    data = {}
+    for key, (ndim, allow_inf) in schema.items():
+        value = paths.get(key)
+        if value is None and source is not None:
+            value = _find_file(source, key)
+        if value is None:
+            continue
+        if isinstance(value, (str, os.PathLike)):
+            value = load_array(os.fspath(value), float, mmap)
+            if key == 'forbidden':
+                value = value != 0
+        if not sp.issparse(value) and ndim == 0:
+            value = np.asarray(value).reshape(-1)
+            if value.size != 1:
+                raise ValueError(f"{model}: {key} должен быть числом")
+            value = value[0].item()
+            ndim = None
+        data[key] = validate_array(value, key, ndim, allow_inf, key in NONNEGATIVE)
+    _check_shapes(model, data)
+
+    # Целочисленные величины ex4 (численность рабочих) передаются целыми
+    if model == 'ex4':
+        for key in ('count', 'C'):
+            if key in data:
+                value = np.asarray(data[key])
+                if (value != np.round(value)).any():
+                    raise ValueError(f"ex4: {key} должен быть целым")
+                data[key] = value.astype(int) if value.ndim else int(value)
+    return data
+
+
+def describe(data):
+    """Краткая сводка загруженных массивов: форма, тип, отображение в память"""
+
+    lines = []
+    for key, value in data.items():
+        if sp.issparse(value):
+            lines.append(f"{key}: разреженная {value.shape}, {value.nnz} элементов")
+        elif np.ndim(value) == 0:
+            lines.append(f"{key}: {value}")
+        else:
+            mapped = ', отображен в память' if isinstance(value, np.memmap) or \
+                isinstance(getattr(value, 'base', None), np.memmap) else ''
+            lines.append(f"{key}: {value.shape}, {value.dtype}, "
+                         f"{value.nbytes / 2 ** 20:.1f} МБ{mapped}")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Загрузка и проверка входных данных моделей")
+    sub = parser.add_subparsers(dest='command', required=True)
+    check = sub.add_parser('check', help="Проверить каталог с данными модели")
+    check.add_argument('model', choices=sorted(SCHEMAS))
+    check.add_argument('directory')
+    convert = sub.add_parser('convert', help="Перевести CSV/Parquet в .npy")
+    convert.add_argument('source')
+    convert.add_argument('target', nargs='?', default=None)
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        for line in describe(load_inputs(args.model, args.directory)):
+            print(line)
+    else:
+        print(to_npy(args.source, args.target))
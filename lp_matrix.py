@@ -0,0 +1,267 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog, milp, LinearConstraint, Bounds
+
+from cache import model_fingerprint
+
+# Статусы в тех же обозначениях, что и LpStatus в PuLP
+STATUS = {0: 'Optimal', 1: 'Not Solved', 2: 'Infeasible', 3: 'Unbounded', 4: 'Not Solved'}
+
+
+def _as_csr(A, n):
+    """Матрица ограничений в формате CSR (пустая, если A не задана)"""
+
+    if A is None:
+        return sp.csr_matrix((0, n))
+    return sp.csr_matrix(A, dtype=float)
+
+
+def _as_bounds(bounds, n):
+    """Границы переменных: кортеж (lower, upper) из скаляров/массивов или список пар"""
+
+    if bounds is None:
+        bounds = (0, None)
+    if isinstance(bounds, tuple) and len(bounds) == 2:
+        lower, upper = bounds
+    else:
+        lower, upper = zip(*bounds)
+        lower = [-np.inf if lo is None else lo for lo in lower]
+        upper = [np.inf if up is None else up for up in upper]
+    lower = np.broadcast_to(np.asarray(-np.inf if lower is None else lower, dtype=float), n).copy()
+    upper = np.broadcast_to(np.asarray(np.inf if upper is None else upper, dtype=float), n).copy()
+    return lower, upper
+
+
+class ModelSolution:
+    """Решение матричной модели: статус, значение ЦФ, переменные и двойственные оценки"""
+
+    def __init__(self, status, objective, x, duals_ub=None, duals_eq=None, raw=None,
+                 iterations=None, solve_time=None, warm=False, cached=False, backend=None,
+                 kind=None):
+        self.status = status
+        self.objective = objective
+        self.x = x
+        self.duals_ub = duals_ub
+        self.duals_eq = duals_eq
+        self.raw = raw
+        self.iterations = iterations  # Число итераций симплекс-метода
+        self.solve_time = solve_time  # Время решения, с
+        self.warm = warm  # Решение начато с сохраненного базиса
+        self.cached = cached  # Решение взято из кеша
+        self.backend = backend  # Решатель, выбранный backends.solve
+        self.kind = kind  # Класс задачи: 'lp', 'mip', 'assignment', 'transport', 'knapsack'
+
+    @property
+    def duals(self):
+        """Двойственные оценки всех ограничений (сначала <=, затем =) одним массивом"""
+
+        parts = [d for d in (self.duals_ub, self.duals_eq) if d is not None]
+        return np.concatenate(parts) if parts else None
+
+    def as_matrix(self, shape, rows=None, cols=None, offset=0, sparse=False, tol=1e-9):
+        """Значения семейства переменных в виде матрицы формы shape
+
+        Без rows/cols берутся переменные offset, offset + 1, ... по строкам
+        (переменная (i, j) - номер offset + i * shape[1] + j). С rows/cols
+        переменная offset + k стоит в позиции (rows[k], cols[k]), остальные
+        элементы нулевые; sparse=True возвращает CSR. Значения по модулю
+        меньше tol обнуляются.
+        """
+
+        if self.x is None:
+            raise ValueError(f"Решение отсутствует: {self.status}")
+        if rows is None:
+            size = int(np.prod(shape))
+            values = self.x[offset:offset + size]
+        else:
+            values = self.x[offset:offset + len(rows)]
+        values = np.where(np.abs(values) > tol, values, 0.0)
+        if rows is None:
+            matrix = values.reshape(shape)
+            return sp.csr_matrix(matrix) if sparse else matrix
+        if sparse:
+            matrix = sp.csr_matrix((values, (rows, cols)), shape=shape)
+            matrix.eliminate_zeros()
+            return matrix
+        matrix = np.zeros(shape)
+        matrix[rows, cols] = values
+        return matrix
+
+
+def pulp_solution(prob, variables, constraints=None):
+    """ModelSolution по решенной задаче PuLP
+
+    Значения переменных собираются в массив в порядке variables за один
+    проход, без поиска по именам; constraints - необязательный список
+    ограничений для двойственных оценок (duals_ub, только для ЛП).
+    """
+
+    from pulp import LpStatus, value
+
+    variables = list(variables)
+    x = np.fromiter((np.nan if v.varValue is None else v.varValue for v in variables),
+                    dtype=float, count=len(variables))
+    duals = None
+    if constraints is not None:
+        constraints = list(constraints)
+        duals = np.fromiter((np.nan if c.pi is None else c.pi for c in constraints),
+                            dtype=float, count=len(constraints))
+    objective = value(prob.objective)
+    return ModelSolution(LpStatus[prob.status], objective if objective is not None else 0.0, x,
+                         duals_ub=duals, raw=prob)
+
+
+class LinearModel:
+    """Задача ЛП/ЦЛП в матричной форме
+
+        c @ x -> min (max),  A_ub @ x <= b_ub,  A_eq @ x == b_eq,  lower <= x <= upper
+
+    Матрицы хранятся в CSR, модель передается в HiGHS (через SciPy) или
+    записывается в MPS без создания объектов-выражений для каждой переменной.
+    """
+
+    def __init__(self, c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, bounds=(0, None),
+                 integrality=None, sense='min', name='model'):
+        self.c = np.asarray(c, dtype=float).ravel()
+        n = self.c.size
+        self.A_ub = _as_csr(A_ub, n)
+        self.b_ub = np.asarray(b_ub if b_ub is not None else [], dtype=float).ravel()
+        self.A_eq = _as_csr(A_eq, n)
+        self.b_eq = np.asarray(b_eq if b_eq is not None else [], dtype=float).ravel()
+        self.lower, self.upper = _as_bounds(bounds, n)
+        self.integrality = (np.zeros(n, dtype=np.uint8) if integrality is None
+                            else np.broadcast_to(np.asarray(integrality, dtype=np.uint8), n).copy())
+        if sense not in ('min', 'max'):
+            raise ValueError("sense должен быть 'min' или 'max'")
+        self.sense = sense
+        self.name = name
+
+        if self.A_ub.shape != (self.b_ub.size, n) or self.A_eq.shape != (self.b_eq.size, n):
+            raise ValueError("Размеры матриц ограничений не согласованы с c и правыми частями")
+
+    @property
+    def num_cols(self):
+        return self.c.size
+
+    @property
+    def num_rows(self):
+        return self.b_ub.size + self.b_eq.size
+
+    @property
+    def nnz(self):
+        return self.A_ub.nnz + self.A_eq.nnz
+
+    @property
+    def is_mip(self):
+        return bool(self.integrality.any())
+
+    def solve(self, time_limit=None, cache=None):
+        """Решение в памяти через HiGHS (scipy.optimize)
+
+        cache - необязательный SolutionCache: оптимальные решения сохраняются
+        по ключу канонической формы модели, повторная модель решается без HiGHS.
+        """
+
+        start = time.perf_counter()
+        key = None
+        if cache is not None:
+            key = model_fingerprint(self)
+            hit = cache.get(key)
+            if hit is not None:
+                return ModelSolution('Optimal', hit['objective'], hit['x'], hit.get('duals_ub'),
+                                     hit.get('duals_eq'), iterations=0,
+                                     solve_time=time.perf_counter() - start, cached=True)
+        sign = -1.0 if self.sense == 'max' else 1.0
+        c = sign * self.c
+        options = {'time_limit': time_limit} if time_limit is not None else None
+
+        if self.is_mip:
+            constraints = []
+            if self.b_ub.size:
+                constraints.append(LinearConstraint(self.A_ub, -np.inf, self.b_ub))
+            if self.b_eq.size:
+                constraints.append(LinearConstraint(self.A_eq, self.b_eq, self.b_eq))
+            res = milp(c, integrality=self.integrality, bounds=Bounds(self.lower, self.upper),
+                       constraints=constraints, options=options)
+            duals_ub = duals_eq = None
+        else:
+            res = linprog(c,
+                          A_ub=self.A_ub if self.b_ub.size else None,
+                          b_ub=self.b_ub if self.b_ub.size else None,
+                          A_eq=self.A_eq if self.b_eq.size else None,
+                          b_eq=self.b_eq if self.b_eq.size else None,
+                          bounds=np.column_stack([self.lower, self.upper]),
+                          method='highs', options=options)
+            duals_ub = sign * res.ineqlin.marginals if res.status == 0 and self.b_ub.size else None
+            duals_eq = sign * res.eqlin.marginals if res.status == 0 and self.b_eq.size else None
+
+        elapsed = time.perf_counter() - start
+        status = STATUS.get(res.status, 'Undefined')
+        iterations = getattr(res, 'nit', None)
+        if res.x is None:
+            return ModelSolution(status, None, None, raw=res, iterations=iterations, solve_time=elapsed)
+        if key is not None and status == 'Optimal':
+            value = {'objective': sign * res.fun, 'x': res.x}
+            if duals_ub is not None:
+                value['duals_ub'] = duals_ub
+            if duals_eq is not None:
+                value['duals_eq'] = duals_eq
+            cache.put(key, value)
+        return ModelSolution(status, sign * res.fun, res.x, duals_ub, duals_eq, raw=res,
+                             iterations=iterations, solve_time=elapsed)
+
+    def write_mps(self, filename):
+        """Запись модели в файл MPS (свободный формат)
+
+        Задача на максимум записывается как минимизация -c @ x.
+        """
+
+        sign = -1.0 if self.sense == 'max' else 1.0
+        m_ub = self.b_ub.size
+        A = sp.vstack([self.A_ub, self.A_eq]).tocsc()
+        rhs = np.concatenate([self.b_ub, self.b_eq])
+
+        lines = [f"NAME {self.name}", "ROWS", " N OBJ"]
+        lines.extend(f" {'L' if i < m_ub else 'E'} R{i}" for i in range(rhs.size))
+
+        lines.append("COLUMNS")
+        in_int = False
+        for j in range(self.num_cols):
+            if self.integrality[j] and not in_int:
+                lines.append(" MARKER 'MARKER' 'INTORG'")
+                in_int = True
+            elif not self.integrality[j] and in_int:
+                lines.append(" MARKER 'MARKER' 'INTEND'")
+                in_int = False
+            start, end = A.indptr[j], A.indptr[j + 1]
+            if self.c[j] != 0:
+                lines.append(f" X{j} OBJ {sign * self.c[j]:.17g}")
+            lines.extend(f" X{j} R{i} {a:.17g}" for i, a in zip(A.indices[start:end], A.data[start:end]))
+        if in_int:
+            lines.append(" MARKER 'MARKER' 'INTEND'")
+
+        lines.append("RHS")
+        lines.extend(f" RHS R{i} {b:.17g}" for i, b in enumerate(rhs) if b != 0)
+
+        lines.append("BOUNDS")
+        for j, (lo, up) in enumerate(zip(self.lower, self.upper)):
+            if lo == -np.inf and up == np.inf:
+                lines.append(f" FR BND X{j}")
+                continue
+            if lo == -np.inf:
+                lines.append(f" MI BND X{j}")
+            elif lo != 0:
+                lines.append(f" LO BND X{j} {lo:.17g}")
+            if up != np.inf:
+                lines.append(f" UP BND X{j} {up:.17g}")
+            elif self.integrality[j]:
+                # Иначе часть программ считает целую переменную без границ бинарной
+                lines.append(f" PL BND X{j}")
+        lines.append("ENDATA")
+
+        with open(filename, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+
+        return filename
@@ -0,0 +1,262 @@
+import cProfile
+import contextvars
+import inspect
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+# Переменные окружения для включения сбора метрик без правки кода:
+#   MS_METRICS_FILE - файл, в который дописываются записи в формате JSON lines
+#   MS_PROFILE      - 'cprofile', 'tracemalloc' или оба через запятую
+#   MS_PROFILE_DIR  - каталог для файлов .prof (по умолчанию только сводка в записи)
+ENV_METRICS_FILE = 'MS_METRICS_FILE'
+ENV_PROFILE = 'MS_PROFILE'
+ENV_PROFILE_DIR = 'MS_PROFILE_DIR'
+
+PROFILE_TOP = 15  # Число строк сводки cProfile / tracemalloc в записи
+
+_callbacks = []
+_config = {'metrics_file': None, 'profile': None, 'profile_dir': None}
+_current = contextvars.ContextVar('solve_run', default=None)
+
+
+class SolveRun:
+    """Метрики одного вызова точки входа: время по фазам, размер модели, данные решателя"""
+
+    def __init__(self, name, method=None):
+        self.name = name
+        self.method = method
+        self.backend = None
+        self.status = None
+        self.objective = None
+        self.phases = {}
+        self.rows = None
+        self.cols = None
+        self.nnz = None
+        self.iterations = None
+        self.nodes = None
+        self.mip_gap = None
+        self.total_time = None
+        self.peak_memory = None
+        self.profile = None
+        self.error = None
+        self.cache_hit = None
+        self.started = time.time()
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'method': self.method,
+            'backend': self.backend,
+            'status': self.status,
+            'objective': self.objective,
+            'phases': self.phases,
+            'rows': self.rows,
+            'cols': self.cols,
+            'nnz': self.nnz,
+            'iterations': self.iterations,
+            'nodes': self.nodes,
+            'mip_gap': self.mip_gap,
+            'total_time': self.total_time,
+            'peak_memory': self.peak_memory,
+            'profile': self.profile,
+            'error': self.error,
+            'cache_hit': self.cache_hit,
+            'started': self.started,
+        }
+
+
+def current_run():
+    """Текущая запись метрик (None вне инструментированного вызова)"""
+
+    return _current.get()
+
+
+@contextmanager
+def phase(name):
+    """Замер времени фазы (build, solve, extract, report, ...) текущего вызова
+
+    Вне инструментированного вызова ничего не записывает. Повторные фазы с
+    одним именем суммируются.
+    """
+
+    run = _current.get()
+    if run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_phase(name, time.perf_counter() - start)
+
+
+def record(**fields):
+    """Запись отдельных полей (status, objective, iterations, ...) в текущий вызов"""
+
+    run = _current.get()
+    if run is None:
+        return
+    for key, value in fields.items():
+        if not hasattr(run, key):
+            raise ValueError(f"Неизвестное поле метрик: {key}")
+        setattr(run, key, _plain(value))
+
+
+def record_model(model):
+    """Размер модели: LinearModel, SimplexModel или LpProblem из PuLP"""
+
+    run = _current.get()
+    if run is None:
+        return
+    if hasattr(model, 'nnz'):
+        run.rows, run.cols, run.nnz = int(model.num_rows), int(model.num_cols), int(model.nnz)
+    elif hasattr(model, 'A'):
+        run.rows, run.cols = (int(k) for k in model.A.shape)
+        run.nnz = int((model.A != 0).sum())
+    else:
+        run.rows = len(model.constraints)
+        run.cols = len(model.variables())
+        run.nnz = sum(len(c) for c in model.constraints.values())
+
+
+def record_solution(solution):
+    """Статус, значение ЦФ, итерации, узлы и разрыв MIP из ModelSolution"""
+
+    run = _current.get()
+    if run is None:
+        return
+    run.status = solution.status
+    run.objective = _plain(solution.objective)
+    run.iterations = _plain(solution.iterations)
+    if getattr(solution, 'cached', False):
+        run.cache_hit = True
+    raw = solution.raw
+    if raw is not None:
+        run.nodes = _plain(getattr(raw, 'mip_node_count', None))
+        run.mip_gap = _plain(getattr(raw, 'mip_gap', None))
+
+
+def _plain(value):
+    """NumPy-скаляры приводятся к типам Python для JSON"""
+
+    return value.item() if hasattr(value, 'item') else value
+
+
+def add_metrics_callback(callback):
+    """callback(dict) вызывается после каждого инструментированного вызова"""
+
+    _callbacks.append(callback)
+    return callback
+
+
+def remove_metrics_callback(callback):
+    _callbacks.remove(callback)
+
+
+def configure(metrics_file=None, profile=None, profile_dir=None):
+    """Программная настройка; имеет приоритет над переменными окружения
+
+    metrics_file - файл JSON lines, profile - 'cprofile', 'tracemalloc' или
+    оба через запятую, profile_dir - каталог для файлов .prof.
+    """
+
+    _config.update(metrics_file=metrics_file, profile=profile, profile_dir=profile_dir)
+
+
+def _setting(key, env):
+    return _config[key] if _config[key] is not None else os.environ.get(env)
+
+
+def _profile_modes():
+    value = _setting('profile', ENV_PROFILE) or ''
+    return {mode.strip().lower() for mode in value.split(',') if mode.strip()}
+
+
+def _emit(run):
+    data = run.as_dict()
+    path = _setting('metrics_file', ENV_METRICS_FILE)
+    if path:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False, default=str) + "\n")
+    for callback in list(_callbacks):
+        callback(data)
+
+
+def _profile_summary(profiler, run):
+    """Сводка cProfile по накопленному времени; при MS_PROFILE_DIR - файл .prof"""
+
+    directory = _setting('profile_dir', ENV_PROFILE_DIR)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{run.name}_{int(run.started * 1000)}.prof")
+        profiler.dump_stats(path)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(PROFILE_TOP)
+    return stream.getvalue().splitlines()
+
+
+def instrument(name):
+    """Декоратор точки входа: собирает метрики вызова и передает их получателям
+
+    Метрики отправляются в файл JSON lines и/или в функции, добавленные через
+    add_metrics_callback. Если ни один получатель не задан и профилирование
+    выключено, накладные расходы - несколько замеров времени. Вложенные
+    инструментированные вызовы пишут фазы в запись внешнего вызова.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        has_method = 'method' in signature.parameters
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is not None:
+                return func(*args, **kwargs)
+
+            method = None
+            if has_method:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                method = bound.arguments['method']
+
+            run = SolveRun(name, method)
+            token = _current.set(run)
+            modes = _profile_modes()
+            profiler = cProfile.Profile() if 'cprofile' in modes else None
+            trace = 'tracemalloc' in modes and not tracemalloc.is_tracing()
+            if trace:
+                tracemalloc.start()
+            if profiler is not None:
+                profiler.enable()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as exc:
+                run.error = f"{type(exc).__name__}: {exc}"
+                raise
+            finally:
+                run.total_time = time.perf_counter() - start
+                if profiler is not None:
+                    profiler.disable()
+                    run.profile = _profile_summary(profiler, run)
+                if trace:
+                    snapshot = tracemalloc.take_snapshot()
+                    run.peak_memory = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    top = snapshot.statistics('lineno')[:PROFILE_TOP]
+                    run.profile = (run.profile or []) + [str(stat) for stat in top]
+                _current.reset(token)
+                _emit(run)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import signal
+import time
+
+
+def child(conn, func, args):
+    """Точка входа рабочего процесса: своя группа процессов, чтобы вместе с ним
+    можно было завершить и запущенный PuLP процесс CBC"""
+
+    if hasattr(os, 'setsid'):
+        os.setsid()
+    try:
+        result = ('ok', func(*args))
+    except Exception as exc:
+        result = ('error', exc)
+    try:
+        conn.send(result)
+    except Exception as exc:
+        conn.send(('error', RuntimeError(f"Результат не передан: {exc}")))
+    conn.close()
+
+
+def receive(conn):
+    """Результат рабочего процесса: ('ok', значение) или ('error', исключение)"""
+
+    try:
+        return conn.recv()
+    except (EOFError, OSError):
+        return ('error', RuntimeError("Рабочий процесс завершился без результата"))
+
+
+def kill(process):
+    """Завершение рабочего процесса вместе с его группой (включая CBC)"""
+
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except (ProcessLookupError, PermissionError):
+            pass
+    process.kill()
+
+
+def get_context(preload=()):
+    """Контекст forkserver с предзагрузкой модулей preload, иначе spawn"""
+
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(list(preload))
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+
+def run_killable(func, args, timeout):
+    """Синхронный запуск func(*args) в рабочем процессе с пределом времени
+
+    По истечении timeout (с), включая запуск процесса, он завершается
+    вместе со своей группой и выбрасывается TimeoutError; исключение func
+    передается вызывающему. Где доступен fork, процесс порождается им:
+    большие аргументы (матрицы) не копируются через канал.
+    """
+
+    deadline = time.monotonic() + timeout
+    if 'fork' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('fork')
+    else:
+        ctx = get_context()
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=child, args=(sender, func, args), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(max(0.0, deadline - time.monotonic())):
+            kill(process)
+            raise TimeoutError(f"Решение не завершилось за {timeout:.3g} с")
+        kind, payload = receive(receiver)
+    finally:
+        receiver.close()
+        process.join()
+
+    if kind == 'error':
+        raise payload
+    return payload
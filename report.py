@@ -0,0 +1,483 @@
+import atexit
+import csv
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Font, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+
+_THIN = Side(style='thin')
+_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+
+# Именованные стили ведомостей: создаются один раз на книгу, ячейки ссылаются на них по имени
+STYLES = {
+    'title_16': dict(font=Font(size=16, bold=True), alignment=Alignment(horizontal='center')),
+    'title_11': dict(font=Font(size=11, bold=True), alignment=Alignment(horizontal='center')),
+    'header': dict(font=Font(bold=True), border=_BORDER,
+                   alignment=Alignment(horizontal='center', vertical='center')),
+    'cell': dict(border=_BORDER),
+    'cell_center': dict(border=_BORDER, alignment=Alignment(horizontal='center', vertical='center')),
+    'cell_right': dict(border=_BORDER, alignment=Alignment(horizontal='right')),
+    'cell_bold': dict(font=Font(bold=True), border=_BORDER),
+    'cell_bold_center': dict(font=Font(bold=True), border=_BORDER,
+                             alignment=Alignment(horizontal='center', vertical='center')),
+    'cell_bold_right': dict(font=Font(bold=True), border=_BORDER, alignment=Alignment(horizontal='right')),
+    'number': dict(border=_BORDER, alignment=Alignment(horizontal='right'), number_format='0.00'),
+    'number_bold': dict(font=Font(bold=True), border=_BORDER, alignment=Alignment(horizontal='right'),
+                        number_format='0.00'),
+    'sign': dict(font=Font(bold=True)),
+    'sign_right': dict(font=Font(bold=True), alignment=Alignment(horizontal='right')),
+    'sign_center': dict(font=Font(bold=True), alignment=Alignment(horizontal='center')),
+    'center': dict(alignment=Alignment(horizontal='center')),
+    'section': dict(font=Font(bold=True, size=12)),
+    'table_header': dict(font=Font(bold=True), border=_BORDER,
+                         alignment=Alignment(horizontal='center', wrap_text=True)),
+}
+
+
+class StatementWriter:
+    """Потоковая запись ведомости в Excel
+
+    Книга открывается в режиме openpyxl write-only: строки сразу уходят во
+    временный файл и не хранятся в памяти, поэтому расход памяти не растет
+    с числом строк. Оформление задается именами стилей из STYLES.
+    """
+
+    def __init__(self, filename, column_widths, sheet_name='Ведомость'):
+        self.filename = filename
+        self.workbook = Workbook(write_only=True)
+        self._style_arrays = {}
+        self.sheet = None
+        self.row_count = 0
+        self.add_sheet(sheet_name, column_widths)
+
+    def add_sheet(self, sheet_name, column_widths):
+        """Новый лист; ширины колонок задаются до записи первой строки"""
+
+        self.sheet = self.workbook.create_sheet(sheet_name)
+        self.row_count = 0
+        for i, width in enumerate(column_widths, 1):
+            self.sheet.column_dimensions[get_column_letter(i)].width = width
+
+    def _set_style(self, cell, name):
+        """Стиль по имени: NamedStyle регистрируется при первом использовании,
+        затем ячейкам копируется уже собранный массив индексов стиля"""
+
+        array = self._style_arrays.get(name)
+        if array is None:
+            self.workbook.add_named_style(NamedStyle(name=name, **STYLES[name]))
+            cell.style = name
+            self._style_arrays[name] = copy(cell._style)
+        else:
+            cell._style = copy(array)
+
+    def append(self, values=(), styles=None):
+        """Записывает строку; styles - одно имя стиля или список по колонкам
+
+        Возвращает номер записанной строки.
+        """
+
+        if styles is None or isinstance(styles, str):
+            styles = [styles] * len(values)
+        cells = []
+        for value, style in zip(values, styles):
+            if isinstance(value, np.generic):
+                value = value.item()
+            if style is None:
+                cells.append(value)
+                continue
+            cell = WriteOnlyCell(self.sheet, value=value)
+            self._set_style(cell, style)
+            cells.append(cell)
+        self.sheet.append(cells)
+        self.row_count += 1
+        return self.row_count
+
+    def merge(self, first_row, first_col, last_row, last_col):
+        """Объединение ячеек (номера строк и колонок с 1)"""
+
+        self.sheet.merged_cells.add(
+            f"{get_column_letter(first_col)}{first_row}:{get_column_letter(last_col)}{last_row}")
+
+    def save(self):
+        self.workbook.save(self.filename)
+        return self.filename
+
+
+class CsvStatementWriter:
+    """Запись ведомости в CSV с тем же интерфейсом, что у StatementWriter
+
+    Оформление не сохраняется: числа в стилях с форматом '0.00' округляются
+    до двух знаков, объединения ячеек игнорируются. Каждый следующий лист
+    пишется в отдельный файл <имя>_<лист>.csv.
+    """
+
+    def __init__(self, filename, column_widths=None, sheet_name='Ведомость'):
+        self.filename = filename
+        self._stem = os.path.splitext(filename)[0]
+        self._files = []
+        self._file = None
+        self._csv = None
+        self.row_count = 0
+        self._open(filename)
+
+    def _open(self, filename):
+        self._file = open(filename, 'w', newline='', encoding='utf-8-sig')
+        self._files.append(self._file)
+        self._csv = csv.writer(self._file, delimiter=';')
+        self.row_count = 0
+
+    def add_sheet(self, sheet_name, column_widths=None):
+        self._open(f"{self._stem}_{sheet_name}.csv")
+
+    def append(self, values=(), styles=None):
+        if styles is None or isinstance(styles, str):
+            styles = [styles] * len(values)
+        row = []
+        for value, style in zip(values, styles):
+            if isinstance(value, np.generic):
+                value = value.item()
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and STYLES.get(style, {}).get('number_format') == '0.00'):
+                value = f"{value:.2f}"
+            row.append('' if value is None else value)
+        self._csv.writerow(row)
+        self.row_count += 1
+        return self.row_count
+
+    def merge(self, first_row, first_col, last_row, last_col):
+        pass
+
+    def save(self):
+        for f in self._files:
+            f.close()
+        return self.filename
+
+
+def open_statement(filename, column_widths, sheet_name='Ведомость'):
+    """Writer ведомости по расширению файла: .csv - CsvStatementWriter, иначе xlsx"""
+
+    if filename.lower().endswith('.csv'):
+        return CsvStatementWriter(filename, column_widths, sheet_name)
+    return StatementWriter(filename, column_widths, sheet_name)
+
+
+_counter = itertools.count(1)
+
+
+def unique_path(filename, directory=None):
+    """Свободное имя файла ведомости: <имя>_<дата-время>_<pid>_<номер>.<расширение>
+
+    Файл создается сразу (пустым) в режиме исключительного создания, так
+    что параллельные процессы и потоки не получат одно и то же имя.
+    directory - каталог (по умолчанию каталог filename).
+    """
+
+    folder, base = os.path.split(filename)
+    folder = directory if directory is not None else folder
+    stem, ext = os.path.splitext(base)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    while True:
+        path = os.path.join(folder, f"{stem}_{stamp}_{os.getpid()}_{next(_counter)}{ext}")
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+            return path
+        except FileExistsError:
+            continue
+
+
+def render_reserved(render, path):
+    """Вывод ведомости render(path) в имя, зарезервированное unique_path
+
+    Если вывод завершился ошибкой, зарезервированный файл удаляется, чтобы
+    не оставлять пустых ведомостей.
+    """
+
+    try:
+        return render(path)
+    except BaseException:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class ReportWriter:
+    """Фоновый вывод ведомостей в отдельном потоке
+
+    submit(render, filename) ставит вывод в очередь и сразу возвращает
+    Future с именем файла; решение задачи не ждет openpyxl. Ведомости
+    выводятся по одной в порядке поступления; при завершении процесса
+    очередь дописывается.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def submit(self, render, filename):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report')
+            future = self._pool.submit(render, filename)
+            self._pending = [f for f in self._pending if not f.done()] + [future]
+        return future
+
+    def wait(self):
+        """Ожидание всех поставленных ведомостей; возвращает имена файлов"""
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return [future.result() for future in pending]
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+_writer = ReportWriter()
+atexit.register(_writer.shutdown)
+
+
+def submit_report(render, filename):
+    """Вывод ведомости render(filename) в фоновом потоке (см. ReportWriter)"""
+
+    return _writer.submit(render, filename)
+
+
+def wait_reports():
+    """Ожидание фоновых ведомостей; ошибки вывода передаются вызывающему"""
+
+    return _writer.wait()
+
+
+REPORT_BLOCK = 1 << 16  # Строк структурированного массива, переводимых в значения Python за раз
+
+
+class Column:
+    """Колонка ведомости
+
+    source - ключ записи (поле структурированного массива), функция от
+    записи или '#' для номера строки,
+    value - постоянное значение (например, единица измерения),
+    style / total_style - стили ячейки данных и ячейки итоговой строки,
+    total - суммировать колонку в строке "Итого",
+    fmt - строка формата, применяемая к значению при записи ячейки
+    (например, '{}' - номер выводится текстом).
+    """
+
+    def __init__(self, source=None, value=None, width=14, style='cell', total=False,
+                 total_style='cell', fmt=None):
+        self.source = source
+        self.value = value
+        self.width = width
+        self.style = style
+        self.total = total
+        self.total_style = total_style
+        self.fmt = fmt
+
+    def get(self, number, record):
+        if self.source == '#':
+            return number
+        if callable(self.source):
+            return self.source(record)
+        if self.source is not None:
+            return record[self.source]
+        return self.value
+
+    def block(self, start, records):
+        """Значения колонки для блока записей структурированного массива (с номера start + 1)"""
+
+        if self.source == '#':
+            return range(start + 1, start + 1 + len(records))
+        if callable(self.source):
+            return [self.source(record) for record in records]
+        if self.source is not None:
+            return records[self.source].tolist()
+        return itertools.repeat(self.value, len(records))
+
+
+class ReportSpec:
+    """Описание ведомости: заголовок, многоуровневая шапка, колонки, итоги и подпись
+
+    header - строки шапки (списки значений по колонкам),
+    header_styles - стиль для всех строк шапки или список по строкам,
+    header_merges - объединения в шапке (строка1, колонка1, строка2, колонка2)
+    с нумерацией от первой строки шапки, total_span - число колонок,
+    объединяемых под надписью "Итого", signature - значения строки подписи,
+    которая выводится через две пустые строки после итогов.
+    """
+
+    def __init__(self, title, columns, header, header_merges=(), header_styles='header',
+                 title_style='title_16', title_span=None, total_label='Итого', total_span=1,
+                 total_label_style='cell_bold', signature=None, signature_styles=None,
+                 sheet_name='Ведомость'):
+        self.title = title
+        self.columns = list(columns)
+        self.header = [list(row) for row in header]
+        self.header_merges = list(header_merges)
+        if isinstance(header_styles, str):
+            header_styles = [header_styles] * len(self.header)
+        self.header_styles = list(header_styles)
+        self.title_style = title_style
+        self.title_span = title_span or len(self.columns)
+        self.total_label = total_label
+        self.total_span = total_span
+        self.total_label_style = total_label_style
+        self.signature = signature
+        self.signature_styles = signature_styles
+        self.sheet_name = sheet_name
+
+        # Стили строк собираются один раз и переиспользуются для каждой записи
+        self.row_styles = [column.style for column in self.columns]
+        self.total_styles = [column.total_style for column in self.columns]
+        if self.total_label is not None:
+            self.total_styles[0] = total_label_style
+
+    @property
+    def widths(self):
+        return [column.width for column in self.columns]
+
+
+def _table_rows(spec, records):
+    """Строки таблицы ведомости: значения колонок по записям
+
+    Структурированный массив NumPy переводится в значения Python блоками по
+    REPORT_BLOCK строк, по колонкам, так что в памяти нет копии всей таблицы
+    в объектах Python.
+    """
+
+    if getattr(getattr(records, 'dtype', None), 'names', None) is None:
+        for number, record in enumerate(records, 1):
+            yield [column.get(number, record) for column in spec.columns]
+        return
+    for start in range(0, len(records), REPORT_BLOCK):
+        block = records[start:start + REPORT_BLOCK]
+        yield from map(list, zip(*(column.block(start, block) for column in spec.columns)))
+
+
+def render_report(spec, records, filename, extra_sheets=None):
+    """Вывод ведомости по описанию spec в xlsx или CSV (по расширению filename)
+
+    records - структурированный массив NumPy или последовательность записей
+    (словарей), по одной на строку таблицы; значения форматируются только
+    при записи ячеек. extra_sheets(writer) позволяет дописать дополнительные
+    листы. Возвращает имя файла.
+    """
+
+    writer = open_statement(filename, spec.widths, spec.sheet_name)
+    n = len(spec.columns)
+
+    # Заголовок и пустая строка
+    writer.append([spec.title], spec.title_style)
+    writer.merge(1, 1, 1, spec.title_span)
+    writer.append()
+
+    # Шапка таблицы
+    first = writer.row_count + 1
+    for row, style in zip(spec.header, spec.header_styles):
+        writer.append(row, style)
+    for r1, c1, r2, c2 in spec.header_merges:
+        writer.merge(first + r1 - 1, c1, first + r2 - 1, c2)
+
+    # Данные и итоги по колонкам
+    totals = [0] * n
+    summed = [k for k, column in enumerate(spec.columns) if column.total]
+    formats = [(k, column.fmt) for k, column in enumerate(spec.columns) if column.fmt is not None]
+    for row in _table_rows(spec, records):
+        for k in summed:
+            totals[k] += row[k]
+        for k, fmt in formats:
+            row[k] = fmt.format(row[k])
+        writer.append(row, spec.row_styles)
+
+    if spec.total_label is not None:
+        row = [''] * n
+        row[0] = spec.total_label
+        for k in summed:
+            row[k] = totals[k]
+        total_row = writer.append(row, spec.total_styles)
+        if spec.total_span > 1:
+            writer.merge(total_row, 1, total_row, spec.total_span)
+
+    # Пустые строки и подпись
+    if spec.signature is not None:
+        writer.append()
+        writer.append()
+        writer.append(spec.signature, spec.signature_styles)
+
+    if extra_sheets is not None:
+        extra_sheets(writer)
+
+    writer.save()
+    return filename
+
+
+# Русские заголовки для таблиц анализа чувствительности
+CONSTRAINT_HEADERS = {
+    'name': 'Ограничение',
+    'sense': 'Знак',
+    'rhs': 'Правая часть',
+    'activity': 'Использовано',
+    'slack': 'Остаток',
+    'shadow_price': 'Теневая цена',
+    'rhs_lower': 'Нижняя граница',
+    'rhs_upper': 'Верхняя граница',
+}
+
+VARIABLE_HEADERS = {
+    'name': 'Переменная',
+    'value': 'Значение',
+    'reduced_cost': 'Приведенная оценка',
+    'objective_coef': 'Коэффициент ЦФ',
+    'coef_lower': 'Нижняя граница',
+    'coef_upper': 'Верхняя граница',
+}
+
+SWEEP_HEADERS = {
+    'rhs': 'Правая часть',
+    'objective': 'Значение ЦФ',
+    'shadow_price': 'Теневая цена',
+}
+
+
+def _cell_value(value):
+    """Бесконечные границы интервалов выводятся текстом, пропуски - пустой ячейкой"""
+
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return None
+        if np.isinf(value):
+            return '∞' if value > 0 else '-∞'
+    return value
+
+
+def write_sensitivity_sheet(writer, constraints, variables, sweep=None, sweep_row=None,
+                            sheet_name='Чувствительность'):
+    """Дополнительный лист ведомости с анализом чувствительности"""
+
+    blocks = [('Ограничения', constraints.rename(columns=CONSTRAINT_HEADERS)),
+              ('Переменные', variables.rename(columns=VARIABLE_HEADERS))]
+    if sweep is not None:
+        title = 'Параметрический анализ' + (f': {sweep_row}' if sweep_row is not None else '')
+        blocks.append((title, sweep.rename(columns=SWEEP_HEADERS)))
+
+    width = max(frame.shape[1] for _, frame in blocks)
+    writer.add_sheet(sheet_name, [18] + [16] * (width - 1))
+    for title, frame in blocks:
+        writer.append([title], 'section')
+        writer.append(list(frame.columns), 'table_header')
+        for row in frame.itertuples(index=False):
+            writer.append([_cell_value(v) for v in row], 'cell')
+        writer.append()
@@ -0,0 +1,92 @@
+import functools
+import itertools
+
+from metrics import phase
+from report import render_reserved, submit_report, unique_path
+
+PRINT_LIMIT = 50  # Строк решения в консоли; остальные сворачиваются в "... еще N"
+
+
+class SolveResult:
+    """Результат точки входа: статус, значение ЦФ и массивы решения
+
+    Ведомость при решении не строится: report() выводит ее по запросу,
+    в том числе в фоновом потоке, а show() печатает решение в консоль.
+    Массивы решения (x, flows, rows/cols, groups, assignments, ...)
+    доступны как атрибуты; prob - задача PuLP, solution - ModelSolution
+    (None, если метод их не создает).
+    """
+
+    def __init__(self, name, status, objective, method=None, prob=None, solution=None,
+                 render=None, show=None, filename=None, **values):
+        self.name = name
+        self.status = status
+        self.objective = objective
+        self.method = method
+        self.prob = prob
+        self.solution = solution
+        self.filename = filename  # Имя ведомости по умолчанию, к нему добавляется уникальный суффикс
+        self.values = values
+        for key, value in values.items():
+            setattr(self, key, value)
+        self._render = render
+        self._show = show
+
+    @property
+    def backend(self):
+        """Решатель backends.solve (None для методов без матричной модели)"""
+
+        return getattr(self.solution, 'backend', None)
+
+    def report(self, filename=None, background=False, directory=None):
+        """Вывод ведомости; возвращает имя файла (Future при background=True)
+
+        Без filename имя строится по имени по умолчанию с уникальным
+        суффиксом (report.unique_path), так что параллельные запуски не
+        перезаписывают ведомости друг друга.
+        """
+
+        if self._render is None:
+            raise ValueError(f"Для результата {self.name} ведомость не предусмотрена")
+        render = self._render
+        if filename is None:
+            filename = unique_path(self.filename, directory)
+            render = functools.partial(render_reserved, render)
+        if background:
+            return submit_report(render, filename)
+        return render(filename)
+
+    def show(self):
+        """Печать решения в консоль"""
+
+        if self._show is not None:
+            self._show()
+
+    def __repr__(self):
+        return f"SolveResult({self.name!r}, status={self.status!r}, objective={self.objective!r})"
+
+
+def print_lines(items, fmt, limit=PRINT_LIMIT):
+    """Печать fmt(item) для первых limit элементов, остальные - одной строкой-счетчиком"""
+
+    for item in itertools.islice(items, limit):
+        print(fmt(item))
+    if len(items) > limit:
+        print(f"... еще {len(items) - limit}")
+
+
+def finish_result(result, report=False, verbose=True):
+    """Завершение точки входа: печать решения и ведомость, если она запрошена сразу
+
+    report - True (имя по умолчанию с уникальным суффиксом), имя файла или
+    False; verbose=False отключает вывод в консоль.
+    """
+
+    if verbose:
+        result.show()
+    if report:
+        with phase('report'):
+            filename = result.report(report if isinstance(report, str) else None)
+        if verbose:
+            print(f"\nExcel ведомость сохранена как: {filename}")
+    return result
@@ -0,0 +1,160 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import ex1
+import ex2
+from simplex import SimplexModel
+from transport import solve_transport
+
+
+def _ex1_columns():
+    """Параметры сценария ex1: прибыль по видам балласта и запасы ресурсов"""
+
+    profit = [f"profit_x{j+1}" for j in range(len(ex1.PROFIT))]
+    return profit + list(ex1.CONSTRAINT_NAMES), np.array(ex1.PROFIT + ex1.CAPACITY, dtype=float)
+
+
+def _ex2_columns():
+    """Параметры сценария ex2: затраты на перевозку, мощности и потребности"""
+
+    cost = np.asarray(ex2.COST, dtype=float)
+    m, n = cost.shape
+    names = [f"cost_{i+1}_{j+1}" for i in range(m) for j in range(n)]
+    names += [f"supply_{i+1}" for i in range(m)] + [f"demand_{j+1}" for j in range(n)]
+    base = np.concatenate([cost.ravel(), ex2.SUPPLY, ex2.DEMAND]).astype(float)
+    return names, base
+
+
+MODELS = {
+    'ex1': _ex1_columns,
+    'ex2': _ex2_columns,
+}
+
+
+def _solve_ex1_chunk(values):
+    """Решение блока сценариев ex1 одной моделью с теплым стартом между сценариями"""
+
+    k = len(ex1.PROFIT)
+    model = SimplexModel(ex1.PROFIT, ex1.RESOURCES, ex1.CAPACITY, sense='max')
+    objective = np.full(len(values), np.nan)
+    x = np.full((len(values), k), np.nan)
+    status = []
+    for s, row in enumerate(values):
+        model.update_objective(row[:k])
+        for i, rhs in enumerate(row[k:]):
+            model.update_rhs(i, rhs)
+        solution = model.solve()
+        status.append(solution.status)
+        if solution.status == 'Optimal':
+            objective[s] = solution.objective
+            x[s] = solution.x
+    return objective, x, status
+
+
+def _solve_ex2_chunk(values):
+    """Решение блока сценариев ex2 методом потенциалов"""
+
+    m, n = np.asarray(ex2.COST).shape
+    objective = np.full(len(values), np.nan)
+    x = np.full((len(values), m * n), np.nan)
+    status = []
+    for s, row in enumerate(values):
+        cost = row[:m * n].reshape(m, n)
+        supply = row[m * n:m * n + m]
+        demand = row[m * n + m:]
+        try:
+            flows, total = solve_transport(supply, demand, cost)
+        except ValueError:
+            status.append('Infeasible')
+            continue
+        status.append('Optimal')
+        objective[s] = total
+        x[s] = flows.ravel()
+    return objective, x, status
+
+
+CHUNK_SOLVERS = {
+    'ex1': _solve_ex1_chunk,
+    'ex2': _solve_ex2_chunk,
+}
+
+
+def scenario_table(model, params):
+    """Приводит таблицу параметров к массиву сценариев в порядке столбцов модели
+
+    Отсутствующие в DataFrame столбцы берутся из контрольного примера.
+    NumPy-массив должен содержать все параметры в порядке scenario_columns(model).
+    """
+
+    names, base = MODELS[model]()
+    if isinstance(params, pd.DataFrame):
+        unknown = set(params.columns) - set(names)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры сценария: {sorted(unknown)}")
+        values = np.tile(base, (len(params), 1))
+        for k, name in enumerate(names):
+            if name in params.columns:
+                values[:, k] = params[name].to_numpy(dtype=float)
+        return values
+
+    values = np.asarray(params, dtype=float)
+    if values.ndim != 2 or values.shape[1] != len(names):
+        raise ValueError(f"Ожидается массив сценариев формы (N, {len(names)})")
+    return values
+
+
+def scenario_columns(model):
+    """Имена параметров сценария для модели 'ex1' или 'ex2'"""
+
+    return MODELS[model]()[0]
+
+
+def solve_scenarios(model, params, workers=None, chunksize=None):
+    """Пакетное решение сценариев ex1/ex2 в пуле процессов
+
+    model - 'ex1' или 'ex2', params - DataFrame или массив параметров,
+    workers - число процессов (по умолчанию число ядер, 1 - без пула),
+    chunksize - число сценариев в одной задаче пула. Excel-ведомости не
+    создаются. Возвращает DataFrame: status, objective и значения переменных.
+    """
+
+    if model not in CHUNK_SOLVERS:
+        raise ValueError(f"Неизвестная модель: {model}")
+    values = scenario_table(model, params)
+    count = len(values)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, -(-count // (4 * workers)))
+    chunks = [values[k:k + chunksize] for k in range(0, count, chunksize)]
+
+    solver = CHUNK_SOLVERS[model]
+    if workers == 1 or len(chunks) <= 1:
+        parts = [solver(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(solver, chunks))
+
+    if model == 'ex1':
+        var_names = [f"x{j+1}" for j in range(len(ex1.PROFIT))]
+    else:
+        m, n = np.asarray(ex2.COST).shape
+        var_names = [f"x{i+1}_{j+1}" for i in range(m) for j in range(n)]
+
+    if parts:
+        objective = np.concatenate([p[0] for p in parts])
+        x = np.vstack([p[1] for p in parts])
+        status = [s for p in parts for s in p[2]]
+    else:
+        objective, x, status = np.empty(0), np.empty((0, len(var_names))), []
+
+    result = pd.DataFrame(x, columns=var_names)
+    result.insert(0, 'objective', objective)
+    result.insert(0, 'status', pd.Categorical(status))
+    if isinstance(params, pd.DataFrame):
+        result.index = params.index
+    return result
@@ -0,0 +1,316 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cache import fingerprint
+from procs import child, get_context, kill, receive
+
+TRANSPORT_METHODS = ('auto', 'modi', 'highs', 'pulp')
+ASSIGNMENT_METHODS = ('auto', 'hungarian', 'highs', 'pulp')
+
+# Модули, загружаемые один раз в сервере процессов: рабочие процессы
+# порождаются от него уже с импортированными PuLP, SciPy и моделями
+PRELOAD = ['numpy', 'scipy.optimize', 'pulp', 'transport', 'assignment', 'allocation', 'backends', 'ex2', 'ex3']
+
+
+class ServiceBusy(RuntimeError):
+    """Очередь сервиса заполнена, запрос отклонен"""
+
+
+def _transport_job(supply, demand, cost, method):
+    """Решение транспортной задачи в рабочем процессе (без вывода и ведомости)"""
+
+    import ex2
+    from transport import solve_transport
+    from pulp import value
+
+    if method == 'modi':
+        flows, total = solve_transport(supply, demand, cost)
+    elif method in ('highs', 'auto'):
+        solution, flows = ex2.solve_transport_model(supply, demand, cost, backend=method)
+        total = solution.objective
+    else:
+        prob, flows = ex2.solve_transport_pulp(supply, demand, cost)
+        total = value(prob.objective)
+    return {'objective': float(total), 'flows': flows}
+
+
+def _assignment_job(time_matrix, forbidden, method):
+    """Решение задачи о назначениях в рабочем процессе (без вывода и ведомости)"""
+
+    import backends
+    import ex3
+    from assignment import linear_sum_assignment
+
+    if method == 'hungarian':
+        rows, cols = linear_sum_assignment(time_matrix, forbidden)
+    elif method in ('highs', 'auto'):
+        model, var_rows, var_cols = ex3.build_assignment_model(time_matrix, forbidden)
+        solution = backends.solve(model, method)
+        if solution.status != 'Optimal':
+            raise ValueError(f"Допустимого назначения не существует: {solution.status}")
+        chosen = solution.x > 0.5
+        rows, cols = var_rows[chosen], var_cols[chosen]
+    else:
+        _, rows, cols = ex3.solve_assignment_pulp(time_matrix, forbidden)
+    return {'objective': float(time_matrix[rows, cols].sum()), 'rows': rows, 'cols': cols}
+
+
+class SolveService:
+    """Асинхронный фронтенд решателей ex2 / ex3
+
+    Каждая задача решается в отдельном рабочем процессе (модули импортируются
+    один раз в сервере процессов), одновременно выполняется не более
+    max_workers задач, еще до max_queue ждут в очереди; сверх этого запрос
+    отклоняется с ServiceBusy. По истечении timeout или при отмене awaiting-
+    задачи рабочий процесс завершается вместе с подпроцессом CBC. Если задан
+    cache (SolutionCache), повторные задачи возвращаются без запуска процесса.
+    """
+
+    def __init__(self, max_workers=None, max_queue=64, timeout=None, cache=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.cache = cache
+        self._slots = None
+        self._pending = 0
+        self._readers = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix='solve-reader')
+        self._ctx = get_context(PRELOAD)
+
+    @property
+    def pending(self):
+        """Число выполняемых и ожидающих задач"""
+
+        return self._pending
+
+    async def _run(self, func, args, timeout):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        if self._pending >= self.max_workers + self.max_queue:
+            raise ServiceBusy(f"Очередь заполнена: {self._pending} задач")
+
+        self._pending += 1
+        try:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            # Время ожидания в очереди входит в таймаут запроса
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+            try:
+                left = None if deadline is None else max(0.0, deadline - time.monotonic())
+                return await self._execute(func, args, left)
+            finally:
+                self._slots.release()
+        finally:
+            self._pending -= 1
+
+    async def _execute(self, func, args, timeout):
+        loop = asyncio.get_running_loop()
+        receiver, sender = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(target=child, args=(sender, func, args), daemon=True)
+        process.start()
+        sender.close()
+
+        reader = loop.run_in_executor(self._readers, receive, receiver)
+        try:
+            kind, payload = await asyncio.wait_for(asyncio.shield(reader), timeout)
+        finally:
+            if process.is_alive() and not reader.done():
+                kill(process)
+            await asyncio.shield(reader)
+            receiver.close()
+            process.join()
+
+        if kind == 'error':
+            raise payload
+        return payload
+
+    async def solve_transport(self, supply, demand, cost, method='modi', timeout=None):
+        """Транспортная задача: {'objective', 'flows'}"""
+
+        if method not in TRANSPORT_METHODS:
+            raise ValueError(f"Неизвестный метод: {method}")
+        supply = np.asarray(supply, dtype=float)
+        demand = np.asarray(demand, dtype=float)
+        cost = np.asarray(cost, dtype=float)
+
+        key = fingerprint('ex2', method, supply, demand, cost) if self.cache is not None else None
+        hit = self.cache.get(key) if key is not None else None
+        if hit is not None:
+            return {'objective': hit['objective'], 'flows': hit['flows']}
+
+        result = await self._run(_transport_job, (supply, demand, cost, method),
+                                 self.timeout if timeout is None else timeout)
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    async def solve_assignment(self, time_matrix, forbidden=None, method='hungarian', timeout=None):
+        """Задача о назначениях: {'objective', 'rows', 'cols'}"""
+
+        if method not in ASSIGNMENT_METHODS:
+            raise ValueError(f"Неизвестный метод: {method}")
+        time_matrix = np.asarray(time_matrix)
+        if forbidden is not None:
+            forbidden = np.asarray(forbidden, dtype=bool)
+
+        key = fingerprint('ex3', method, time_matrix, forbidden) if self.cache is not None else None
+        hit = self.cache.get(key) if key is not None else None
+        if hit is not None:
+            return {'objective': float(time_matrix[hit['rows'], hit['cols']].sum()),
+                    'rows': hit['rows'], 'cols': hit['cols']}
+
+        result = await self._run(_assignment_job, (time_matrix, forbidden, method),
+                                 self.timeout if timeout is None else timeout)
+        if key is not None:
+            self.cache.put(key, {'rows': result['rows'], 'cols': result['cols']})
+        return result
+
+    def close(self):
+        self._readers.shutdown(wait=False)
+
+
+_default_service = None
+
+
+def get_service():
+    """Общий сервис процесса (создается при первом обращении)"""
+
+    global _default_service
+    if _default_service is None:
+        _default_service = SolveService()
+    return _default_service
+
+
+async def solve_transport(supply, demand, cost, method='modi', timeout=None):
+    """await solve_transport(...) через общий сервис процесса"""
+
+    return await get_service().solve_transport(supply, demand, cost, method, timeout)
+
+
+async def solve_assignment(time_matrix, forbidden=None, method='hungarian', timeout=None):
+    """await solve_assignment(...) через общий сервис процесса"""
+
+    return await get_service().solve_assignment(time_matrix, forbidden, method, timeout)
+
+
+async def handle_request(service, request):
+    """Обработка одного JSON-запроса
+
+    {"id": ..., "problem": "transport", "supply": [...], "demand": [...],
+     "cost": [[...]], "method": "modi", "timeout": 10}
+    {"id": ..., "problem": "assignment", "time_matrix": [[...]],
+     "forbidden": [[...]], "method": "hungarian"}
+    Ответ: {"id", "status", "objective", "flows" | "assignment", "time"} или
+    {"id", "status": "Timeout" | "Busy" | "Error", "error"}.
+    """
+
+    start = time.perf_counter()
+    response = {'id': request.get('id')}
+    try:
+        problem = request.get('problem')
+        if problem == 'transport':
+            result = await service.solve_transport(request['supply'], request['demand'], request['cost'],
+                                                   request.get('method', 'modi'), request.get('timeout'))
+            response.update(status='Optimal', objective=result['objective'],
+                            flows=np.asarray(result['flows']).tolist())
+        elif problem == 'assignment':
+            time_matrix = np.asarray(request['time_matrix'], dtype=float)
+            result = await service.solve_assignment(time_matrix, request.get('forbidden'),
+                                                    request.get('method', 'hungarian'),
+                                                    request.get('timeout'))
+            response.update(status='Optimal', objective=result['objective'],
+                            assignment=[[int(i), int(j)] for i, j in zip(result['rows'], result['cols'])])
+        else:
+            raise ValueError(f"Неизвестная задача: {problem}")
+    except asyncio.TimeoutError:
+        response.update(status='Timeout', error="Превышено время решения")
+    except ServiceBusy as exc:
+        response.update(status='Busy', error=str(exc))
+    except Exception as exc:  # Любая ошибка решателя - ответ с ошибкой, а не падение эндпоинта
+        response.update(status='Error', error=f"{type(exc).__name__}: {exc}")
+    response['time'] = time.perf_counter() - start
+    return response
+
+
+async def _serve_lines(service, read_line, write_line):
+    """Чтение JSON lines и параллельная обработка; ответы - по мере готовности"""
+
+    tasks = set()
+
+    async def answer(line):
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            response = {'id': None, 'status': 'Error', 'error': f"Некорректный JSON: {exc}"}
+        else:
+            response = await handle_request(service, request)
+        await write_line(json.dumps(response, ensure_ascii=False))
+
+    while True:
+        line = await read_line()
+        if not line:
+            break
+        if line.strip():
+            task = asyncio.create_task(answer(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    if tasks:
+        # Сбой одного ответа (например, разорванное соединение) не прерывает остальные
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                print(f"Ошибка обработки запроса: {type(result).__name__}: {result}", file=sys.stderr)
+
+
+async def serve_stdio(service):
+    """JSON-эндпоинт на stdin/stdout: один запрос на строку"""
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    async def write_line(text):
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+
+    await _serve_lines(service, reader.readline, write_line)
+
+
+async def serve_tcp(service, host='127.0.0.1', port=8765):
+    """JSON-эндпоинт по TCP: соединение - поток JSON lines в обе стороны"""
+
+    async def client(reader, writer):
+        async def write_line(text):
+            writer.write(text.encode('utf-8') + b"\n")
+            await writer.drain()
+
+        try:
+            await _serve_lines(service, reader.readline, write_line)
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(client, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сервис решения задач ex2 / ex3 (JSON lines)")
+    parser.add_argument('--port', type=int, default=None,
+                        help="Слушать TCP-порт вместо stdin/stdout")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-queue', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=None, help="Таймаут по умолчанию, с")
+    args = parser.parse_args()
+
+    service = SolveService(args.workers, args.max_queue, args.timeout)
+    if args.port is None:
+        asyncio.run(serve_stdio(service))
+    else:
+        asyncio.run(serve_tcp(service, args.host, args.port))
@@ -0,0 +1,420 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import lu_factor, lu_solve
+
+from lp_matrix import ModelSolution
+
+
+class SimplexModel:
+    """Задача ЛП с сохранением базиса между решениями
+
+        c @ x -> max (min),  A[i] @ x <= b[i] (или >= b[i]),  x >= 0
+
+    Плотный модифицированный симплекс-метод. После изменения правых частей
+    и добавления ограничения старый базис остается двойственно допустимым
+    и задача дорешивается двойственным симплексом, после изменения ЦФ -
+    прямым симплексом от того же базиса.
+    """
+
+    def __init__(self, c, A, b, sense='max', row_senses=None, row_names=None, col_names=None,
+                 tol=1e-9, max_iter=None):
+        self.c = np.array(c, dtype=float).ravel()
+        self.A = np.array(A, dtype=float).reshape(-1, self.c.size)
+        self.b = np.array(b, dtype=float).ravel()
+        m, n = self.A.shape
+        if self.b.size != m:
+            raise ValueError("Длина b не совпадает с числом ограничений")
+        if sense not in ('min', 'max'):
+            raise ValueError("sense должен быть 'min' или 'max'")
+
+        self.sense = sense
+        self.row_senses = list(row_senses) if row_senses is not None else ['<='] * m
+        self.row_names = list(row_names) if row_names is not None else [f"R{i+1}" for i in range(m)]
+        self.col_names = list(col_names) if col_names is not None else [f"x{j+1}" for j in range(n)]
+        for s in self.row_senses:
+            if s not in ('<=', '>='):
+                raise ValueError(f"Неподдерживаемый знак ограничения: {s}")
+
+        self.tol = tol
+        self.max_iter = max_iter
+        self.basis = None
+        self.solution = None
+
+    @property
+    def num_rows(self):
+        return self.A.shape[0]
+
+    @property
+    def num_cols(self):
+        return self.A.shape[1]
+
+    def _row_index(self, row):
+        return self.row_names.index(row) if isinstance(row, str) else int(row)
+
+    def _col_index(self, col):
+        return self.col_names.index(col) if isinstance(col, str) else int(col)
+
+    def update_rhs(self, row, value=None):
+        """Новая правая часть одного ограничения (по имени или номеру) или сразу весь вектор b"""
+
+        if value is None:
+            b = np.array(row, dtype=float).ravel()
+            if b.size != self.num_rows:
+                raise ValueError("Длина b не совпадает с числом ограничений")
+            self.b = b
+        else:
+            self.b[self._row_index(row)] = value
+
+    def update_objective(self, col, value=None):
+        """Новый коэффициент ЦФ для одной переменной или сразу весь вектор c"""
+
+        if value is None:
+            c = np.array(col, dtype=float).ravel()
+            if c.size != self.num_cols:
+                raise ValueError("Длина c не совпадает с числом переменных")
+            self.c = c
+        else:
+            self.c[self._col_index(col)] = value
+
+    def add_constraint(self, coeffs, rhs, sense='<=', name=None):
+        """Добавляет ограничение; его дополнительная переменная входит в базис"""
+
+        if sense not in ('<=', '>='):
+            raise ValueError(f"Неподдерживаемый знак ограничения: {sense}")
+        coeffs = np.array(coeffs, dtype=float).ravel()
+        if coeffs.size != self.num_cols:
+            raise ValueError("Длина coeffs не совпадает с числом переменных")
+
+        self.A = np.vstack([self.A, coeffs])
+        self.b = np.append(self.b, rhs)
+        self.row_senses.append(sense)
+        self.row_names.append(name if name is not None else f"R{self.num_rows}")
+        if self.basis is not None:
+            self.basis.append(self.num_cols + self.num_rows - 1)
+
+    def warm_start(self, columns):
+        """Стартовый базис из столбцов-кандидатов для следующего решения
+
+        columns - номера переменных в порядке предпочтения (0..n-1 - исходные,
+        n..n+m-1 - дополнительные переменные ограничений), например базис
+        соседней задачи, пересчитанный на эту модель. Берутся линейно
+        независимые кандидаты, недостающие места занимают дополнительные
+        переменные; базис может быть недопустимым - solve восстановит
+        допустимость двойственным симплексом.
+        """
+
+        A_full = self._standard_form()[0]
+        m, total = A_full.shape
+        q = np.zeros((m, m))
+        basis = []
+        seen = set()
+        for j in list(columns) + list(range(self.num_cols, total)):
+            if len(basis) == m:
+                break
+            j = int(j)
+            if j in seen or not 0 <= j < total:
+                continue
+            seen.add(j)
+            v = A_full[:, j]
+            k = len(basis)
+            r = v - q[:, :k] @ (q[:, :k].T @ v)
+            r -= q[:, :k] @ (q[:, :k].T @ r)
+            norm = np.linalg.norm(r)
+            if norm > 1e-9 * max(1.0, np.linalg.norm(v)):
+                q[:, k] = r / norm
+                basis.append(j)
+        self.basis = basis
+
+    def reset(self):
+        """Сбрасывает сохраненный базис: следующее решение будет «холодным»"""
+
+        self.basis = None
+
+    def _standard_form(self):
+        """Приведение к виду A_std @ x + s = b_std, s >= 0 и задаче на минимум"""
+
+        row_sign = np.where(np.array(self.row_senses) == '>=', -1.0, 1.0)
+        A_full = np.hstack([row_sign[:, None] * self.A, np.eye(self.num_rows)])
+        b_std = row_sign * self.b
+        obj_sign = -1.0 if self.sense == 'max' else 1.0
+        cost = np.concatenate([obj_sign * self.c, np.zeros(self.num_rows)])
+        return A_full, b_std, cost, row_sign, obj_sign
+
+    def _primal(self, A_full, b, cost, basis, limit):
+        """Прямой симплекс от допустимого базиса (правило Данцига, при вырождении - Бленда)"""
+
+        iterations = 0
+        degenerate = 0
+        nonbasic = np.ones(A_full.shape[1], dtype=bool)
+        while True:
+            nonbasic[:] = True
+            nonbasic[basis] = False
+            lu = lu_factor(A_full[:, basis])
+            x_B = lu_solve(lu, b)
+            y = lu_solve(lu, cost[basis], trans=1)
+            d = cost - y @ A_full
+
+            candidates = np.flatnonzero(nonbasic & (d < -self.tol))
+            if candidates.size == 0:
+                return 'Optimal', iterations
+            if iterations >= limit:
+                return 'Not Solved', iterations
+
+            j = candidates[0] if degenerate > 50 else candidates[np.argmin(d[candidates])]
+            col = lu_solve(lu, A_full[:, j])
+            rows = np.flatnonzero(col > self.tol)
+            if rows.size == 0:
+                return 'Unbounded', iterations
+
+            ratios = x_B[rows] / col[rows]
+            best = ratios.min()
+            ties = rows[ratios <= best + self.tol]
+            r = ties[np.argmin(np.array(basis)[ties])]
+            degenerate = degenerate + 1 if best <= self.tol else 0
+            basis[r] = j
+            iterations += 1
+
+    def _dual(self, A_full, b, cost, basis, limit):
+        """Двойственный симплекс от двойственно допустимого базиса
+
+        Выводится самая недопустимая базисная переменная; после длинной
+        серии итераций - правило Бленда, исключающее зацикливание.
+        """
+
+        iterations = 0
+        bland_after = 50 + len(basis)
+        nonbasic = np.ones(A_full.shape[1], dtype=bool)
+        while True:
+            nonbasic[:] = True
+            nonbasic[basis] = False
+            lu = lu_factor(A_full[:, basis])
+            x_B = lu_solve(lu, b)
+            infeasible = np.flatnonzero(x_B < -self.tol)
+            if infeasible.size == 0:
+                return 'Optimal', iterations
+            if iterations < bland_after:
+                r = int(infeasible[np.argmin(x_B[infeasible])])
+            else:
+                r = int(infeasible[np.argmin(np.array(basis)[infeasible])])
+            if iterations >= limit:
+                return 'Not Solved', iterations
+
+            j = self._dual_entering(A_full, cost, basis, lu, r, nonbasic)
+            if j is None:
+                return 'Infeasible', iterations
+            basis[r] = j
+            iterations += 1
+
+    def _dual_entering(self, A_full, cost, basis, lu, r, nonbasic):
+        """Вводимая переменная двойственного симплекса для выводимой строки r"""
+
+        y = lu_solve(lu, cost[basis], trans=1)
+        d = cost - y @ A_full
+        e_r = np.zeros(len(basis))
+        e_r[r] = 1.0
+        alpha = lu_solve(lu, e_r, trans=1) @ A_full
+
+        candidates = np.flatnonzero(nonbasic & (alpha < -self.tol))
+        if candidates.size == 0:
+            return None
+
+        ratios = np.maximum(d[candidates], 0.0) / -alpha[candidates]
+        ties = candidates[ratios <= ratios.min() + self.tol]
+        return int(ties[0])
+
+    def solve(self, warm=True):
+        """Решение задачи; при warm=True используется базис предыдущего решения"""
+
+        start = time.perf_counter()
+        A_full, b, cost, row_sign, obj_sign = self._standard_form()
+        m, n = self.A.shape
+        limit = self.max_iter if self.max_iter is not None else 50 * (m + n) + 100
+
+        warm = warm and self.basis is not None
+        basis = list(self.basis) if warm else list(range(n, n + m))
+
+        lu = lu_factor(A_full[:, basis])
+        x_B = lu_solve(lu, b)
+        iterations = 0
+        status = 'Optimal'
+        if x_B.min() < -self.tol:
+            y = lu_solve(lu, cost[basis], trans=1)
+            d = cost - y @ A_full
+            d[basis] = 0.0
+            # Базис двойственно допустим - сразу двойственный симплекс, иначе
+            # сначала ищем допустимый план с нулевой ЦФ (любой базис ей двойственно допустим)
+            phase_cost = cost if d.min() >= -self.tol else np.zeros_like(cost)
+            status, iterations = self._dual(A_full, b, phase_cost, basis, limit)
+
+        if status == 'Optimal':
+            status, k = self._primal(A_full, b, cost, basis, limit - iterations)
+            iterations += k
+
+        elapsed = time.perf_counter() - start
+        if status != 'Optimal':
+            self.basis = None
+            self.solution = ModelSolution(status, None, None, iterations=iterations,
+                                          solve_time=elapsed, warm=warm)
+            return self.solution
+
+        self.basis = basis
+        lu = lu_factor(A_full[:, basis])
+        x_full = np.zeros(n + m)
+        x_full[basis] = lu_solve(lu, b)
+        y = lu_solve(lu, cost[basis], trans=1)
+
+        x = x_full[:n]
+        # Двойственная оценка - прирост ЦФ исходной задачи на единицу правой части
+        duals = obj_sign * row_sign * y
+        self.solution = ModelSolution('Optimal', float(self.c @ x), x, duals_ub=duals,
+                                      iterations=iterations, solve_time=elapsed, warm=warm)
+        return self.solution
+
+    def _require_basis(self):
+        if self.basis is None:
+            solution = self.solve()
+            if solution.status != 'Optimal':
+                raise ValueError(f"Анализ чувствительности невозможен: {solution.status}")
+
+    def sensitivity(self):
+        """Анализ чувствительности по оптимальному базису без повторного решения
+
+        Возвращает две таблицы. По ограничениям: теневая цена, остаток
+        ресурса и интервал правой части, в котором базис остается
+        оптимальным. По переменным: значение, приведенная оценка и интервал
+        коэффициента ЦФ, в котором оптимальный план не меняется.
+        """
+
+        self._require_basis()
+        A_full, b, cost, row_sign, obj_sign = self._standard_form()
+        m, n = self.A.shape
+        basis = self.basis
+        lu = lu_factor(A_full[:, basis])
+        x_B = lu_solve(lu, b)
+        x_full = np.zeros(n + m)
+        x_full[basis] = x_B
+        y = lu_solve(lu, cost[basis], trans=1)
+        d = cost - y @ A_full
+        d[basis] = 0.0
+        B_inv = lu_solve(lu, np.eye(m))
+
+        # Интервалы правых частей: x_B + delta * B^-1 e_i >= 0
+        rhs_lower = np.empty(m)
+        rhs_upper = np.empty(m)
+        for i in range(m):
+            g = B_inv[:, i] * row_sign[i]
+            neg, pos = g < -self.tol, g > self.tol
+            up = (x_B[neg] / -g[neg]).min() if neg.any() else np.inf
+            down = (x_B[pos] / g[pos]).min() if pos.any() else np.inf
+            rhs_lower[i] = self.b[i] - down
+            rhs_upper[i] = self.b[i] + up
+
+        constraints = pd.DataFrame({
+            'name': self.row_names,
+            'sense': self.row_senses,
+            'rhs': self.b,
+            'activity': self.A @ x_full[:n],
+            'slack': x_full[n:],
+            'shadow_price': obj_sign * row_sign * y + 0.0,
+            'rhs_lower': rhs_lower,
+            'rhs_upper': rhs_upper,
+        })
+
+        # Интервалы коэффициентов ЦФ (во внутренней задаче на минимум)
+        nonbasic = np.ones(n + m, dtype=bool)
+        nonbasic[basis] = False
+        position = {j: r for r, j in enumerate(basis)}
+        low = np.empty(n)
+        high = np.empty(n)
+        for j in range(n):
+            if j not in position:
+                low[j], high[j] = -d[j], np.inf
+                continue
+            alpha = B_inv[position[j]] @ A_full
+            pos = nonbasic & (alpha > self.tol)
+            neg = nonbasic & (alpha < -self.tol)
+            high[j] = (d[pos] / alpha[pos]).min() if pos.any() else np.inf
+            low[j] = (d[neg] / alpha[neg]).max() if neg.any() else -np.inf
+        if obj_sign < 0:
+            low, high = -high, -low
+
+        variables = pd.DataFrame({
+            'name': self.col_names,
+            'value': x_full[:n],
+            'reduced_cost': obj_sign * d[:n] + 0.0,
+            'objective_coef': self.c,
+            'coef_lower': self.c + low,
+            'coef_upper': self.c + high,
+        })
+        return constraints, variables
+
+    def parametric_rhs(self, row, end):
+        """Параметрический анализ правой части ограничения row до значения end
+
+        Вместо серии отдельных решений проходит смены базиса аналитически:
+        внутри каждого интервала план линейно зависит от правой части, на
+        границе выполняется одна итерация двойственного симплекса. Возвращает
+        таблицу точек излома: правая часть, ЦФ, теневая цена на следующем
+        интервале и план. Если дальше задача недопустима, таблица
+        заканчивается на границе допустимости.
+        """
+
+        self._require_basis()
+        i = self._row_index(row)
+        A_full, b, cost, row_sign, obj_sign = self._standard_form()
+        m, n = self.A.shape
+        basis = list(self.basis)
+        nonbasic = np.ones(n + m, dtype=bool)
+
+        start = self.b[i]
+        direction = 1.0 if end >= start else -1.0
+        unit = np.zeros(m)
+        unit[i] = row_sign[i]
+        value = start
+        points = []
+
+        for _ in range(50 * (m + n) + 100):
+            lu = lu_factor(A_full[:, basis])
+            x_B = lu_solve(lu, b + unit * (value - start))
+            y = lu_solve(lu, cost[basis], trans=1)
+            x_full = np.zeros(n + m)
+            x_full[basis] = x_B
+            x = x_full[:n]
+            points.append({'rhs': value, 'objective': float(self.c @ x),
+                           'shadow_price': obj_sign * row_sign[i] * y[i] + 0.0,
+                           **dict(zip(self.col_names, x))})
+            if value == end:
+                break
+
+            # Шаг до первой базисной переменной, обращающейся в ноль
+            g = direction * lu_solve(lu, unit)
+            neg = g < -self.tol
+            steps = np.full(m, np.inf)
+            steps[neg] = np.maximum(x_B[neg], 0.0) / -g[neg]
+            r = int(np.argmin(steps))
+            if steps[r] >= abs(end - value):
+                value = end
+                continue
+
+            value += direction * steps[r]
+            nonbasic[:] = True
+            nonbasic[basis] = False
+            j = self._dual_entering(A_full, cost, basis, lu, r, nonbasic)
+            if j is None:
+                # За этой точкой допустимых планов нет
+                lu = None
+                break
+            basis[r] = j
+
+        if lu is None:
+            x_full = np.zeros(n + m)
+            x_full[basis] = x_B + g * steps[r]
+            x = x_full[:n]
+            points.append({'rhs': value, 'objective': float(self.c @ x), 'shadow_price': np.nan,
+                           **dict(zip(self.col_names, x))})
+
+        # При вырожденных шагах точка излома повторяется; оставляем оценку следующего интервала
+        table = pd.DataFrame(points)
+        return table.drop_duplicates(subset='rhs', keep='last').reset_index(drop=True)
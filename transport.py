@@ -0,0 +1,311 @@
+from collections import deque
+
+import numpy as np
+
+from metrics import record
+
+
+def _balance(supply, demand, cost):
+    """Приводит задачу к закрытому виду: излишек мощности уходит в фиктивного потребителя"""
+
+    supply = np.asarray(supply, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    cost = np.asarray(cost, dtype=float)
+
+    if cost.shape != (supply.size, demand.size):
+        raise ValueError("Размер матрицы затрат не совпадает с числом поставщиков и потребителей")
+    if (supply < 0).any() or (demand < 0).any():
+        raise ValueError("Мощности и потребности должны быть неотрицательными")
+
+    surplus = supply.sum() - demand.sum()
+    if surplus < -1e-9 * max(1.0, demand.sum()):
+        raise ValueError("Суммарная мощность поставщиков меньше суммарной потребности")
+
+    if surplus > 0:
+        demand = np.append(demand, surplus)
+        cost = np.hstack([cost, np.zeros((supply.size, 1))])
+
+    return supply, demand, cost
+
+
+def _two_smallest(block):
+    """Минимум, его индекс и штраф (разность двух наименьших) по строкам блока"""
+
+    n = block.shape[1]
+    if n == 1:
+        first = block[:, 0]
+        return first, np.zeros(block.shape[0], dtype=int), first
+
+    best = block.argmin(axis=1)
+    two = np.partition(block, 1, axis=1)
+    first, second = two[:, 0], two[:, 1]
+    # Если в строке осталась одна допустимая клетка, штраф равен ее стоимости
+    penalty = np.where(np.isinf(second), first, second - first)
+    return first, best, penalty
+
+
+def vogel_initial(supply, demand, cost):
+    """Начальный опорный план методом Фогеля
+
+    Возвращает список базисных клеток (i, j, объем) из m + n - 1 элементов.
+    Штрафы пересчитываются только для строк/столбцов, у которых выбыл
+    один из двух минимальных элементов.
+    """
+
+    m, n = cost.shape
+    cost_t = np.ascontiguousarray(cost.T)
+    s = supply.copy()
+    d = demand.copy()
+    row_active = np.ones(m, dtype=bool)
+    col_active = np.ones(n, dtype=bool)
+
+    _, row_best, row_pen = _two_smallest(cost)
+    _, col_best, col_pen = _two_smallest(cost_t)
+    # Второй минимум нужен, чтобы понять, затронуло ли строку выбывание столбца
+    row_second = np.argsort(cost, axis=1)[:, 1] if n > 1 else row_best.copy()
+    col_second = np.argsort(cost_t, axis=1)[:, 1] if m > 1 else col_best.copy()
+
+    def refresh_rows(rows):
+        if rows.size == 0:
+            return
+        block = np.where(col_active, cost[rows], np.inf)
+        order = np.argpartition(block, min(1, n - 1), axis=1)[:, :2]
+        _, row_best[rows], row_pen[rows] = _two_smallest(block)
+        row_second[rows] = np.where(order[:, 0] == row_best[rows], order[:, -1], order[:, 0])
+
+    def refresh_cols(cols):
+        if cols.size == 0:
+            return
+        block = np.where(row_active, cost_t[cols], np.inf)
+        order = np.argpartition(block, min(1, m - 1), axis=1)[:, :2]
+        _, col_best[cols], col_pen[cols] = _two_smallest(block)
+        col_second[cols] = np.where(order[:, 0] == col_best[cols], order[:, -1], order[:, 0])
+
+    basis = []
+    rows_left, cols_left = m, n
+    while True:
+        r_pen = np.where(row_active, row_pen, -np.inf)
+        c_pen = np.where(col_active, col_pen, -np.inf)
+        r = int(r_pen.argmax())
+        c = int(c_pen.argmax())
+        if r_pen[r] >= c_pen[c]:
+            i, j = r, int(row_best[r])
+        else:
+            i, j = int(col_best[c]), c
+
+        q = min(s[i], d[j])
+        basis.append((i, j, q))
+        if rows_left == 1 and cols_left == 1:
+            break
+
+        # Вычеркиваем ровно одну линию, чтобы базис оставался деревом
+        if (s[i] <= d[j] and rows_left > 1) or cols_left == 1:
+            d[j] -= q
+            s[i] = 0.0
+            row_active[i] = False
+            rows_left -= 1
+            refresh_cols(np.flatnonzero(col_active & ((col_best == i) | (col_second == i))))
+        else:
+            s[i] -= q
+            d[j] = 0.0
+            col_active[j] = False
+            cols_left -= 1
+            refresh_rows(np.flatnonzero(row_active & ((row_best == j) | (row_second == j))))
+
+    return basis
+
+
+class _BasisTree:
+    """Базис транспортной задачи как корневое остовное дерево
+
+    Узлы 0..m-1 - строки (поставщики), m..m+n-1 - столбцы (потребители).
+    Каждое базисное ребро хранится как связь узла с родителем, поэтому
+    цикл ищется подъемом к общему предку, а при смене базиса
+    перевешивается только отделившееся поддерево.
+    """
+
+    def __init__(self, m, n, basis):
+        self.m = m
+        self.parent = [-1] * (m + n)
+        self.children = [set() for _ in range(m + n)]
+        self.flow = {}
+
+        adj = [[] for _ in range(m + n)]
+        for i, j, q in basis:
+            adj[i].append(m + j)
+            adj[m + j].append(i)
+            self.flow[i, j] = q
+
+        seen = [False] * (m + n)
+        for root in range(m + n):
+            if seen[root]:
+                continue
+            seen[root] = True
+            queue = deque([root])
+            while queue:
+                node = queue.popleft()
+                for nxt in adj[node]:
+                    if not seen[nxt]:
+                        seen[nxt] = True
+                        self.parent[nxt] = node
+                        self.children[node].add(nxt)
+                        queue.append(nxt)
+
+    def edge(self, a, b):
+        """Клетка (i, j), соответствующая ребру между узлами a и b"""
+
+        return (a, b - self.m) if a < self.m else (b, a - self.m)
+
+    def ancestors(self, node):
+        path = [node]
+        while self.parent[path[-1]] != -1:
+            path.append(self.parent[path[-1]])
+        return path
+
+    def cycle(self, a, b):
+        """Путь по дереву от узла a до узла b"""
+
+        up_a = self.ancestors(a)
+        index = {node: k for k, node in enumerate(up_a)}
+        up_b = [b]
+        while up_b[-1] not in index:
+            up_b.append(self.parent[up_b[-1]])
+        return up_a[:index[up_b[-1]] + 1] + up_b[-2::-1]
+
+    def subtree(self, node):
+        nodes = [node]
+        k = 0
+        while k < len(nodes):
+            nodes.extend(self.children[nodes[k]])
+            k += 1
+        return nodes
+
+    def rehang(self, start, cut, new_parent):
+        """Переворачивает путь start -> cut и подвешивает start к new_parent"""
+
+        prev = new_parent
+        node = start
+        while True:
+            old = self.parent[node]
+            if old != -1:
+                self.children[old].discard(node)
+            self.parent[node] = prev
+            if prev != -1:
+                self.children[prev].add(node)
+            if node == cut:
+                break
+            prev, node = node, old
+
+    def potentials(self, cost):
+        """Потенциалы u, v из условия u[i] + v[j] = c[i, j] на базисных клетках"""
+
+        m, n = cost.shape
+        u = np.zeros(m)
+        v = np.zeros(n)
+        order = [node for node in range(m + n) if self.parent[node] == -1]
+        k = 0
+        while k < len(order):
+            node = order[k]
+            for child in self.children[node]:
+                if node < m:
+                    v[child - m] = cost[node, child - m] - u[node]
+                else:
+                    u[child] = cost[child, node - m] - v[node - m]
+                order.append(child)
+            k += 1
+        return u, v
+
+
+def modi(cost, basis, tol=1e-9, max_iter=None):
+    """Метод потенциалов (MODI) - сетевой симплекс для транспортной задачи
+
+    Оценки свободных клеток считаются блоками строк (частичный выбор
+    вводимой клетки), потенциалы после каждой итерации обновляются только
+    в отделившемся поддереве.
+    """
+
+    m, n = cost.shape
+    tree = _BasisTree(m, n, basis)
+    u, v = tree.potentials(cost)
+
+    block = max(1, 65536 // n)
+    start = 0
+    clean_blocks = 0
+    n_blocks = -(-m // block)
+    iterations = 0
+    if max_iter is None:
+        max_iter = 50 * (m + n) + 1000
+
+    while clean_blocks < n_blocks:
+        rows = slice(start, min(start + block, m))
+        reduced = cost[rows] - u[rows, None] - v
+        k = int(reduced.argmin())
+        p, q = divmod(k, n)
+        p += start
+        r = reduced.flat[k]
+        start = start + block if start + block < m else 0
+
+        if r >= -tol:
+            clean_blocks += 1
+            continue
+        clean_blocks = 0
+
+        iterations += 1
+        if iterations > max_iter:
+            raise RuntimeError("Превышено число итераций метода потенциалов")
+
+        # Цикл: вводимая клетка (p, q) и путь по дереву от строки p к столбцу q
+        nodes = tree.cycle(p, m + q)
+        edges = [tree.edge(a, b) for a, b in zip(nodes[:-1], nodes[1:])]
+        minus = edges[0::2]
+        plus = edges[1::2]
+
+        k = min(range(0, len(edges), 2), key=lambda k: tree.flow[edges[k]])
+        leave = edges[k]
+        theta = tree.flow[leave]
+        for e in minus:
+            tree.flow[e] -= theta
+        for e in plus:
+            tree.flow[e] += theta
+        del tree.flow[leave]
+        tree.flow[p, q] = theta
+
+        # Нижний узел выводимого ребра отделяется вместе со своим поддеревом
+        a, b = nodes[k], nodes[k + 1]
+        low = a if tree.parent[a] == b else b
+        side = np.array(tree.subtree(low), dtype=int)
+        if low == a:
+            # Поддерево содержит строку p: сдвигаем его на r и вешаем p на столбец q
+            u[side[side < m]] += r
+            v[side[side >= m] - m] -= r
+            tree.rehang(p, low, m + q)
+        else:
+            u[side[side < m]] -= r
+            v[side[side >= m] - m] += r
+            tree.rehang(m + q, low, p)
+
+    flows = np.zeros((m, n))
+    for (i, j), q in tree.flow.items():
+        flows[i, j] = q
+
+    return flows, u, v, iterations
+
+
+def solve_transport(supply, demand, cost):
+    """Решение транспортной задачи: метод Фогеля + метод потенциалов
+
+    Мощности поставщиков - ограничения "не более", потребности - "не менее"
+    (при неотрицательных затратах выполняются как равенства). Возвращает
+    матрицу перевозок поставщик × потребитель и суммарные затраты.
+    """
+
+    if not np.isfinite(np.asarray(cost, dtype=float)).all():
+        raise ValueError("Метод потенциалов требует конечных затрат по всем маршрутам")
+    n_demand = np.asarray(demand).size
+    supply, demand, cost = _balance(supply, demand, cost)
+    basis = vogel_initial(supply, demand, cost)
+    flows, _, _, iterations = modi(cost, basis)
+    record(iterations=iterations)
+
+    flows = flows[:, :n_demand]
+    return flows, float((flows * cost[:, :n_demand]).sum())